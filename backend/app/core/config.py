@@ -8,10 +8,74 @@ JWT_SECRET = os.getenv("JWT_SECRET")
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-DB_NAME = "farmvaidya_chat"
+DB_NAME = os.getenv("DB_NAME", "farmvaidya_chat")
 
 # LightRAG URL - now running locally in the same deployment
 LIGHTRAG_URL = os.getenv("LIGHTRAG_API_URL", "http://localhost:9621/query")
+LIGHTRAG_BASE_URL = os.getenv("LIGHTRAG_BASE_URL", LIGHTRAG_URL.rstrip("/").removesuffix("/query"))
+LIGHTRAG_STREAM_URL = os.getenv("LIGHTRAG_STREAM_URL", f"{LIGHTRAG_BASE_URL}/query/stream")
+
+# Pooled HTTP client used for every call to LightRAG
+LIGHTRAG_POOL_SIZE = int(os.getenv("LIGHTRAG_POOL_SIZE", "20"))
+LIGHTRAG_TIMEOUT = float(os.getenv("LIGHTRAG_TIMEOUT", "60"))
+LIGHTRAG_CONNECT_TIMEOUT = float(os.getenv("LIGHTRAG_CONNECT_TIMEOUT", "5"))
+LIGHTRAG_MAX_RETRIES = int(os.getenv("LIGHTRAG_MAX_RETRIES", "2"))
+LIGHTRAG_RETRY_BACKOFF = float(os.getenv("LIGHTRAG_RETRY_BACKOFF", "0.5"))
+# Per-read timeout of the /lightrag and /static reverse proxy (uploads and graph exports are slow)
+LIGHTRAG_PROXY_TIMEOUT = float(os.getenv("LIGHTRAG_PROXY_TIMEOUT", "300"))
+
+# Admission control for chat turns: concurrent LightRAG calls (keep at LightRAG's MAX_ASYNC),
+# turns waiting for one, seconds a turn may wait, and turns in flight per user
+ADMISSION_LLM_SLOTS = int(os.getenv("ADMISSION_LLM_SLOTS", os.getenv("MAX_ASYNC", "4")))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+ADMISSION_PER_USER = int(os.getenv("ADMISSION_PER_USER", "2"))
+
+# Background health probes behind /health (seconds)
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "3"))
+HEALTH_TRANSLATOR_INTERVAL = float(os.getenv("HEALTH_TRANSLATOR_INTERVAL", "300"))
+# A result older than this no longer counts towards readiness
+HEALTH_STALE_AFTER = float(os.getenv("HEALTH_STALE_AFTER", str(3 * HEALTH_PROBE_INTERVAL + HEALTH_PROBE_TIMEOUT)))
+
+# Machine translation backend: "google" (deep_translator) or "stub" (offline echo with a fixed delay, for load tests)
+TRANSLATOR_PROVIDER = os.getenv("TRANSLATOR_PROVIDER", "google")
+TRANSLATOR_STUB_LATENCY = float(os.getenv("TRANSLATOR_STUB_LATENCY", "0.05"))
+# Provider calls in flight across the process, reusable instances per language pair, and the per-call deadline
+TRANSLATOR_CONCURRENCY = int(os.getenv("TRANSLATOR_CONCURRENCY", "8"))
+TRANSLATOR_POOL_SIZE = int(os.getenv("TRANSLATOR_POOL_SIZE", "8"))
+TRANSLATOR_TIMEOUT = float(os.getenv("TRANSLATOR_TIMEOUT", "8"))
+# Seconds a call may wait for a free provider slot (a local backlog, not a provider failure)
+TRANSLATOR_QUEUE_TIMEOUT = float(os.getenv("TRANSLATOR_QUEUE_TIMEOUT", str(TRANSLATOR_TIMEOUT)))
+# Consecutive failures that open the circuit, and seconds before a trial call is let through
+TRANSLATOR_BREAKER_THRESHOLD = int(os.getenv("TRANSLATOR_BREAKER_THRESHOLD", "5"))
+TRANSLATOR_BREAKER_RESET = float(os.getenv("TRANSLATOR_BREAKER_RESET", "30"))
+# Answers longer than this are split at paragraph/sentence boundaries and translated in parallel
+TRANSLATION_SEGMENT_CHARS = int(os.getenv("TRANSLATION_SEGMENT_CHARS", "600"))
+TRANSLATION_PARALLEL_SEGMENTS = int(os.getenv("TRANSLATION_PARALLEL_SEGMENTS", "4"))
+
+# Translation cache: in-process LRU in front of a shared Mongo collection with TTL
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Per-session history cache: last N messages of each of the most recently active sessions
+HISTORY_CACHE_MESSAGES = int(os.getenv("HISTORY_CACHE_MESSAGES", "20"))
+HISTORY_CACHE_SESSIONS = int(os.getenv("HISTORY_CACHE_SESSIONS", "1000"))
+# Upper bound for the summary/list branch, which compiles from older messages too
+HISTORY_SUMMARY_LIMIT = int(os.getenv("HISTORY_SUMMARY_LIMIT", "200"))
+
+# Write-behind persistence of messages and session updates: flush every N ms or N writes
+WRITE_BEHIND_INTERVAL_MS = float(os.getenv("WRITE_BEHIND_INTERVAL_MS", "5"))
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", "100"))
+WRITE_BEHIND_RETRY_DELAY = float(os.getenv("WRITE_BEHIND_RETRY_DELAY", "1"))
+
+# Semantic answer cache for near-duplicate questions (factual and direct dosage answers)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_EMBEDDER = os.getenv("ANSWER_CACHE_EMBEDDER", "gemini" if GEMINI_API_KEY else "local")
+ANSWER_CACHE_EMBEDDING_MODEL = os.getenv("ANSWER_CACHE_EMBEDDING_MODEL", "gemini-embedding-001")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", str(6 * 3600)))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
 
 # Validate required environment variables
 if not MONGO_URI:
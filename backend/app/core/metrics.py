@@ -0,0 +1,244 @@
+# app/core/metrics.py
+"""
+Per-turn stage timings and a minimal Prometheus text-format registry.
+
+handle_chat runs under @timed_turn; code anywhere below it wraps work in
+`with stage("lightrag"):`. Spans nest: a stage records its own time only, so
+translation inside the LightRAG span counts as translate_out, not lightrag.
+When the turn ends, each stage's total is observed in a histogram labelled with
+the intent branch and language.
+"""
+
+import contextvars
+import functools
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages handle_chat reports (anything else is rejected to keep label cardinality fixed)
+STAGES = (
+    "detect",            # language detection
+    "classify",          # intent rules
+    "history",           # conversation history reads
+    "domain_translate",  # domain-term replacement, both directions
+    "translate_in",      # user query → English
+    "answer_cache",      # semantic answer cache lookup
+    "admission",         # waiting in the admission queue for a LightRAG slot
+    "lightrag",          # LightRAG call (time spent waiting for it)
+    "translate_out",     # answer → user language
+    "clean",             # response cleaning
+    "followup",          # follow-up decision / question generation
+    "persist",           # message + session writes
+)
+
+# Seconds; LightRAG answers take several seconds, rule-based stages microseconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values (Prometheus semantics)."""
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {values[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+TURN_SECONDS = Histogram(
+    "farmvaidya_turn_seconds", "End-to-end handle_chat latency.", ("branch", "language")
+)
+STAGE_SECONDS = Histogram(
+    "farmvaidya_turn_stage_seconds", "Time spent in each handle_chat stage per turn.", ("stage", "branch", "language")
+)
+TURNS_TOTAL = Counter(
+    "farmvaidya_turns_total", "Chat turns handled.", ("branch", "language", "outcome")
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "farmvaidya_admission_wait_seconds", "Time spent queued for a LightRAG slot.", ("priority",)
+)
+ADMISSION_REJECTED_TOTAL = Counter(
+    "farmvaidya_admission_rejected_total", "Chat requests shed by admission control.", ("reason",)
+)
+REGISTRY = [TURN_SECONDS, STAGE_SECONDS, TURNS_TOTAL, ADMISSION_WAIT_SECONDS, ADMISSION_REJECTED_TOTAL]
+
+
+class TurnTimer:
+    """Stage totals of one chat turn."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.branch = "unknown"
+        self.language = "unknown"
+        self.stages = {}  # stage -> seconds (self time)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def finish(self, outcome: str) -> float:
+        total = time.perf_counter() - self.started
+        TURN_SECONDS.observe(total, branch=self.branch, language=self.language)
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=name, branch=self.branch, language=self.language)
+        TURNS_TOTAL.inc(branch=self.branch, language=self.language, outcome=outcome)
+        return total
+
+    def summary(self) -> str:
+        return " ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in sorted(self.stages.items(), key=lambda s: -s[1]))
+
+
+class _Span:
+    __slots__ = ("child_time",)
+
+    def __init__(self):
+        self.child_time = 0.0
+
+
+# Both are copied into tasks created during the turn (asyncio.create_task copies the context)
+_current_turn = contextvars.ContextVar("current_turn", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Attribute the enclosed time (minus nested stages) to `name` in the current turn."""
+    turn = _current_turn.get()
+    if turn is None:
+        yield
+        return
+    if name not in STAGES:
+        raise ValueError(f"Unknown stage: {name}")
+
+    parent = _current_span.get()
+    span = _Span()
+    token = _current_span.set(span)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _current_span.reset(token)
+        # Concurrent children can overlap, so self time is clamped at zero
+        turn.add(name, max(0.0, elapsed - span.child_time))
+        if parent is not None:
+            parent.child_time += elapsed
+
+
+def set_turn_labels(branch: str = None, language: str = None):
+    turn = _current_turn.get()
+    if turn is None:
+        return
+    if branch:
+        turn.branch = branch
+    if language:
+        turn.language = language
+
+
+def timed_turn(func):
+    """Run an async chat handler as one timed turn and record its metrics."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        turn = TurnTimer()
+        token = _current_turn.set(turn)
+        outcome = "error"
+        try:
+            result = await func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            _current_turn.reset(token)
+            total = turn.finish(outcome)
+            print(f"⏱️ Turn [{turn.branch}/{turn.language}] {total:.2f}s: {turn.summary()}")
+    return wrapper
+
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def render_gauges(prefix: str, values: dict) -> list:
+    """Expose a stats() dict as gauges; nested dicts are flattened, non-numbers skipped."""
+    lines = []
+    for key, value in values.items():
+        name = _INVALID_NAME_CHARS.sub("_", f"{prefix}_{key}")
+        if isinstance(value, dict):
+            lines.extend(render_gauges(name, value))
+            continue
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return lines
+
+
+def render(extra_gauges: dict = None) -> str:
+    """The whole registry (plus the given component stats) in Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for prefix, values in (extra_gauges or {}).items():
+        lines.extend(render_gauges(prefix, values))
+    return "\n".join(lines) + "\n"
@@ -1,17 +1,38 @@
-from pymongo import MongoClient
-from app.core.config import MONGO_URI, DB_NAME
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
+from app.core.config import MONGO_URI, DB_NAME, TRANSLATION_CACHE_TTL
 
-try:
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-    # Test the connection
-    client.server_info()
-    print("[SUCCESS] MongoDB connected successfully")
-    db = client[DB_NAME]
-except Exception as e:
-    print(f"[ERROR] MongoDB connection failed: {e}")
-    print(f"   URI: {MONGO_URI}")
-    raise
+client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+db = client[DB_NAME]
 
 users = db.users
 sessions = db.sessions
 messages = db.messages
+translation_cache = db.translation_cache
+
+
+async def check_connection():
+    """Verify MongoDB is reachable; called once from the app lifespan."""
+    try:
+        await client.admin.command("ping")
+        print("[SUCCESS] MongoDB connected successfully")
+    except Exception as e:
+        print(f"[ERROR] MongoDB connection failed: {e}")
+        print(f"   URI: {MONGO_URI}")
+        raise
+
+
+async def ensure_indexes():
+    """Create the indexes the app relies on (idempotent)."""
+    # History reads: newest-first by session, served straight from the index
+    # (_id breaks ties between messages saved in the same millisecond)
+    await messages.create_index([("session_id", 1), ("created_at", 1), ("_id", 1)])
+
+    try:
+        await translation_cache.create_index("created_at", expireAfterSeconds=TRANSLATION_CACHE_TTL)
+    except OperationFailure:
+        # TTL changed since the index was created - update it in place
+        await db.command({
+            "collMod": "translation_cache",
+            "index": {"keyPattern": {"created_at": 1}, "expireAfterSeconds": TRANSLATION_CACHE_TTL}
+        })
@@ -1,11 +1,40 @@
+from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from app.routers import auth, chat, sessions
-from app.routers import messages
-import requests
+from app.routers import messages, stats, health
+from app.db.mongo import check_connection, ensure_indexes
+from app.services import http_client
+from app.services.answer_cache import answer_cache
+from app.services.health_service import health_monitor
+from app.services.write_behind import write_behind
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shutdown runs even if startup fails partway or the app is cancelled;
+    # each stop is a no-op for a part that never started
+    try:
+        await check_connection()
+        await ensure_indexes()
+        await http_client.init_client()
+        health_monitor.start()
+        write_behind.start()
+        yield
+    finally:
+        try:
+            await health_monitor.stop()
+        finally:
+            try:
+                # Flushes the queued writes
+                await write_behind.stop()
+            finally:
+                await http_client.close_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS to allow frontend requests
 app.add_middleware(
@@ -22,88 +51,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Health check endpoint
-@app.get("/health")
-def health_check():
-    from app.core.config import LIGHTRAG_URL
-    import requests
-    
-    lightrag_status = "unknown"
-    try:
-        response = requests.get("http://localhost:9621/docs", timeout=2)
-        lightrag_status = "connected" if response.status_code == 200 else "error"
-    except:
-        lightrag_status = "not_reachable"
-    
-    return {
-        "status": "healthy",
-        "backend": "running",
-        "mongodb": "connected",
-        "lightrag": lightrag_status,
-        "lightrag_url": LIGHTRAG_URL
-    }
-
 # Test endpoint without auth
 @app.get("/")
 def root():
     return {"message": "Farm Vaidya Backend API", "status": "running"}
 
 # Proxy all LightRAG requests (docs, static files, API endpoints)
-from fastapi import Request, Response
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.background import BackgroundTask
 
-@app.api_route("/lightrag/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
-async def proxy_lightrag(path: str, request: Request):
-    """Proxy all requests to LightRAG server"""
-    lightrag_base = "http://localhost:9621"
-    url = f"{lightrag_base}/{path}"
-    
-    # Forward query parameters
-    if request.url.query:
-        url = f"{url}?{request.url.query}"
-    
+# Connection-level headers that must not be forwarded by a proxy (RFC 9110 section 7.6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "host"
+}
+
+
+def _forward_headers(pairs) -> list:
+    return [(k, v) for k, v in pairs if k.lower() not in HOP_BY_HOP_HEADERS]
+
+
+async def _stream_proxy(request: Request, url: str):
+    """
+    Forward the request to LightRAG through the shared async pool, streaming the
+    body both ways: uploads are passed through as they arrive and the upstream
+    response is relayed chunk by chunk, never buffered in memory.
+    """
+    from app.core.config import LIGHTRAG_PROXY_TIMEOUT
+
+    headers = _forward_headers(request.headers.items())
+    if request.client:
+        headers.append(("x-forwarded-for", request.client.host))
+    body = None if request.method in ("GET", "HEAD") else request.stream()
+
     try:
-        # Forward the request
-        if request.method == "GET":
-            response = requests.get(url, timeout=10)
-        elif request.method == "POST":
-            body = await request.body()
-            response = requests.post(url, data=body, headers={"Content-Type": request.headers.get("content-type", "application/json")}, timeout=10)
-        else:
-            return {"error": f"Method {request.method} not supported in proxy"}
-        
-        # Return the response
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers=dict(response.headers),
+        response = await http_client.send_stream(
+            request.method,
+            url,
+            params=request.query_params.multi_items(),
+            headers=headers,
+            content=body,
+            timeout=LIGHTRAG_PROXY_TIMEOUT
         )
-    except Exception as e:
-        return {"error": f"LightRAG proxy error: {str(e)}"}
+    except httpx.TimeoutException as e:
+        print(f"⚠️ LightRAG proxy timeout: {request.method} {url}")
+        return JSONResponse({"error": f"LightRAG proxy timeout: {str(e)}"}, status_code=504)
+    except httpx.HTTPError as e:
+        print(f"⚠️ LightRAG proxy error: {request.method} {url}: {e}")
+        return JSONResponse({"error": f"LightRAG proxy error: {str(e)}"}, status_code=502)
+
+    proxied = StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        background=BackgroundTask(response.aclose)
+    )
+    # Raw headers keep repeated ones (Set-Cookie); aiter_raw relays the body still encoded,
+    # so Content-Encoding and Content-Length stay valid
+    proxied.raw_headers = [
+        (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in _forward_headers(response.headers.multi_items())
+    ]
+    return proxied
+
+
+@app.api_route("/lightrag/{path:path}", methods=["GET", "HEAD", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
+async def proxy_lightrag(path: str, request: Request):
+    """Proxy all requests to LightRAG server"""
+    from app.core.config import LIGHTRAG_BASE_URL
+    response = await _stream_proxy(request, f"{LIGHTRAG_BASE_URL}/{path}")
+
+    # Uploads, re-scans and deletions change the knowledge base: cached answers are stale
+    if request.method not in ("GET", "HEAD", "OPTIONS") and path.startswith("documents") and response.status_code < 400:
+        answer_cache.clear()
+
+    return response
+
 
 # Proxy static files from LightRAG (for Swagger UI CSS, JS, etc.)
-@app.get("/static/{path:path}")
-async def proxy_static(path: str):
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+async def proxy_static(path: str, request: Request):
     """Proxy static files from LightRAG server"""
-    try:
-        response = requests.get(f"http://localhost:9621/static/{path}", timeout=10)
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers=dict(response.headers),
-        )
-    except Exception as e:
-        return {"error": f"Static file error: {str(e)}"}
-
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers=dict(response.headers),
-        )
-    except Exception as e:
-        return {"error": f"LightRAG proxy error: {str(e)}"}
+    from app.core.config import LIGHTRAG_BASE_URL
+    return await _stream_proxy(request, f"{LIGHTRAG_BASE_URL}/static/{path}")
 
 app.include_router(auth.router)
 app.include_router(sessions.router)
 app.include_router(chat.router)
 app.include_router(messages.router)
+app.include_router(stats.router)
+app.include_router(stats.metrics_router)
+app.include_router(health.router)
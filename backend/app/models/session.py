@@ -7,6 +7,10 @@ def session_doc(user_id, title):
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
 
+        # denormalized counters, maintained per turn by session_service
+        "message_count": 0,
+        "last_language": None,
+
         # follow-up control
         "followup_count": 0,
         "awaiting_followup": False,
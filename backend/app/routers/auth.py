@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from passlib.context import CryptContext
@@ -37,13 +38,13 @@ def verify_password(plain, hashed):
 # ---------------- EMAIL LOGIN ----------------
 
 @router.post("/login")
-def login(data: LoginIn):
-    user = users.find_one({"email": data.email})
+async def login(data: LoginIn):
+    user = await users.find_one({"email": data.email})
 
     if not user or "password" not in user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(data.password, user["password"]):
+    if not await asyncio.to_thread(verify_password, data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_jwt({
@@ -56,18 +57,18 @@ def login(data: LoginIn):
 # ---------------- SIGNUP ----------------
 
 @router.post("/signup")
-def signup(data: SignupIn):
-    if users.find_one({"email": data.email}):
+async def signup(data: SignupIn):
+    if await users.find_one({"email": data.email}):
         raise HTTPException(status_code=400, detail="User exists")
 
     user = {
         "email": data.email,
         "name": data.name,
-        "password": pwd_context.hash(data.password),
+        "password": await asyncio.to_thread(pwd_context.hash, data.password),
         "auth_provider": "local"
     }
 
-    res = users.insert_one(user)
+    res = await users.insert_one(user)
 
     token = create_jwt({
         "sub": str(res.inserted_id),
@@ -80,9 +81,10 @@ def signup(data: SignupIn):
 # ---------------- GOOGLE LOGIN ----------------
 
 @router.post("/google")
-def google_login(data: GoogleToken):
+async def google_login(data: GoogleToken):
     try:
-        info = id_token.verify_oauth2_token(
+        info = await asyncio.to_thread(
+            id_token.verify_oauth2_token,
             data.token,
             google_requests.Request(),
             GOOGLE_CLIENT_ID
@@ -93,7 +95,7 @@ def google_login(data: GoogleToken):
     email = info["email"]
     name = info.get("name")
 
-    user = users.find_one({"email": email})
+    user = await users.find_one({"email": email})
 
     if not user:
         user = {
@@ -102,7 +104,7 @@ def google_login(data: GoogleToken):
             "auth_provider": "google",
             "google_id": info["sub"]
         }
-        users.insert_one(user)
+        await users.insert_one(user)
 
     token = create_jwt({
         "sub": str(user["_id"]),
@@ -114,8 +116,8 @@ def google_login(data: GoogleToken):
 # ---------------- PROFILE UPDATE ----------------
 
 @router.put("/me")
-def update_profile(data: dict, user_id=Depends(get_current_user)):
-    users.update_one(
+async def update_profile(data: dict, user_id=Depends(get_current_user)):
+    await users.update_one(
         {"_id": ObjectId(user_id)},
         {"$set": {"name": data["name"]}}
     )
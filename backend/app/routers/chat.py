@@ -1,7 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from app.services.chat_service import handle_chat
+from app.services.chat_service import handle_chat, stream_chat
+from app.services.chat_rules import classify_intent
+from app.services.admission import admission, AdmissionRejected
 from app.middleware.auth_middleware import get_current_user
+import json
 import traceback
 
 router = APIRouter()
@@ -10,14 +15,64 @@ class Chat(BaseModel):
     session_id: str
     message: str
 
+
+def admit(user_id, message):
+    """Admission ticket for this turn, or 429/503 with Retry-After when it is shed."""
+    try:
+        return admission.admit(user_id, classify_intent(message).branch)
+    except AdmissionRejected as e:
+        raise shed(e)
+
+
+def shed(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+
 @router.post("/chat")
-def chat(data: Chat, user_id=Depends(get_current_user)):
+async def chat(data: Chat, user_id=Depends(get_current_user)):
+    ticket = admit(user_id, data.message)
     try:
         print(f"[Chat] Received message from user {user_id}: {data.message[:50]}...")
-        response = handle_chat(data.session_id, data.message)
+        with ticket:
+            response = await handle_chat(data.session_id, data.message)
         print(f"[Chat] Generated response: {response[:50]}...")
         return {"response": response}
+    except AdmissionRejected as e:
+        # Waited too long for a LightRAG slot
+        raise shed(e)
     except Exception as e:
         print(f"[Chat] ERROR: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_stream(data: Chat, user_id=Depends(get_current_user)):
+    """
+    Same as /chat, streamed as NDJSON: {"delta": ...} lines while the answer is
+    generated, then {"done": true, "response": ...} with the final saved answer.
+    """
+    ticket = admit(user_id, data.message)
+    print(f"[Chat] Streaming message from user {user_id}: {data.message[:50]}...")
+
+    async def events():
+        try:
+            with ticket:
+                async for event in stream_chat(data.session_id, data.message):
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+        except AdmissionRejected as e:
+            yield json.dumps({"error": e.detail, "retry_after": e.retry_after}) + "\n"
+        except Exception as e:
+            print(f"[Chat] STREAM ERROR: {str(e)}")
+            print(traceback.format_exc())
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        # Keep reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the ticket if the stream never started (client gone); release is idempotent
+        # and waits for a turn that is still running (see admission.hold_ticket)
+        background=BackgroundTask(ticket.release)
+    )
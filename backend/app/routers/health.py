@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.config import LIGHTRAG_URL
+from app.services.health_service import health_monitor
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("")
+def health_check():
+    """Cached status of every dependency with its probe latency; never calls out."""
+    snapshot = health_monitor.snapshot()
+    checks = snapshot["checks"]
+    return {
+        **snapshot,
+        "backend": "running",
+        "mongodb": checks.get("mongodb", {}).get("status", "unknown"),
+        "lightrag": checks.get("lightrag", {}).get("status", "unknown"),
+        "lightrag_url": LIGHTRAG_URL
+    }
+
+
+@router.get("/live")
+def liveness():
+    """Liveness probe: 200 as long as the worker can serve requests."""
+    return health_monitor.live()
+
+
+@router.get("/ready")
+def readiness():
+    """Readiness probe: 503 until MongoDB and LightRAG are up."""
+    snapshot = health_monitor.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core import metrics
+from app.services.translation_cache import translation_cache
+from app.services.history_service import history_cache
+from app.services.answer_cache import answer_cache
+from app.services.followup_service import decision_stats
+from app.services.lightrag_service import lightrag_flights
+from app.utils.translator import translator_stats
+from app.services.write_behind import write_behind
+from app.services.admission import admission
+
+router = APIRouter(prefix="/stats")
+# Prometheus scrape endpoint, mounted at the root
+metrics_router = APIRouter()
+
+@router.get("/")
+def get_stats():
+    return {
+        "translation_cache": translation_cache.stats(),
+        "history_cache": history_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "followup_decisions": decision_stats(),
+        "lightrag_singleflight": lightrag_flights.stats(),
+        "translator": translator_stats(),
+        "write_behind": write_behind.stats(),
+        "admission": admission.stats()
+    }
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Turn and stage latency histograms plus every component's counters, in Prometheus text format."""
+    components = {f"farmvaidya_{name}": values for name, values in get_stats().items()}
+    return PlainTextResponse(metrics.render(components), media_type="text/plain; version=0.0.4")
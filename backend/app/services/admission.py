@@ -0,0 +1,230 @@
+# app/services/admission.py
+"""
+Admission control for chat turns.
+
+Two gates keep LightRAG (and the LLM behind it) at its concurrency limit:
+- admit(), at the router: caps turns in flight per user (429) and sheds new
+  turns once every LightRAG slot is taken and the queue is full (503), before
+  any work is done for them. Greetings never reach LightRAG and skip the global bound.
+- slot(), around each LightRAG call: waits for one of ADMISSION_LLM_SLOTS in
+  priority order (short factual/dosage lookups first), at most
+  ADMISSION_QUEUE_TIMEOUT. Answer-cache hits and callers sharing an identical
+  in-flight call never ask for a slot.
+Rejections carry a Retry-After estimate from the observed slot hold time.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from app.core.config import ADMISSION_LLM_SLOTS, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_PER_USER
+from app.core.metrics import ADMISSION_WAIT_SECONDS, ADMISSION_REJECTED_TOTAL, stage
+
+# Intent branch -> priority class; lower rank is served first
+PRIORITIES = {
+    "factual": "high",
+    "dosage": "high",
+    "knowledge": "normal",
+    "diagnosis": "normal",
+    "general": "normal",
+    "summary": "low",
+}
+RANKS = {"high": 0, "normal": 1, "low": 2}
+BYPASS_BRANCHES = {"greeting"}
+
+
+class AdmissionRejected(Exception):
+    """A chat request shed by admission control; maps to an HTTP status with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    An admitted turn. Entered around the turn: sets its priority for slot() and releases it on exit,
+    unless the turn runs in a task handed to hold_for() that is still going (see hold_ticket()).
+    """
+
+    def __init__(self, controller, user_id: str, priority: str, bypass: bool):
+        self.controller = controller
+        self.user_id = user_id
+        self.priority = priority
+        self.bypass = bypass
+        self.released = False
+        self._token = None
+        self._task = None
+
+    def hold_for(self, task: asyncio.Task):
+        """Keep the ticket until task finishes, even if the request ends first."""
+        self._task = task
+        task.add_done_callback(lambda _: self.release())
+
+    def release(self):
+        if self._task is not None and not self._task.done():
+            return  # the task's done-callback releases it
+        if not self.released:
+            self.released = True
+            self.controller._release_ticket(self)
+
+    def __enter__(self):
+        self._token = _current_ticket.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        try:
+            _current_ticket.reset(self._token)
+        except ValueError:
+            pass  # a streaming response's generator finalized from another context
+
+
+# Copied into the task stream_chat runs the turn in
+_current_ticket = contextvars.ContextVar("admission_ticket", default=None)
+
+
+def hold_ticket(task: asyncio.Task):
+    """
+    Tie the current turn's ticket (if any) to the task running the turn. A streamed turn
+    keeps running after the client disconnects and may still hold a LightRAG slot,
+    so its ticket must count against the limits until the task is done.
+    """
+    ticket = _current_ticket.get()
+    if ticket is not None:
+        ticket.hold_for(task)
+
+
+class _Slot:
+    def __init__(self, controller):
+        self.controller = controller
+        self.acquired_at = 0.0
+
+    async def __aenter__(self):
+        ticket = _current_ticket.get()
+        priority = ticket.priority if ticket else "normal"
+        started = time.perf_counter()
+        with stage("admission"):
+            await self.controller._acquire(priority)
+        self.acquired_at = time.perf_counter()
+        ADMISSION_WAIT_SECONDS.observe(self.acquired_at - started, priority=priority)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.controller._release_slot(time.perf_counter() - self.acquired_at)
+
+
+class AdmissionController:
+    def __init__(self, slots: int = ADMISSION_LLM_SLOTS, max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT, per_user: int = ADMISSION_PER_USER):
+        self.slots = slots
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_user = per_user
+        self._user_turns = Counter()  # user_id -> admitted turns in flight
+        self._turns = 0               # admitted turns that may need a slot
+        self._busy = 0                # slots held
+        self._waiters = []            # heap of [rank, seq, future]
+        self._seq = itertools.count()
+        self._hold_avg = 5.0          # seconds a slot is held (moving average), for Retry-After
+        self.counters = {
+            "admitted": 0,
+            "bypassed": 0,
+            "queued": 0,
+            "rejected_user_limit": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+        }
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the queue ahead drains `slots` calls at a time."""
+        rounds = max(1.0, (len(self._waiters) + 1) / max(self.slots, 1))
+        return max(1, min(60, math.ceil(self._hold_avg * rounds)))
+
+    def _reject(self, status_code: int, reason: str, detail: str):
+        self.counters[f"rejected_{reason}"] += 1
+        ADMISSION_REJECTED_TOTAL.inc(reason=reason)
+        retry_after = self.retry_after()
+        print(f"🚦 Admission: rejected ({reason}), retry after {retry_after}s")
+        raise AdmissionRejected(status_code, detail, retry_after)
+
+    def admit(self, user_id: str, branch: str) -> Ticket:
+        """Admit a turn for user_id or raise AdmissionRejected (429: per-user cap, 503: queue full)."""
+        if self._user_turns[user_id] >= self.per_user:
+            self._reject(429, "user_limit", f"Too many messages in progress (limit {self.per_user}); wait for the current answer")
+        bypass = branch in BYPASS_BRANCHES
+        if not bypass and self._turns >= self.slots + self.max_queue:
+            self._reject(503, "queue_full", "Server is busy, please retry shortly")
+
+        self._user_turns[user_id] += 1
+        if bypass:
+            self.counters["bypassed"] += 1
+        else:
+            self._turns += 1
+            self.counters["admitted"] += 1
+        return Ticket(self, user_id, PRIORITIES.get(branch, "normal"), bypass)
+
+    def _release_ticket(self, ticket: Ticket):
+        self._user_turns[ticket.user_id] -= 1
+        if self._user_turns[ticket.user_id] <= 0:
+            del self._user_turns[ticket.user_id]
+        if not ticket.bypass:
+            self._turns -= 1
+
+    def slot(self) -> _Slot:
+        """`async with admission.slot():` around a LightRAG call."""
+        return _Slot(self)
+
+    async def _acquire(self, priority: str):
+        if self._busy < self.slots and not self._waiters:
+            self._busy += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject(503, "queue_full", "Server is busy, please retry shortly")
+
+        waiter = [RANKS[priority], next(self._seq), asyncio.get_running_loop().create_future()]
+        heapq.heappush(self._waiters, waiter)
+        self.counters["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[2]), timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter[2].done():
+                # The slot was handed over just as we gave up: pass it on
+                self._release_slot(0.0)
+            else:
+                waiter[2].cancel()
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject(503, "queue_timeout", "Server is busy, please retry shortly")
+            raise
+
+    def _release_slot(self, held: float):
+        if held:
+            self._hold_avg = 0.8 * self._hold_avg + 0.2 * held
+        # Hand the slot straight to the next waiter in priority order
+        while self._waiters:
+            future = heapq.heappop(self._waiters)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy -= 1
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "slots": self.slots,
+            "slots_busy": self._busy,
+            "queue_depth": len(self._waiters),
+            "turns_in_flight": self._turns,
+            "users_in_flight": len(self._user_turns),
+            "avg_slot_seconds": round(self._hold_avg, 2),
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,306 @@
+# app/services/answer_cache.py
+
+import hashlib
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import numpy as np
+from app.core.config import (
+    GEMINI_API_KEY,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_EMBEDDER,
+    ANSWER_CACHE_EMBEDDING_MODEL,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_SIZE
+)
+from app.services import http_client
+from app.services.chat_rules import KNOWLEDGE_PRODUCTS, DOSAGE_PRODUCTS, FACTUAL_ENTITIES, CROP_NAMES
+from app.utils.term_matcher import TermMatcher
+from app.utils.translator import LocalizedText
+
+GEMINI_EMBED_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:embedContent"
+LOCAL_DIMENSIONS = 512
+
+_WORD = re.compile(r"\w+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def _compact(text: str) -> str:
+    return text.lower().replace(" ", "").replace("-", "")
+
+
+# Product / company names, compacted so "P-Factor", "p factor" and "pfactor" agree
+_ENTITY_MATCHER = TermMatcher({
+    _compact(term): _compact(term)
+    for term in KNOWLEDGE_PRODUCTS + DOSAGE_PRODUCTS + FACTUAL_ENTITIES
+})
+
+
+# Crop names; Latin-script ones only count as whole words ("rice" is not in "price")
+_CROP_MATCHER = TermMatcher(CROP_NAMES)
+
+
+def _crops(text: str) -> frozenset:
+    text = text.lower()
+    crops = set()
+    for start, term in _CROP_MATCHER.iter_matches(text):
+        end = start + len(term)
+        if term.isascii() and ((start and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum())):
+            continue
+        crops.add(CROP_NAMES[term])
+    return frozenset(crops)
+
+
+def guard_signature(text: str) -> tuple:
+    """
+    Facts two questions must share before one may answer the other.
+    Embeddings rate "P-Factor dose" and "K-Factor dose", or the same dose for paddy
+    and for cotton, as near-identical; the products, crops and numbers they
+    mention are not allowed to differ.
+    """
+    entities = frozenset(term for _, term in _ENTITY_MATCHER.iter_matches(_compact(text)))
+    numbers = frozenset(_NUMBER.findall(text))
+    return entities, numbers, _crops(text)
+
+
+# Words that carry no meaning for "is this the same question"
+_FILLER_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "of", "for", "to", "in", "on", "at", "my", "me", "i",
+    "what", "please", "tell", "can", "you", "do", "does", "should", "give", "about"
+})
+
+
+def local_embedding(text: str) -> np.ndarray:
+    """
+    Hashed word + character-trigram vector; no network.
+    Trigrams run over the words joined without spaces, so "bio factor" and
+    "biofactor" land on the same features.
+    """
+    vec = np.zeros(LOCAL_DIMENSIONS, dtype=np.float32)
+    words = [w for w in normalize_query(text).split() if w not in _FILLER_WORDS]
+    for word in words:
+        vec[zlib.crc32(word.encode("utf-8")) % LOCAL_DIMENSIONS] += 1.0
+    joined = f" {''.join(words)} "
+    for i in range(len(joined) - 2):
+        vec[zlib.crc32(joined[i:i + 3].encode("utf-8")) % LOCAL_DIMENSIONS] += 1.0
+    return vec
+
+
+async def gemini_embedding(text: str) -> np.ndarray:
+    """Same embedding family LightRAG indexes with, through the shared HTTP pool."""
+    res = await http_client.request(
+        "POST",
+        GEMINI_EMBED_URL.format(model=ANSWER_CACHE_EMBEDDING_MODEL),
+        params={"key": GEMINI_API_KEY},
+        json={
+            "content": {"parts": [{"text": text}]},
+            "taskType": "SEMANTIC_SIMILARITY"
+        },
+        timeout=3,
+        retries=0
+    )
+    res.raise_for_status()
+    return np.asarray(res.json()["embedding"]["values"], dtype=np.float32)
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    vector: np.ndarray
+    guard: tuple
+    answer: LocalizedText
+    latency: float
+    expires_at: float
+
+
+@dataclass
+class Probe:
+    """Result of a lookup; carries the embedding so a miss can be stored without re-embedding."""
+    bucket: tuple
+    query: str
+    exact_key: str
+    vector: np.ndarray = None
+    guard: tuple = ()
+    answer: LocalizedText = None
+    similarity: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def hit(self) -> bool:
+        return self.answer is not None
+
+
+class _Bucket:
+    """Entries for one (mode, language) pair plus a lazily rebuilt similarity matrix."""
+
+    def __init__(self):
+        self.entries = OrderedDict()  # exact_key -> CachedAnswer
+        self._matrix = None
+        self._keys = []
+
+    def invalidate_matrix(self):
+        self._matrix = None
+
+    def matrix(self):
+        if self._matrix is None and self.entries:
+            self._keys = list(self.entries)
+            self._matrix = np.stack([self.entries[k].vector for k in self._keys])
+        return self._matrix, self._keys
+
+
+class AnswerCache:
+    """
+    Near-duplicate question cache in front of LightRAG.
+    Keyed by (mode, language) and the English-normalized query: an exact match is
+    a dict lookup, otherwise the query embedding is compared (cosine) against the
+    bucket and the closest answer is reused above the similarity threshold, as long
+    as both questions name the same products, crops and numbers.
+    Entries expire after the TTL; the whole cache is dropped when LightRAG documents
+    change (see the /lightrag proxy).
+    """
+
+    def __init__(self, threshold: float = ANSWER_CACHE_THRESHOLD, ttl: int = ANSWER_CACHE_TTL,
+                 max_entries: int = ANSWER_CACHE_SIZE, embedder: str = ANSWER_CACHE_EMBEDDER,
+                 enabled: bool = ANSWER_CACHE_ENABLED):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self.enabled = enabled
+        self._buckets = {}  # (mode, language) -> _Bucket
+        self._size = 0
+        self.counters = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "embed_errors": 0,
+        }
+        self.latency_saved = 0.0
+        self.hit_lookup_time = 0.0
+
+    async def _embed(self, text: str):
+        if self.embedder == "gemini" and GEMINI_API_KEY:
+            vec = await gemini_embedding(text)
+        else:
+            vec = local_embedding(text)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else None
+
+    def _record_hit(self, probe: Probe, entry: CachedAnswer, kind: str):
+        self.counters[kind] += 1
+        self.latency_saved += entry.latency
+        self.hit_lookup_time += time.perf_counter() - probe.started
+        probe.answer = LocalizedText(entry.answer.text, entry.answer.language)
+
+    async def lookup(self, query: str, mode: str, language: str) -> Probe:
+        normalized = normalize_query(query)
+        probe = Probe(
+            bucket=(mode, language),
+            query=normalized,
+            exact_key=hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        )
+        if not self.enabled or not normalized:
+            return probe
+
+        now = time.monotonic()
+        bucket = self._buckets.get(probe.bucket)
+
+        entry = bucket.entries.get(probe.exact_key) if bucket else None
+        if entry is not None and entry.expires_at > now:
+            self._record_hit(probe, entry, "exact_hits")
+            return probe
+
+        try:
+            probe.vector = await self._embed(normalized)
+        except Exception as e:
+            print(f"⚠️ Answer cache embedding failed: {e}")
+            self.counters["embed_errors"] += 1
+            return probe
+        probe.guard = guard_signature(normalized)
+
+        if bucket and probe.vector is not None:
+            matrix, keys = bucket.matrix()
+            if matrix is not None:
+                scores = matrix @ probe.vector
+                # Best candidates first; stop at the first one that passes every check
+                for idx in np.argsort(scores)[::-1][:5]:
+                    if scores[idx] < self.threshold:
+                        break
+                    candidate = bucket.entries[keys[idx]]
+                    if candidate.expires_at > now and candidate.guard == probe.guard:
+                        probe.similarity = float(scores[idx])
+                        print(f"🎯 Answer cache hit ({probe.similarity:.3f}): '{normalized[:50]}' ≈ '{candidate.query[:50]}'")
+                        self._record_hit(probe, candidate, "semantic_hits")
+                        return probe
+
+        self.counters["misses"] += 1
+        return probe
+
+    def store(self, probe: Probe, answer: LocalizedText, latency: float):
+        """Remember a fresh LightRAG answer for the probe's query."""
+        if not self.enabled or probe.vector is None or not answer.text.strip():
+            return
+
+        bucket = self._buckets.setdefault(probe.bucket, _Bucket())
+        if probe.exact_key not in bucket.entries:
+            self._size += 1
+        bucket.entries[probe.exact_key] = CachedAnswer(
+            query=probe.query,
+            vector=probe.vector,
+            guard=probe.guard,
+            answer=LocalizedText(answer.text, answer.language),
+            latency=latency,
+            expires_at=time.monotonic() + self.ttl
+        )
+        bucket.entries.move_to_end(probe.exact_key)
+        bucket.invalidate_matrix()
+        self.counters["stores"] += 1
+
+        while self._size > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        # Oldest entry across buckets (each bucket is in insertion order)
+        oldest_bucket = min(
+            (b for b in self._buckets.values() if b.entries),
+            key=lambda b: next(iter(b.entries.values())).expires_at
+        )
+        oldest_bucket.entries.popitem(last=False)
+        oldest_bucket.invalidate_matrix()
+        self._size -= 1
+        self.counters["evictions"] += 1
+
+    def clear(self):
+        """Drop every cached answer, e.g. after documents were (re-)indexed."""
+        if self._size:
+            print(f"🧹 Answer cache cleared ({self._size} entries)")
+        self._buckets.clear()
+        self._size = 0
+        self.counters["invalidations"] += 1
+
+    def stats(self) -> dict:
+        hits = self.counters["exact_hits"] + self.counters["semantic_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "embedder": self.embedder if self.embedder != "gemini" or GEMINI_API_KEY else "local",
+            "threshold": self.threshold,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+            "avg_hit_lookup_ms": round(self.hit_lookup_time / hits * 1000, 3) if hits else 0.0,
+        }
+
+
+answer_cache = AnswerCache()
@@ -14,29 +14,29 @@ from app.services.chat_rules import (
 )
 
 
-def get_history(session_id):
+async def get_history(session_id):
     cursor = messages.find(
         {"session_id": session_id}
     ).sort("created_at", 1)
 
-    return [{"role": m["role"], "content": m["content"]} for m in cursor]
+    return [{"role": m["role"], "content": m["content"]} async for m in cursor]
 
 
-def handle_chat(session_id, user_message):
+async def handle_chat(session_id, user_message):
 
     # 1️⃣ Save user message
-    messages.insert_one(
+    await messages.insert_one(
         message_doc(session_id, "user", user_message)
     )
 
-    history = get_history(session_id)
+    history = await get_history(session_id)
 
     # 2️⃣ DOSAGE → answer directly
     if is_dosage_question(user_message):
         answer = clean_response(
-            query_lightrag(user_message, history)
+            (await query_lightrag(user_message, history)).text
         )
-        messages.insert_one(
+        await messages.insert_one(
             message_doc(session_id, "assistant", answer)
         )
         return answer
@@ -44,9 +44,9 @@ def handle_chat(session_id, user_message):
     # 3️⃣ FACTUAL / COMPANY → answer directly
     if is_factual_company_question(user_message):
         answer = clean_response(
-            query_lightrag(user_message, history)
+            (await query_lightrag(user_message, history)).text
         )
-        messages.insert_one(
+        await messages.insert_one(
             message_doc(session_id, "assistant", answer)
         )
         return answer
@@ -54,32 +54,32 @@ def handle_chat(session_id, user_message):
     # 4️⃣ DIRECT PRODUCT / KNOWLEDGE → answer directly
     if is_direct_knowledge_question(user_message):
         answer = clean_response(
-            query_lightrag(user_message, history)
+            (await query_lightrag(user_message, history)).text
         )
-        messages.insert_one(
+        await messages.insert_one(
             message_doc(session_id, "assistant", answer)
         )
         return answer
 
     # 5️⃣ EVERYTHING ELSE → ask LLM if follow-up needed
-    if needs_follow_up(session_id):
-        followup = query_lightrag(
+    if await needs_follow_up(session_id):
+        followup = await query_lightrag(
             "Ask ONE clear follow-up question to get missing farmer-specific details.",
             history,
             mode="bypass"
         )
-        followup = followup.strip()
+        followup = followup.text.strip()
 
-        messages.insert_one(
+        await messages.insert_one(
             message_doc(session_id, "assistant", followup)
         )
         return followup
 
     # 6️⃣ FINAL ANSWER
     answer = clean_response(
-        query_lightrag(user_message, history)
+        (await query_lightrag(user_message, history)).text
     )
-    messages.insert_one(
+    await messages.insert_one(
         message_doc(session_id, "assistant", answer)
     )
     return answer
@@ -1,79 +1,349 @@
 # app/services/chat_rules.py
 
-import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from app.utils.term_matcher import TermMatcher
 
 def normalize(text: str) -> str:
     return text.lower().replace(" ", "").replace("-", "")
 
 
+# =====================================================================
+# Keyword lists (one per rule). All matching is done by the compiled
+# classifier below; the is_* predicates are thin wrappers around it.
+# =====================================================================
+
+# ---------------- GREETINGS & ACKNOWLEDGMENTS ----------------
+# Exclude product-related queries that might contain 'k'
+GREETING_PRODUCT_EXCLUDES = ["factor", "aadhaar", "poshak", "invictus", "dosage", "dose", "product", "application"]
+
+# English greetings (including common variations)
+GREETINGS = [
+    "hi", "hii", "hiiii", "hello", "helo", "hellooo", "hey", "heyy",
+    "good morning", "morning", "good afternoon", "afternoon",
+    "good evening", "evening", "good night", "night",
+    "namaste", "namaskar", "namaskaram"
+]
+
+# Acknowledgments
+ACKNOWLEDGMENTS = [
+    "ok", "okay", "okk", "noted", "thanks", "thank you", "thankyou",
+    "got it", "sure", "alright", "fine", "cool", "nice", "great",
+    "wonderful", "awesome", "perfect", "understood", "k", "kk"
+]
+
+# Telugu greetings/acknowledgments
+TELUGU_GREETINGS = [
+    "నమస్కారం", "హలో", "హాయ్", "శుభోదయం", "శుభ మధ్యాహ్నం",
+    "శుభ సాయంత్రం", "శుభ రాత్రి", "సరే", "ఓకే",
+    "థాంక్స్", "థాంక్యూ", "ధన్యవాదాలు", "బాగుంది"
+]
+
+# Hindi greetings/acknowledgments
+HINDI_GREETINGS = [
+    "नमस्ते", "नमस्कार", "हेलो", "हाय", "शुभ प्रभात", "सुप्रभात",
+    "शुभ दोपहर", "शुभ संध्या", "शुभ रात्रि",
+    "ठीक है", "धन्यवाद", "शुक्रिया", "अच्छा", "बढ़िया"
+]
+
+ALL_GREETINGS = GREETINGS + ACKNOWLEDGMENTS + TELUGU_GREETINGS + HINDI_GREETINGS
+# For multi-word patterns like "good morning", an exact phrase anywhere is enough
+GREETING_PHRASES = [p for p in ALL_GREETINGS if len(p.split()) > 1]
+
+# ---------------- FOLLOW-UP REFERENCES ----------------
+FOLLOWUP_KEYWORDS = [
+    # English pronouns (more specific)
+    " its ", "its ", " its",  # "its dosage", "what is its"
+    " it ", " it's ",
+    "that product", "that one", "the same",
+    "about it", "of that", "of it",
+    # English yes/no/confirmation responses
+    " yes", "yes ", " yes ", " no", "no ", " no ",
+    "yeah", "nope", " okay", "ok ", " ok ", " sure", "sure ",
+    # Telugu pronouns
+    "ఆది", "దాని", "అది", "ఇది", "అదే", "ఇదే",
+    "అవును", "లేదు", "సరే",  # yes/no/ok in Telugu
+    # Hindi pronouns
+    "उसका", "इसका", "वह", "यह", "उसी", "इसी",
+    "हाँ", "नहीं", "ठीक है"  # yes/no/ok in Hindi
+]
+
+# ---------------- DOSAGE ----------------
+DOSAGE_KEYWORDS = [
+    "dosage", "dose", "how much", "doage", "dosge",
+    "quantity", "per acre", "for acres",
+    "application rate", "మోతాదు", "ఎంత వాడాలి",
+    "कितना", "मात्रा", "खुराक"
+]
+
+# Product names that indicate dosage questions
+DOSAGE_PRODUCTS = [
+    "p-factor", "pfactor", "p factor",
+    "k-factor", "kfactor", "k factor",
+    "zn-factor", "znfactor", "zn factor",
+    "aadhaar", "aadhar",
+    "poshak", "పోషక్",
+    "invictus",
+    "bio npk", "bionpk",
+    "bio double action"
+]
+
+# Exclude knowledge questions UNLESS it's a follow-up reference (like "what is its dosage")
+DOSAGE_KNOWLEDGE_EXCLUDES = ["what is", "tell me", "explain", "about", "గురించి", "ఏమిటి", "चेप్पंది", "क्या है", "के बारे में"]
+
+# Telugu product names that need Unicode matching
+DOSAGE_TELUGU_PRODUCTS = ["ఇన్విక్టస్", "పోషక్"]
+
+# ---------------- FACTUAL / COMPANY ----------------
+FACTUAL_KEYWORDS = [
+    "who is", "ceo", "founder", "director", "chief",
+    "how many", "number of", "count",
+    "patents", "years", "established", "started",
+    "headquarters", "location", "office",
+    "సీఈఓ", "ఎవరు", "పేటెంట్", "ఎన్ని",
+    "सीईओ", "कौन", "कितने", "पेटेंट"
+]
+
+FACTUAL_ENTITIES = [
+    "biofactor", "bio factor",
+    "farmvaidya", "farm vaidya",
+    "aadhaar",
+    "poshak",
+    "invictus",
+    "బయోఫ్యాక్టర్", "బయో ఫ్యాక్టర్",
+    "ఫార్మ్ వైద్య", "ఫార్మ్వైద్య",
+    "बायोफैक्टर", "बायो फैक्टर",
+    "फार्मवैद्य", "फार्म वैद्य"
+]
+
+# ---------------- DIRECT PRODUCT / KNOWLEDGE ----------------
+KNOWLEDGE_KEYWORDS = [
+    "what is", "tell me", "explain",
+    "usage", "how is it used", "how to use",
+    "benefits", "features", "about",
+    "fertilizer", "fertilizers",
+    "గురించి", "చెప్పండి", "ఏమిటి", "వాడే", "వాడకం", "ఎరువుల", "ఎరువులు",
+    "के बारे में", "बताइए", "क्या है", "खाद", "उर्वरक"
+]
+
+KNOWLEDGE_PRODUCTS = [
+    "aadhaar gold", "aadhaar", "aadhar",
+    "poshak", "పోషక్",
+    "invictus", "ఇన్విక్టస్",
+    "zn-factor", "znfactor",
+    "p-factor", "pfactor", "p factor",
+    "k-factor", "kfactor", "k factor",
+    "biofactor", "bio factor", "బయోఫ్యాక్టర్", "బయో ఫ్యాక్టర్",
+    "farmvaidya", "ఫార్మ్ వైద్య",
+    "bio double action", "biodoubleaction",
+    "बायो डबल एक्शन", "बायोफैक्टर", "बायो फैक्टर"
+]
+
+# ---------------- PROBLEM DIAGNOSIS ----------------
+# Specific problem indicators (actual issues)
+PROBLEM_KEYWORDS = [
+    "yellow", "yellowing", "wilting", "spots", "damaged", "dying",
+    "not growing", "stunted", "brown", "curling", "falling",
+    "pest", "insect", "bug", "worm", "caterpillar",
+    "disease", "infection", "fungus", "rot", "blight",
+    "పసుపు", "ఎండిపోతున్నది", "కీటకం", "వ్యాధి", "నాశనం",
+    "पीला", "मुरझाना", "कीट", "रोग", "बीमारी", "कीड़ा"
+]
+
+# General advice keywords (should NOT trigger detailed diagnosis)
+GENERAL_ADVICE_KEYWORDS = [
+    "how to get", "how to improve", "how to increase", "tips for",
+    "suggest", "recommend", "best practices", "management",
+    "ఎలా పెంచాలి", "సూచనలు", "सुझाव", "कैसे बढ़ाएं"
+]
+
+# ---------------- SUMMARY & LIST QUESTIONS ----------------
+SUMMARY_KEYWORDS = [
+    # English summary keywords
+    "tell me all", "list all", "recap", "summary", "summarize",
+    "all dosages", "all products", "all information",
+    "until now", "so far", "discussed", "mention", "mentioned",
+    "what we discussed", "everything about", "all about",
+    "complete list", "full list", "entire list",
+    # Telugu summary keywords
+    "అన్ని", "చెప్పు", "జాబితా", "ఇప్పటిదాకా", "చర్చించిన",
+    "సారాంశం", "సమాచారం", "మోతాదులు", "ఉత్పత్తులు",
+    # Hindi summary keywords
+    "सभी", "सूची", "सारांश", "अब तक", "जानकारी", "खुराक",
+    "उत्पाद", "बताइए", "सबको", "चर्चा"
+]
+
+
+# ---------------- CROPS ----------------
+# Crop name → the crop it refers to (synonyms and other scripts map to one crop).
+# Shared by the follow-up slot extraction and the answer cache guard.
+CROP_NAMES = {
+    "paddy": "paddy", "rice": "paddy", "వరి": "paddy", "రైస్": "paddy", "धान": "paddy",
+    "wheat": "wheat", "गेहूं": "wheat",
+    "cotton": "cotton", "कपास": "cotton",
+    "tomato": "tomato", "టమాటా": "tomato", "टमाटर": "tomato",
+    "chili": "chili", "मिर्च": "chili",
+    "maize": "maize", "corn": "maize", "మొక్కజొన్న": "maize", "मक्का": "maize",
+    "పనస": "jackfruit",
+}
+
+# Words that say a crop is meant without naming it
+CROP_WORDS = ["crop", "పంట", "फसल"]
+
+# =====================================================================
+# Compiled classifier
+# =====================================================================
+
+# Keyword groups scanned over " <lowercased, stripped message> "
+_TEXT_GROUPS = {
+    "greeting_exclude": GREETING_PRODUCT_EXCLUDES,
+    "greeting_phrase": GREETING_PHRASES,
+    "greeting_native": TELUGU_GREETINGS + HINDI_GREETINGS,
+    "followup": FOLLOWUP_KEYWORDS,
+    "dosage": DOSAGE_KEYWORDS,
+    "dosage_product": DOSAGE_PRODUCTS,
+    "dosage_exclude": DOSAGE_KNOWLEDGE_EXCLUDES,
+    "dosage_native_product": DOSAGE_TELUGU_PRODUCTS,
+    "knowledge": KNOWLEDGE_KEYWORDS,
+    "knowledge_product": KNOWLEDGE_PRODUCTS,
+    "problem": PROBLEM_KEYWORDS,
+    "general_advice": GENERAL_ADVICE_KEYWORDS,
+    "summary": SUMMARY_KEYWORDS,
+}
+
+# Factual rules match against the compact form (no spaces or hyphens)
+_COMPACT_GROUPS = {
+    "factual": [k.replace(" ", "") for k in FACTUAL_KEYWORDS],
+    "factual_entity": FACTUAL_ENTITIES,
+}
+
+_GREETING_EXACT = frozenset(ALL_GREETINGS)
+
+
+def _compile(groups: dict):
+    term_groups = {}
+    for group, terms in groups.items():
+        for term in terms:
+            term_groups.setdefault(term, set()).add(group)
+    return TermMatcher({term: term for term in term_groups}), term_groups
+
+
+_TEXT_MATCHER, _TEXT_TERM_GROUPS = _compile(_TEXT_GROUPS)
+_COMPACT_MATCHER, _COMPACT_TERM_GROUPS = _compile(_COMPACT_GROUPS)
+
+
+def _scan(matcher, term_groups, text: str) -> dict:
+    """Single pass over text → {group: number of distinct keywords found}."""
+    hits = {}
+    for term in {term for _, term in matcher.iter_matches(text)}:
+        for group in term_groups[term]:
+            hits[group] = hits.get(group, 0) + 1
+    return hits
+
+
+@dataclass(frozen=True)
+class Intent:
+    greeting: bool = False
+    factual: bool = False
+    knowledge: bool = False
+    followup_reference: bool = False
+    dosage: bool = False
+    diagnosis: bool = False
+    summary: bool = False
+    # group → number of distinct keywords matched (the raw evidence behind the flags);
+    # read-only, since classify_intent hands the same cached Intent to every caller
+    scores: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    @property
+    def branch(self) -> str:
+        """The handle_chat branch this message routes to, in handle_chat's order."""
+        if self.greeting:
+            return "greeting"
+        if self.factual:
+            return "factual"
+        if self.knowledge:
+            return "knowledge"
+        if self.dosage:
+            return "dosage"
+        if self.summary:
+            return "summary"
+        if self.diagnosis:
+            return "diagnosis"
+        return "general"
+
+
+@lru_cache(maxsize=4096)
+def classify_intent(text: str) -> Intent:
+    """
+    Classify a message against every rule at once.
+    The message is scanned once by one compiled automaton holding all keyword lists
+    (plus once in compact form for the factual rule), then each rule is decided from
+    the keyword hits with the same logic the individual predicates used to apply.
+    """
+    if not text:
+        return Intent()
+
+    t = text.lower().strip()
+    word_count = len(t.split())
+
+    hits = _scan(_TEXT_MATCHER, _TEXT_TERM_GROUPS, f" {t} ")
+    compact_hits = _scan(_COMPACT_MATCHER, _COMPACT_TERM_GROUPS, normalize(text))
+    scores = {**hits, **compact_hits}
+
+    # Greeting: purely a greeting/acknowledgment, up to 6 words ("Good morning, how are you?")
+    greeting = (
+        bool(t)
+        and "greeting_exclude" not in hits
+        and word_count <= 6
+        and (t in _GREETING_EXACT or "greeting_phrase" in hits or "greeting_native" in hits)
+    )
+
+    # Follow-up: must be SHORT and contain explicit pronouns to avoid false positives
+    followup_reference = word_count <= 7 and "followup" in hits
+
+    # Dosage: keywords, a product name alone/with very few words, or a Telugu product name
+    if "dosage_exclude" in hits and not followup_reference:
+        dosage = False
+    else:
+        dosage = (
+            "dosage" in hits
+            or ("dosage_product" in hits and word_count <= 4)
+            or "dosage_native_product" in hits
+        )
+
+    factual = "factual" in compact_hits and "factual_entity" in compact_hits
+    knowledge = "knowledge" in hits and "knowledge_product" in hits
+
+    # Only trigger diagnosis if there's a SPECIFIC problem mentioned;
+    # general yield/production questions without symptoms → regular knowledge question
+    diagnosis = "problem" in hits
+
+    summary = bool(t) and "summary" in hits
+
+    return Intent(
+        greeting=greeting,
+        factual=factual,
+        knowledge=knowledge,
+        followup_reference=followup_reference,
+        dosage=dosage,
+        diagnosis=diagnosis,
+        summary=summary,
+        scores=MappingProxyType(scores),
+    )
+
+
+# =====================================================================
+# Individual predicates (kept for callers that need a single rule)
+# =====================================================================
+
 # ---------------- GREETINGS & ACKNOWLEDGMENTS ----------------
 def is_greeting_or_acknowledgment(text: str) -> bool:
     """
     Detect greetings, acknowledgments, and casual conversation
     Returns True if the message is purely a greeting/acknowledgment
     """
-    if not text or len(text.strip()) == 0:
-        return False
-    
-    t = text.lower().strip()
-    original = text.strip()
-    
-    # Exclude product-related queries that might contain 'k'
-    product_keywords = ["factor", "aadhaar", "poshak", "invictus", "dosage", "dose", "product", "application"]
-    if any(keyword in t for keyword in product_keywords):
-        return False
-    
-    # English greetings (including common variations)
-    greetings = [
-        "hi", "hii", "hiiii", "hello", "helo", "hellooo", "hey", "heyy",
-        "good morning", "morning", "good afternoon", "afternoon",
-        "good evening", "evening", "good night", "night",
-        "namaste", "namaskar", "namaskaram"
-    ]
-    
-    # Acknowledgments
-    acknowledgments = [
-        "ok", "okay", "okk", "noted", "thanks", "thank you", "thankyou",
-        "got it", "sure", "alright", "fine", "cool", "nice", "great",
-        "wonderful", "awesome", "perfect", "understood", "k", "kk"
-    ]
-    
-    # Telugu greetings/acknowledgments
-    telugu_patterns = [
-        "నమస్కారం", "హలో", "హాయ్", "శుభోదయం", "శుభ మధ్యాహ్నం",
-        "శుభ సాయంత్రం", "శుభ రాత్రి", "సరే", "ఓకే", 
-        "థాంక్స్", "థాంక్యూ", "ధన్యవాదాలు", "బాగుంది"
-    ]
-    
-    # Hindi greetings/acknowledgments
-    hindi_patterns = [
-        "नमस्ते", "नमस्कार", "हेलो", "हाय", "शुभ प्रभात", "सुप्रभात",
-        "शुभ दोपहर", "शुभ संध्या", "शुभ रात्रि", 
-        "ठीक है", "धन्यवाद", "शुक्रिया", "अच्छा", "बढ़िया"
-    ]
-    
-    all_patterns = greetings + acknowledgments + telugu_patterns + hindi_patterns
-    
-    # Check if the entire message is just a greeting/acknowledgment
-    # Allow up to 6 words (e.g., "Good morning, how are you?")
-    word_count = len(t.split())
-    
-    if word_count <= 6:
-        # For each greeting pattern, check if message is EXACTLY that pattern (word-for-word)
-        # This prevents "which" from matching "hi"
-        for pattern in all_patterns:
-            if pattern == t:
-                return True
-            # For multi-word patterns like "good morning", check exact phrase
-            if len(pattern.split()) > 1 and pattern in t:
-                return True
-        
-        # Check for Unicode patterns in original text (Telugu/Hindi)
-        for pattern in telugu_patterns + hindi_patterns:
-            if pattern in original:
-                return True
-    
-    return False
+    return classify_intent(text).greeting
 
 
 # ---------------- HELPER: FOLLOW-UP DETECTION ----------------
@@ -83,153 +353,22 @@ def is_followup_reference(text: str) -> bool:
     Examples: "its dosage", "what about it", "how much of that", "ఆది", "దాని"
     Must be SHORT and contain explicit pronouns to avoid false positives
     """
-    t = text.lower().strip()
-    
-    # Require question to be relatively short (< 8 words) to be a follow-up
-    # This prevents "Benefits of Bio NPK" from being treated as follow-up
-    word_count = len(t.split())
-    if word_count > 7:
-        return False
-    
-    followup_keywords = [
-        # English pronouns (more specific)
-        " its ", "its ", " its",  # "its dosage", "what is its"
-        " it ", " it's ",
-        "that product", "that one", "the same",
-        "about it", "of that", "of it",
-        # English yes/no/confirmation responses
-        " yes", "yes ", " yes ", " no", "no ", " no ",
-        "yeah", "nope", " okay", "ok ", " ok ", " sure", "sure ",
-        # Telugu pronouns
-        "ఆది", "దాని", "అది", "ఇది", "అదే", "ఇదే",
-        "అవును", "లేదు", "సరే",  # yes/no/ok in Telugu
-        # Hindi pronouns  
-        "उसका", "इसका", "वह", "यह", "उसी", "इसी",
-        "हाँ", "नहीं", "ठीक है"  # yes/no/ok in Hindi
-    ]
-    
-    # Add spaces for better matching
-    text_with_spaces = f" {t} "
-    return any(kw in text_with_spaces for kw in followup_keywords)
+    return classify_intent(text).followup_reference
 
 
 # ---------------- DOSAGE ----------------
 def is_dosage_question(text: str) -> bool:
-    keywords = [
-        "dosage", "dose", "how much", "doage", "dosge",
-        "quantity", "per acre", "for acres",
-        "application rate", "మోతాదు", "ఎంత వాడాలి",
-        "कितना", "मात्रा", "खुराक"
-    ]
-    
-    # Product names that indicate dosage questions
-    product_names = [
-        "p-factor", "pfactor", "p factor",
-        "k-factor", "kfactor", "k factor",
-        "zn-factor", "znfactor", "zn factor",
-        "aadhaar", "aadhar",
-        "poshak", "పోషక్",
-        "invictus",
-        "bio npk", "bionpk",
-        "bio double action"
-    ]
-    
-    t = text.lower()
-    original = text  # Keep original text for Unicode matching
-    
-    # Exclude knowledge questions UNLESS it's a follow-up reference (like "what is its dosage")
-    knowledge_excludes = ["what is", "tell me", "explain", "about", "గురించి", "ఏమిటి", "चेप్पंది", "क्या है", "के बारे में"]
-    has_knowledge_exclude = any(exc in t for exc in knowledge_excludes) or any(exc in original for exc in knowledge_excludes)
-    if has_knowledge_exclude and not is_followup_reference(text):
-        return False
-    
-    # Telugu product names that need Unicode matching
-    telugu_products = ["ఇన్విక్టస్", "పోషక్"]
-    
-    # Check for dosage keywords in both lowercased and original text
-    if any(k in t for k in keywords) or any(k in original for k in keywords):
-        return True
-    
-    # Check if asking about product (likely wants dosage info)
-    # If product name is mentioned alone or with minimal context, treat as dosage question
-    for product in product_names:
-        if product in t:
-            # If it's just the product name or with very few words (like "k factor", "dosage of pfactor")
-            word_count = len(t.split())
-            if word_count <= 4:
-                return True
-    
-    # Check Telugu product names in original text
-    for product in telugu_products:
-        if product in original:
-            return True
-    
-    return False
+    return classify_intent(text).dosage
 
 
 # ---------------- FACTUAL / COMPANY ----------------
 def is_factual_company_question(text: str) -> bool:
-    keywords = [
-        "who is", "ceo", "founder", "director", "chief",
-        "how many", "number of", "count",
-        "patents", "years", "established", "started",
-        "headquarters", "location", "office",
-        "సీఈఓ", "ఎవరు", "పేటెంట్", "ఎన్ని",
-        "सीईओ", "कौन", "कितने", "पेटेंट"
-    ]
-
-    entities = [
-        "biofactor", "bio factor",
-        "farmvaidya", "farm vaidya",
-        "aadhaar",
-        "poshak",
-        "invictus",
-        "బయోఫ్యాక్టర్", "బయో ఫ్యాక్టర్",
-        "ఫార్మ్ వైద్య", "ఫార్మ్వైద్య",
-        "बायोफैक्टर", "बायो फैक्टर",
-        "फार्मवैद्य", "फार्म वैद्य"
-    ]
-
-    t = normalize(text)
-
-    return (
-        any(k.replace(" ", "") in t for k in keywords)
-        and any(e in t for e in entities)
-    )
+    return classify_intent(text).factual
 
 
 # ---------------- DIRECT PRODUCT / KNOWLEDGE ----------------
 def is_direct_knowledge_question(text: str) -> bool:
-    keywords = [
-        "what is", "tell me", "explain",
-        "usage", "how is it used", "how to use",
-        "benefits", "features", "about",
-        "fertilizer", "fertilizers",
-        "గురించి", "చెప్పండి", "ఏమిటి", "వాడే", "వాడకం", "ఎరువుల", "ఎరువులు",
-        "के बारे में", "बताइए", "क्या है", "खाद", "उर्वरक"
-    ]
-
-    products = [
-        "aadhaar gold", "aadhaar", "aadhar",
-        "poshak", "పోషక్",
-        "invictus", "ఇన్విక్టస్",
-        "zn-factor", "znfactor",
-        "p-factor", "pfactor", "p factor",
-        "k-factor", "kfactor", "k factor",
-        "biofactor", "bio factor", "బయోఫ్యాక్టర్", "బయో ఫ్యాక్టర్",
-        "farmvaidya", "ఫార్మ్ వైద్య",
-        "bio double action", "biodoubleaction",
-        "बायो डबल एक्शन", "बायोफैक्टर", "बायो फैक्टर"
-    ]
-
-    t = text.lower()
-    original = text  # Keep original for Unicode matching
-    
-    # Check in both normalized and original text
-    keyword_match = any(k in t for k in keywords) or any(k in original for k in keywords)
-    product_match = any(p in t for p in products) or any(p in original for p in products)
-    
-    return keyword_match and product_match
+    return classify_intent(text).knowledge
 
 
 # ---------------- PROBLEM DIAGNOSIS ----------------
@@ -239,35 +378,7 @@ def is_problem_diagnosis_question(text: str) -> bool:
     General "how to improve yield" questions should NOT trigger this.
     Only trigger for VISIBLE PROBLEMS or specific symptoms.
     """
-    # Specific problem indicators (actual issues)
-    specific_problem_keywords = [
-        "yellow", "yellowing", "wilting", "spots", "damaged", "dying",
-        "not growing", "stunted", "brown", "curling", "falling",
-        "pest", "insect", "bug", "worm", "caterpillar",
-        "disease", "infection", "fungus", "rot", "blight",
-        "పసుపు", "ఎండిపోతున్నది", "కీటకం", "వ్యాధి", "నాశనం",
-        "पीला", "मुरझाना", "कीट", "रोग", "बीमारी", "कीड़ा"
-    ]
-    
-    # General advice keywords (should NOT trigger detailed diagnosis)
-    general_advice_keywords = [
-        "how to get", "how to improve", "how to increase", "tips for",
-        "suggest", "recommend", "best practices", "management",
-        "ఎలా పెంచాలి", "సూచనలు", "सुझाव", "कैसे बढ़ाएं"
-    ]
-    
-    t = text.lower()
-    
-    # Check if it's a general advice question (not specific problem)
-    has_general_advice = any(k in t for k in general_advice_keywords)
-    has_specific_problem = any(k in t for k in specific_problem_keywords)
-    
-    # Only trigger diagnosis if there's a SPECIFIC problem mentioned
-    # General yield/production questions without symptoms → regular knowledge question
-    if has_general_advice and not has_specific_problem:
-        return False  # General advice, not a problem diagnosis
-    
-    return has_specific_problem
+    return classify_intent(text).diagnosis
 
 
 # ---------------- SUMMARY & LIST QUESTIONS ----------------
@@ -276,37 +387,4 @@ def is_summary_or_list_question(text: str) -> bool:
     Detect questions asking for summaries, lists, or recaps of previously discussed information.
     These should compile from conversation history rather than sending to LightRAG.
     """
-    if not text or len(text.strip()) == 0:
-        return False
-    
-    t = text.lower()
-    original = text
-    
-    # English summary keywords
-    summary_keywords = [
-        "tell me all", "list all", "recap", "summary", "summarize",
-        "all dosages", "all products", "all information",
-        "until now", "so far", "discussed", "mention", "mentioned",
-        "what we discussed", "everything about", "all about",
-        "complete list", "full list", "entire list"
-    ]
-    
-    # Telugu summary keywords
-    telugu_keywords = [
-        "అన్ని", "చెప్పు", "జాబితా", "ఇప్పటిదాకా", "చర్చించిన",
-        "సారాంశం", "సమాచారం", "మోతాదులు", "ఉత్పత్తులు"
-    ]
-    
-    # Hindi summary keywords
-    hindi_keywords = [
-        "सभी", "सूची", "सारांश", "अब तक", "जानकारी", "खुराक",
-        "उत्पाद", "बताइए", "सबको", "चर्चा"
-    ]
-    
-    all_keywords = summary_keywords + telugu_keywords + hindi_keywords
-    
-    # Check if any keyword matches
-    match_count = sum(1 for k in all_keywords if k in t or k in original)
-    
-    return match_count >= 1
-
+    return classify_intent(text).summary
@@ -1,24 +1,20 @@
-from bson import ObjectId
-from datetime import datetime
+import asyncio
+from dataclasses import replace
 import time
-from app.db.mongo import messages, sessions
-from app.models.message import message_doc
-from app.services.lightrag_service import query_lightrag
+from app.core.config import HISTORY_SUMMARY_LIMIT
+from app.core.metrics import stage, timed_turn, set_turn_labels
+from app.services.history_service import get_history, append_message, prefetch_history
+from app.services.session_service import begin_turn, end_turn
+from app.services.lightrag_service import query_lightrag, stream_lightrag, pretranslate_query
 from app.services.local_knowledge_base import synthesize_answer
 from app.utils.cleaner import clean_response
 from app.utils.language_detector import detect_language
-from deep_translator import GoogleTranslator
+from app.utils.translator import LocalizedText, translate_long, lang_code
 from app.utils.domain_translator import translate_to_telugu
-from app.services.chat_rules import (
-    is_dosage_question,
-    is_factual_company_question,
-    is_direct_knowledge_question,
-    is_greeting_or_acknowledgment,
-    is_problem_diagnosis_question,
-    is_summary_or_list_question
-)
+from app.services.admission import hold_ticket
+from app.services.chat_rules import classify_intent
 from app.services.followup_service import (
-    needs_follow_up,
+    rule_follow_up,
     generate_followup,
     can_finalize,
     MAX_FOLLOWUPS
@@ -28,32 +24,49 @@ def generate_title(text: str) -> str:
     words = text.strip().split()
     return " ".join(words[:6]).capitalize()
 
-def get_history(session_id):
-    cursor = messages.find({"session_id": session_id}).sort("created_at", 1)
-    return [{"role": m["role"], "content": m["content"]} for m in cursor]
+async def ask_lightrag(query, language, stream=None, **kwargs) -> LocalizedText:
+    """
+    Query LightRAG (no history) and clean the answer, keeping track of its language.
+    With a stream queue, sentences are pushed onto it as they are translated.
+    """
+    if stream is not None:
+        result = await stream_lightrag(query, [], language=language, on_text=stream.put_nowait, **kwargs)
+    else:
+        result = await query_lightrag(query, [], language=language, **kwargs)
+    with stage("clean"):
+        return replace(result, text=clean_response(result.text))
+
+async def save_user_message(session_id, user_message):
+    with stage("persist"):
+        await append_message(session_id, "user", user_message)
+
+async def finish_turn(session_id, answer, session_updates, followup_asked=False):
+    """Save the assistant reply and flush the turn's session changes in one update."""
+    with stage("persist"):
+        await append_message(session_id, "assistant", answer)
+        await end_turn(session_id, session_updates, followup_asked=followup_asked)
 
-def ensure_language_match(response: str, target_language: str) -> str:
-    """Ensure the response matches the target language by force-translating if needed."""
-    print(f"🔄 Final translation: Ensuring response is in {target_language}...")
+async def ensure_language_match(response: LocalizedText, target_language: str) -> str:
+    """
+    Ensure the response matches the target language, translating only when the
+    recorded language differs. Answers already translated by query_lightrag pass
+    through untouched instead of being sent to the translator a second time.
+    """
+    if response.language == target_language:
+        return response.text
+
+    print(f"🔄 Final translation: {response.language} → {target_language}...")
+    # Apply domain translation only for non-English targets to keep product names localized
+    with stage("domain_translate"):
+        response_with_terms = response.text if target_language == "english" else translate_to_telugu(response.text, target_language)
     try:
-        # Apply domain translation only for non-English targets to keep product names localized
-        response_with_terms = response if target_language == "english" else translate_to_telugu(response, target_language)
-
-        # Then translate the full response (even for English, to normalize mixed-language output)
-        lang_code_map = {
-            "telugu": "te", "tamil": "ta", "kannada": "kn", "malayalam": "ml",
-            "hindi": "hi", "marathi": "mr", "bengali": "bn", "gujarati": "gu",
-            "punjabi": "pa", "odia": "or",
-            "english": "en"
-        }
-        target_code = lang_code_map.get(target_language, "en")
-        translator = GoogleTranslator(source='auto', target=target_code)
-        final_response = translator.translate(response_with_terms)
+        with stage("translate_out"):
+            final_response = await translate_long(response_with_terms, source=lang_code(response.language), target=lang_code(target_language))
         print(f"✅ Response translated to {target_language}")
         return final_response
     except Exception as e:
         print(f"⚠️ Final translation failed: {e}")
-        return response
+        return response_with_terms
 
 def handle_greeting(user_message, language):
     """Handle greetings and acknowledgments in appropriate language with contextual responses"""
@@ -131,13 +144,16 @@ def handle_greeting(user_message, language):
     # Default fallback
     return "Hello! I'm FarmVaidya, your agricultural assistant. How can I help you today?"
 
-def handle_chat(session_id, user_message):
+@timed_turn
+async def handle_chat(session_id, user_message, stream=None):
     print("🔥 NEW HANDLE_CHAT EXECUTED")
     start_time = time.time()
     
     # Detect language of user's message
     t1 = time.time()
-    detected_language = detect_language(user_message)
+    with stage("detect"):
+        detected_language = detect_language(user_message)
+    set_turn_labels(language=detected_language)
     print(f"🌍 Detected language: {detected_language} (took {time.time()-t1:.2f}s)")
     print(f"📝 User message: {user_message}")
     print(f"🔤 Message length: {len(user_message)} characters")
@@ -146,64 +162,58 @@ def handle_chat(session_id, user_message):
     non_english_chars = sum(1 for c in user_message if ord(c) > 127)
     print(f"🔤 Non-English characters: {non_english_chars}")
     
-    # Save user message
-    t2 = time.time()
-    messages.insert_one(message_doc(session_id, "user", user_message))
-    print(f"💾 Saved user message (took {time.time()-t2:.2f}s)")
-
-    # Update session timestamp and language
-    sessions.update_one(
-        {"_id": ObjectId(session_id)},
-        {
-            "$set": {
-                "updated_at": datetime.utcnow(),
-                "language": detected_language
-            }
-        }
-    )
+    # Classify the message once; every branch below reads from this
+    with stage("classify"):
+        intent = classify_intent(user_message)
+    print(f"🧭 Intent: {intent.branch}")
+    set_turn_labels(branch=intent.branch)
 
-    # 🔥 COUNT messages AFTER insert
-    msg_count = messages.count_documents({"session_id": session_id})
+    # Turn setup as one fan-out instead of back-to-back round trips: save the user
+    # message, update/load the session and, depending on the branch, warm the
+    # history window and the query translation LightRAG will need
+    t2 = time.time()
+    # Factual and direct dosage questions go to LightRAG as typed and never read history
+    direct_query = intent.branch == "factual" or (intent.branch == "dosage" and not intent.followup_reference)
+    setup = [
+        save_user_message(session_id, user_message),
+        begin_turn(session_id, detected_language, generate_title(user_message)),
+    ]
+    if direct_query:
+        setup.append(pretranslate_query(user_message, detected_language))
+    elif not intent.greeting:
+        setup.append(prefetch_history(session_id))
+    _, session, *_ = await asyncio.gather(*setup)
+    print(f"💾 Turn setup: {len(setup)} steps in parallel (took {time.time()-t2:.2f}s)")
+    if not session:
+        # Session not found - handle gracefully
+        print(f"⚠️ Session {session_id} not found in database")
 
-    # 🔥 FIRST USER MESSAGE = SET TITLE
-    if msg_count == 1:
-        title = generate_title(user_message)
-        sessions.update_one(
-            {"_id": ObjectId(session_id)},
-            {"$set": {"title": title}}
-        )
+    # Session changes made during the turn, written once together with the reply
+    session_updates = {}
 
     # 👋 GREETING / ACKNOWLEDGMENT → Respond politely in same language
-    if is_greeting_or_acknowledgment(user_message):
+    if intent.greeting:
         print("✅ GREETING/ACKNOWLEDGMENT DETECTED")
         answer = handle_greeting(user_message, detected_language)
-        messages.insert_one(message_doc(session_id, "assistant", answer))
+        await finish_turn(session_id, answer, session_updates)
         print(f"⏱️ Total time: {time.time()-start_time:.2f}s")
         return answer
 
-    # Fetch session data early for all subsequent logic
-    session = sessions.find_one({"_id": ObjectId(session_id)})
-    if not session:
-        # Session not found - create a new one or handle gracefully
-        print(f"⚠️ Session {session_id} not found in database")
-        session = {}
-
     # � FACTUAL / COMPANY QUESTIONS → NEVER FOLLOW-UP, NO HISTORY
     # Don't pass history for factual questions to avoid entity confusion
     # Use factual=True to avoid forcing answers when no information exists
-    if is_factual_company_question(user_message):
+    if intent.factual:
         print("✅ FACTUAL/COMPANY QUESTION - DIRECT ANSWER (NO HISTORY)")
         t3 = time.time()
-        answer = clean_response(query_lightrag(user_message, [], language=detected_language, factual=True))
-        answer = ensure_language_match(answer, detected_language)
+        answer = await ensure_language_match(await ask_lightrag(user_message, detected_language, stream=stream, factual=True, cacheable=True), detected_language)
         print(f"🤖 LightRAG query (took {time.time()-t3:.2f}s)")
-        messages.insert_one(message_doc(session_id, "assistant", answer))
+        await finish_turn(session_id, answer, session_updates)
         print(f"⏱️ Total time: {time.time()-start_time:.2f}s")
         return answer
 
     # 📚 DIRECT PRODUCT / KNOWLEDGE → answer directly (CHECK BEFORE DOSAGE!)
     # This must come BEFORE dosage to handle "what is P-Factor" correctly
-    if is_direct_knowledge_question(user_message):
+    if intent.knowledge:
         print("✅ DIRECT KNOWLEDGE QUESTION")
         t3 = time.time()
         
@@ -212,12 +222,11 @@ def handle_chat(session_id, user_message):
         print(f"🔍 Original question: {user_message}")
         
         # Check if this is a follow-up reference
-        from app.services.chat_rules import is_followup_reference
-        is_followup = is_followup_reference(user_message)
+        is_followup = intent.followup_reference
         print(f"🔗 Is follow-up? {is_followup}")
         
         # Always get recent context for product/knowledge questions - needed for crop context
-        recent_history = get_history(session_id)[-10:]  # Get more context (last 10 messages)
+        recent_history = await get_history(session_id, 10)  # Get more context (last 10 messages)
         print(f"📚 History available: {len(recent_history)} messages")
         
         # Build context from user messages in history (crop mentions, conditions, etc.)
@@ -253,7 +262,7 @@ Guidelines:
             print(f"📝 Comprehensive query: {comprehensive_query[:150]}...")
             
             # Use 'local' mode for follow-ups - pass empty history since we built comprehensive query
-            answer = clean_response(query_lightrag(comprehensive_query, [], mode="local", language=detected_language))
+            answer = (await ask_lightrag(comprehensive_query, detected_language, stream=stream, mode="local")).text
         else:
             # General knowledge/advice question - use crop context if available, but don't demand it
             print("📝 General knowledge/advice question")
@@ -300,7 +309,10 @@ Guidelines:
             print(f"📝 General advice with optional context: {comprehensive_query[:150]}...")
             
             # Use 'mix' mode for comprehensive retrieval with context awareness
-            answer = clean_response(query_lightrag(comprehensive_query, [], mode="mix", language=detected_language))
+            answer = await ensure_language_match(
+                await ask_lightrag(comprehensive_query, detected_language, stream=stream, mode="mix"),
+                detected_language
+            )
             
             # If no crop context was provided, add interactive follow-up question
             if not provided_info["crop_provided"]:
@@ -320,24 +332,22 @@ Guidelines:
                     "punjabi": "\n\nਕੀ ਤੁਸੀਂ ਕਿਸੇ ਖਾਸ ਫਸਲ ਬਾਰੇ ਜਾਣਨਾ ਚਾਹੁੰਦੇ ਹੋ?"
                 }
                 
+                # Appended after the language match: the follow-up is already in the user's language
                 interactive_followup = followup_questions.get(detected_language, followup_questions["english"])
                 answer = answer + interactive_followup
-            
-            answer = ensure_language_match(answer, detected_language)
         
         print(f"🤖 LightRAG query (took {time.time()-t3:.2f}s)")
-        messages.insert_one(message_doc(session_id, "assistant", answer))
+        await finish_turn(session_id, answer, session_updates)
         print(f"⏱️ Total time: {time.time()-start_time:.2f}s")
         return answer
 
     # � DOSAGE → direct answer (AFTER knowledge check)
-    if is_dosage_question(user_message):
+    if intent.dosage:
         print("✅ DOSAGE BRANCH RETURNING LIGHTRAG ANSWER")
         t3 = time.time()
         
         # Check if this is a follow-up reference (e.g., "its dosage", "that product")
-        from app.services.chat_rules import is_followup_reference
-        is_followup = is_followup_reference(user_message)
+        is_followup = intent.followup_reference
         
         # Use detected language for dosage questions
         # English question → English answer, Telugu → Telugu
@@ -348,7 +358,7 @@ Guidelines:
         if is_followup:
             # For follow-up questions, extract product from history and build comprehensive query
             print("🔗 Follow-up reference detected, extracting product from context")
-            recent_history = get_history(session_id)[-6:]  # Last 6 messages for more context
+            recent_history = await get_history(session_id, 6)  # Last 6 messages for more context
             
             # Build comprehensive query using ONLY user messages (not assistant responses)
             user_messages = [msg["content"] for msg in recent_history if msg["role"] == "user"]
@@ -356,24 +366,24 @@ Guidelines:
             comprehensive_query = f"{context_text}. Now answer: {user_message}"
             
             print(f"📝 Comprehensive query (user messages only): {comprehensive_query[:150]}...")
-            answer = clean_response(query_lightrag(comprehensive_query, [], mode="local", language=detected_language))
+            answer = (await ask_lightrag(comprehensive_query, detected_language, stream=stream, mode="local")).text
         else:
             # For direct dosage questions, no history needed
             print("📝 Direct dosage question, no context needed")
-            answer = clean_response(query_lightrag(user_message, [], mode="naive", language=detected_language))
+            answer = (await ask_lightrag(user_message, detected_language, stream=stream, mode="naive", cacheable=True)).text
         
         print(f"🤖 LightRAG query (took {time.time()-t3:.2f}s)")
-        messages.insert_one(message_doc(session_id, "assistant", answer))
+        await finish_turn(session_id, answer, session_updates)
         print(f"⏱️ Total time: {time.time()-start_time:.2f}s")
         return answer
     # 📋 SUMMARY OR LIST QUESTIONS → COMPILE FROM CONVERSATION HISTORY
     # These ask for recaps/lists of previously discussed information
-    if is_summary_or_list_question(user_message):
+    if intent.summary:
         print("✅ SUMMARY/LIST QUESTION - COMPILING FROM HISTORY")
         t3 = time.time()
         
-        # Get conversation history
-        history = get_history(session_id)
+        # Get conversation history (summaries may reach back past the cached window)
+        history = await get_history(session_id, HISTORY_SUMMARY_LIMIT)
         print(f"📚 Total conversation messages: {len(history)}")
         
         import re
@@ -466,35 +476,37 @@ Guidelines:
             compiled_answer = "\n".join(response_lines)
             
             # Ensure response is in user's language
-            compiled_answer = ensure_language_match(compiled_answer, detected_language)
+            compiled_answer = await ensure_language_match(LocalizedText(compiled_answer, "english"), detected_language)
         else:
             # No dosage info found, still ask LightRAG but with context
             print("⚠️ No dosage info found in history, querying LightRAG with context")
-            recent_history = get_history(session_id)[-6:]
+            recent_history = await get_history(session_id, 6)
             user_messages = [msg["content"] for msg in recent_history if msg["role"] == "user"]
             context_text = " ".join(user_messages)
             comprehensive_query = f"User's previous questions and context: {context_text}\nNow answer: {user_message}"
-            compiled_answer = clean_response(query_lightrag(comprehensive_query, [], mode="mix", language=detected_language))
-            compiled_answer = ensure_language_match(compiled_answer, detected_language)
+            compiled_answer = await ensure_language_match(
+                await ask_lightrag(comprehensive_query, detected_language, stream=stream, mode="mix"),
+                detected_language
+            )
         
         print(f"✅ Compiled response (took {time.time()-t3:.2f}s)")
-        messages.insert_one(message_doc(session_id, "assistant", compiled_answer))
+        await finish_turn(session_id, compiled_answer, session_updates)
         print(f"⏱️ Total time: {time.time()-start_time:.2f}s")
         return compiled_answer
     # �🔁 FOLLOW-UP LOGIC FOR PROBLEM DIAGNOSIS
     # Always ask follow-ups for diagnosis until we have enough context (language-agnostic)
     t_followup = time.time()
-    if is_problem_diagnosis_question(user_message) or session.get("awaiting_followup"):
+    if intent.diagnosis or session.get("awaiting_followup"):
         # If this is a NEW problem diagnosis question and we're not already in follow-up mode,
         # reset the follow-up state (user asking a new question after previous conversation)
-        if is_problem_diagnosis_question(user_message) and not session.get("awaiting_followup"):
+        if intent.diagnosis and not session.get("awaiting_followup"):
             # Check if user already provided comprehensive information in their question
             # OR if we can use info from recent conversation history
             from app.services.followup_service import extract_provided_info
             
             # Check both current message AND recent history (last 10 messages to capture recent context)
             t_hist = time.time()
-            recent_history = get_history(session_id)[-10:]  # Last 10 messages
+            recent_history = await get_history(session_id, 10)  # Last 10 messages
             provided = extract_provided_info(recent_history)
             print(f"🔍 Extracted provided info (took {time.time()-t_hist:.2f}s)")
             print(f"📊 Provided info: {provided}")
@@ -511,10 +523,7 @@ Guidelines:
             if has_essential_info:
                 # User gave enough info, skip follow-ups entirely
                 print("✅ USER PROVIDED SUFFICIENT INFO, SKIPPING FOLLOW-UPS AND ANSWERING DIRECTLY")
-                sessions.update_one(
-                    {"_id": ObjectId(session_id)},
-                    {"$set": {"followup_count": MAX_FOLLOWUPS, "awaiting_followup": False}}
-                )
+                session_updates.update({"followup_count": MAX_FOLLOWUPS, "awaiting_followup": False})
                 session["followup_count"] = MAX_FOLLOWUPS
                 session["awaiting_followup"] = False
                 # Continue to final answer generation (don't ask follow-ups)
@@ -528,18 +537,12 @@ Guidelines:
                     # Only need to ask for missing info (soil/irrigation/fertilizers)
                     print("✅ USER PROVIDED CROP+STAGE IN QUESTION, REDUCED FOLLOW-UPS")
                     # Start at count 1 (skip crop/stage question)
-                    sessions.update_one(
-                        {"_id": ObjectId(session_id)},
-                        {"$set": {"followup_count": 1, "awaiting_followup": False}}
-                    )
+                    session_updates.update({"followup_count": 1, "awaiting_followup": False})
                     session["followup_count"] = 1
                     session["awaiting_followup"] = False
                 else:
                     # Reset for new question - need to ask follow-ups
-                    sessions.update_one(
-                        {"_id": ObjectId(session_id)},
-                        {"$set": {"followup_count": 0, "awaiting_followup": False}}
-                    )
+                    session_updates.update({"followup_count": 0, "awaiting_followup": False})
                     session["followup_count"] = 0
                     session["awaiting_followup"] = False
         
@@ -547,39 +550,43 @@ Guidelines:
         if session.get("followup_count") is None:
             session["followup_count"] = 0
 
+        # The rules can settle it from what the farmer has already told us
+        if not can_finalize(session):
+            with stage("followup"):
+                ask = await rule_follow_up(session_id, user_message)
+            if ask is False:
+                session_updates.update({"followup_count": MAX_FOLLOWUPS, "awaiting_followup": False})
+                session["followup_count"] = MAX_FOLLOWUPS
+                session["awaiting_followup"] = False
+
         # Only generate follow-ups if we haven't reached finalization threshold
         if not can_finalize(session):
             print("✅ GENERATING FOLLOW-UP QUESTION")
             t_gen = time.time()
             # For diagnosis questions, pass is_diagnosis=True to skip soil/irrigation/fertilizer questions
-            followup_q = generate_followup(session_id, detected_language, user_message, is_diagnosis=is_problem_diagnosis_question(user_message))
+            with stage("followup"):
+                followup_q = await generate_followup(session_id, detected_language, user_message, is_diagnosis=intent.diagnosis, session_updates=session_updates)
             print(f"❓ Generated follow-up (took {time.time()-t_gen:.2f}s)")
             
             # If generate_followup returns None, it means all info is collected
             if followup_q is None:
                 print("✅ ALL INFO COLLECTED BY generate_followup, PROCEEDING TO FINAL ANSWER")
-                sessions.update_one(
-                    {"_id": ObjectId(session_id)},
-                    {"$set": {"awaiting_followup": False, "followup_count": MAX_FOLLOWUPS}}
-                )
+                session_updates.update({"awaiting_followup": False, "followup_count": MAX_FOLLOWUPS})
                 # Don't return, continue to final answer generation
             else:
-                messages.insert_one(message_doc(session_id, "assistant", followup_q))
+                await finish_turn(session_id, followup_q, session_updates, followup_asked=True)
                 return followup_q
 
         # Enough followups → finalize and continue to final answer
         print("✅ FINALIZING AFTER FOLLOW-UPS - HAVE SUFFICIENT CONTEXT")
-        sessions.update_one(
-            {"_id": ObjectId(session_id)},
-            {"$set": {"awaiting_followup": False}}
-        )
+        session_updates.update({"awaiting_followup": False})
 
     # ✅ FINAL ANSWER - synthesize all collected context
     print("✅ GENERATING FINAL ANSWER WITH COLLECTED CONTEXT")
-    history = get_history(session_id)[:-1]
+    history = (await get_history(session_id))[:-1]
     
     # For diagnosis questions, build comprehensive query from follow-up context
-    if is_problem_diagnosis_question(user_message) and session.get("followup_count", 0) > 0:
+    if intent.diagnosis and session.get("followup_count", 0) > 0:
         # Only use messages from AFTER the last reset (the current question's follow-ups)
         # Find the index of the current user question (the one that started this follow-up flow)
         messages_list = list(history)
@@ -664,8 +671,7 @@ TONE: Practical, encouraging, solution-focused.
         
         # Try LightRAG first
         t_rag = time.time()
-        answer = clean_response(query_lightrag(comprehensive_query, [], language=detected_language))
-        answer = ensure_language_match(answer, detected_language)
+        answer = await ensure_language_match(await ask_lightrag(comprehensive_query, detected_language, stream=stream), detected_language)
         print(f"🤖 LightRAG final answer (took {time.time()-t_rag:.2f}s)")
         
         # If LightRAG returns [no-context] or empty, use local knowledge base
@@ -681,17 +687,17 @@ TONE: Practical, encouraging, solution-focused.
                 # Use local knowledge base
                 t_synth = time.time()
                 answer = synthesize_answer(soil_type, growth_stage, irrigation, ans3)
-                answer = ensure_language_match(answer, detected_language)
+                answer = await ensure_language_match(LocalizedText(answer, "english"), detected_language)
                 print(f"✅ Generated answer using local knowledge base (took {time.time()-t_synth:.2f}s)")
             except Exception as e:
                 print(f"❌ Error in local knowledge base: {e}")
                 answer = f"Based on your {growth_stage}-stage crop in {soil_type} soil with {irrigation} irrigation: Please consult our detailed guides or contact local agricultural experts for comprehensive fertilizer and irrigation recommendations."
-                answer = ensure_language_match(answer, detected_language)
+                answer = await ensure_language_match(LocalizedText(answer, "english"), detected_language)
     else:
         # Not a diagnosis question or no follow-ups collected
         # Build a user-only context to avoid language contamination from assistant messages
         t_direct = time.time()
-        recent_history = get_history(session_id)[-6:]
+        recent_history = await get_history(session_id, 6)
         user_context = [m["content"] for m in recent_history if m["role"] == "user"]
         context_block = " \n".join(user_context)
         comprehensive_query = (
@@ -702,12 +708,46 @@ TONE: Practical, encouraging, solution-focused.
             f"Context:\n{context_block}\n\nQuestion:\n{user_message}\n\nAnswer:"
         )
 
-        answer = clean_response(query_lightrag(comprehensive_query, [], language=detected_language))
-        answer = ensure_language_match(answer, detected_language)
+        answer = await ensure_language_match(await ask_lightrag(comprehensive_query, detected_language, stream=stream), detected_language)
         print(f"🤖 Direct LightRAG query (took {time.time()-t_direct:.2f}s)")
     
     t_final_save = time.time()
-    messages.insert_one(message_doc(session_id, "assistant", answer))
+    await finish_turn(session_id, answer, session_updates)
     print(f"💾 Final save (took {time.time()-t_final_save:.2f}s)")
     print(f"⏱️ Total handle_chat time: {time.time()-start_time:.2f}s")
     return answer
+
+
+async def stream_chat(session_id, user_message):
+    """
+    Run handle_chat and yield events as the answer is produced:
+    {"delta": text} for each translated sentence, then {"done": True, "response": answer}.
+    The final response is authoritative (it may differ from the deltas when a branch
+    post-processes the answer); branches that do not call LightRAG only send it there.
+    The turn keeps running if the client disconnects, so the answer is still saved;
+    its admission ticket is released when the turn finishes.
+    """
+    queue = asyncio.Queue()
+    task = asyncio.create_task(handle_chat(session_id, user_message, stream=queue))
+    hold_ticket(task)
+    streamed = ""
+
+    while True:
+        getter = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+        if getter not in done:
+            getter.cancel()
+            break
+        streamed += getter.result()
+        yield {"delta": getter.result()}
+
+    while not queue.empty():
+        delta = queue.get_nowait()
+        streamed += delta
+        yield {"delta": delta}
+
+    answer = task.result()
+    # Text appended after the LightRAG answer (e.g. the crop follow-up prompt) is sent as a last delta
+    if answer.startswith(streamed) and len(answer) > len(streamed):
+        yield {"delta": answer[len(streamed):]}
+    yield {"done": True, "response": answer}
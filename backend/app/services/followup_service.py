@@ -1,21 +1,111 @@
 from app.services.lightrag_service import query_lightrag
-from app.db.mongo import sessions, messages
+from app.db.mongo import sessions
+from app.services.history_service import get_history, history_cache
+from app.services.chat_rules import CROP_NAMES, CROP_WORDS
 from bson import ObjectId
 
 MAX_FOLLOWUPS = 3
 
-def needs_follow_up(session_id: str, language: str = "english") -> bool:
+# How follow-up decisions were made, exposed on /stats
+DECISION_COUNTERS = {
+    "answer_by_rule": 0,
+    "ask_by_rule": 0,
+    "undecided_by_rule": 0,
+    "llm_fallback": 0,
+    "llm_errors": 0,
+}
+
+
+def decide_follow_up(question: str, provided: dict):
+    """
+    Deterministic follow-up decision from the question's intent and the farmer
+    details (slots) already provided in the session.
+
+    Returns:
+        (decision, reason): decision is True (ask a follow-up), False (answer
+        directly) or None when the rules cannot tell and the LLM should decide
+    """
+    # Lazy import: chat_rules is only needed here
+    from app.services.chat_rules import classify_intent
+
+    if not question or not question.strip():
+        return False, "empty message"
+
+    intent = classify_intent(question)
+
+    # Self-contained questions never depend on farmer-specific inputs
+    if intent.greeting or intent.factual or intent.knowledge or intent.dosage or intent.summary:
+        return False, f"{intent.branch} question"
+
+    # Short replies / references continue the current topic
+    if intent.followup_reference:
+        return False, "follow-up reference"
+
+    # Problem diagnosis: symptoms are in the question, the crop is what we need
+    if intent.diagnosis:
+        if provided["crop_provided"]:
+            return False, "diagnosis with crop"
+        return True, "diagnosis without crop"
+
+    # General advice ("how to improve yield") depends on crop and growth stage
+    if "general_advice" in intent.scores:
+        if provided["crop_provided"] and provided["stage_provided"]:
+            return False, "advice with crop and stage"
+        return True, "advice without crop/stage"
+
+    # Enough farm context for any answer
+    if provided["crop_provided"] and provided["stage_provided"] and (provided["soil_provided"] or provided["irrigation_provided"]):
+        return False, "full farm context"
+
+    return None, "ambiguous"
+
+
+async def rule_follow_up(session_id: str, question: str):
+    """
+    decide_follow_up() against the details already provided in the session, counted
+    for /stats. Returns True (ask), False (answer directly) or None (rules inconclusive).
+    """
+    decision, reason = decide_follow_up(question, await history_cache.provided_info(session_id))
+    if decision is None:
+        DECISION_COUNTERS["undecided_by_rule"] += 1
+        return None
+    DECISION_COUNTERS["ask_by_rule" if decision else "answer_by_rule"] += 1
+    print(f"🧩 Follow-up decision by rule: {'ASK_FOLLOW_UP' if decision else 'ANSWER_DIRECTLY'} ({reason})")
+    return decision
+
+
+def decision_stats() -> dict:
+    decided = DECISION_COUNTERS["answer_by_rule"] + DECISION_COUNTERS["ask_by_rule"]
+    total = decided + DECISION_COUNTERS["undecided_by_rule"]
+    return {
+        **DECISION_COUNTERS,
+        "rule_rate": round(decided / total, 4) if total else 0.0,
+    }
+
+
+async def needs_follow_up(session_id: str, language: str = "english", user_message: str = None) -> bool:
     """
-    Determine if a follow-up question is needed
+    Determine if a follow-up question is needed.
+    Decided locally by decide_follow_up() whenever the rules are conclusive;
+    only ambiguous questions fall back to a bypass-mode LLM call.
     
     Args:
         session_id: The session ID
         language: The detected language of the user's question
+        user_message: The question being answered (defaults to the last user message)
     """
-    history = [
-        {"role": m["role"], "content": m["content"]}
-        for m in messages.find({"session_id": session_id}).sort("created_at", 1)
-    ]
+    history = await get_history(session_id)
+
+    question = user_message
+    if question is None:
+        question = next((m["content"] for m in reversed(history) if m["role"] == "user"), "")
+
+    decision = await rule_follow_up(session_id, question)
+    if decision is not None:
+        return decision
+
+    DECISION_COUNTERS["llm_fallback"] += 1
+    print("🧩 Follow-up decision ambiguous, asking the LLM")
 
     language_instructions = {
         "telugu": "మీరు వ్యవసాయ సహాయకుడు. రైతు నిర్దిష్ట వివరాలు (పంట, పెరుగుదల దశ, నేల, లక్షణాలు, స్థానం) అవసరమైతే మాత్రమే ఫాలో-అప్ ప్రశ్న అడగండి. ANSWER_DIRECTLY లేదా ASK_FOLLOW_UP మాత్రమే సమాధానం ఇవ్వండి.",
@@ -25,8 +115,14 @@ def needs_follow_up(session_id: str, language: str = "english") -> bool:
 
     query_text = language_instructions.get(language, language_instructions["english"])
     
-    res = query_lightrag(query_text, history, mode="bypass", language=language)
-    decision = res.strip().upper()
+    try:
+        res = await query_lightrag(query_text, history, mode="bypass", language=language)
+    except Exception as e:
+        # Without a verdict, answering is better than blocking the farmer on a question
+        print(f"⚠️ Follow-up LLM decision failed: {e}, answering directly")
+        DECISION_COUNTERS["llm_errors"] += 1
+        return False
+    decision = res.text.strip().upper()
     
     # Be more strict - only ask follow-up if explicitly needed
     return "ASK_FOLLOW_UP" in decision or "FOLLOW" in decision
@@ -42,11 +138,8 @@ def extract_provided_info(conversation_history: list) -> dict:
     # Combine all user messages to analyze
     all_user_text = " ".join([msg["content"].lower() for msg in conversation_history if msg["role"] == "user"])
     
-    # Common crop names (more comprehensive)
-    crop_keywords = ["paddy", "rice", "wheat", "cotton", "tomato", "chili", "maize", "corn", 
-                     "వరి", "పనస", "రైస్", "టమాటా", "మొక్కజొన్న",
-                     "धान", "गेहूं", "कपास", "टमाटर", "मिर्च", "मक्का",
-                     "crop", "పంట", "फसल"]
+    # Common crop names (shared with the answer cache guard) plus generic "crop" words
+    crop_keywords = list(CROP_NAMES) + CROP_WORDS
     
     # Growth stages (more comprehensive)
     stage_keywords = {
@@ -83,7 +176,15 @@ def extract_provided_info(conversation_history: list) -> dict:
     return info
 
 
-def generate_followup(session_id: str, language: str = "english", user_message: str = "", is_diagnosis: bool = False) -> str:
+async def _mark_info_collected(session_id: str, session_updates: dict = None):
+    done = {"followup_count": MAX_FOLLOWUPS, "awaiting_followup": False}
+    if session_updates is not None:
+        session_updates.update(done)
+    else:
+        await sessions.update_one({"_id": ObjectId(session_id)}, {"$set": done})
+
+
+async def generate_followup(session_id: str, language: str = "english", user_message: str = "", is_diagnosis: bool = False, session_updates: dict = None) -> str:
     """
     Generate ONLY ONE follow-up question. Never repeat information already asked.
     For DIAGNOSIS questions: Only need crop name (or symptom description which user already provided)
@@ -94,13 +195,14 @@ def generate_followup(session_id: str, language: str = "english", user_message:
         language: The detected language of the user's question
         user_message: The user's original message
         is_diagnosis: Whether this is a problem diagnosis question (vs product recommendation)
+        session_updates: The turn's pending session changes; when given, state changes are
+            added there instead of being written immediately
     """
-    # Get conversation history
-    history = list(messages.find({"session_id": session_id}).sort("created_at", 1))
-    history_dicts = [{"role": msg["role"], "content": msg["content"]} for msg in history]
+    # Get recent conversation history (follow-up rounds always fall inside the cached window)
+    history_dicts = await get_history(session_id)
     
-    # Extract what user has already provided
-    provided_info = extract_provided_info(history_dicts)
+    # What the user has already provided, from the session's running summary
+    provided_info = await history_cache.provided_info(session_id)
     print(f"📊 Already provided: {provided_info}")
     print(f"💊 Question type: {'DIAGNOSIS' if is_diagnosis else 'PRODUCT/GENERAL'}")
     
@@ -153,10 +255,7 @@ def generate_followup(session_id: str, language: str = "english", user_message:
         # For diagnosis, we have enough with just crop+symptom (or symptom alone)
         # Don't ask for stage, soil, irrigation, fertilizers
         print("✅ DIAGNOSIS MODE: All necessary information collected (crop + symptom description)")
-        sessions.update_one(
-            {"_id": ObjectId(session_id)},
-            {"$set": {"followup_count": MAX_FOLLOWUPS, "awaiting_followup": False}}
-        )
+        await _mark_info_collected(session_id, session_updates)
         return None
     
     # ======== PRODUCT/GENERAL KNOWLEDGE QUESTIONS ========
@@ -180,10 +279,7 @@ def generate_followup(session_id: str, language: str = "english", user_message:
     
     # All information collected
     print("✅ PRODUCT MODE: All essential information collected, ready for answer")
-    sessions.update_one(
-        {"_id": ObjectId(session_id)},
-        {"$set": {"followup_count": MAX_FOLLOWUPS, "awaiting_followup": False}}
-    )
+    await _mark_info_collected(session_id, session_updates)
     return None
 
 
@@ -0,0 +1,146 @@
+# app/services/health_service.py
+
+import asyncio
+import time
+from app.core.config import (
+    LIGHTRAG_BASE_URL,
+    HEALTH_PROBE_INTERVAL,
+    HEALTH_PROBE_TIMEOUT,
+    HEALTH_TRANSLATOR_INTERVAL,
+    HEALTH_STALE_AFTER
+)
+from app.db.mongo import client as mongo_client
+from app.services import http_client
+from app.utils.translator import translate_text
+
+# Dependencies a turn cannot be answered without; the translator only degrades
+# answers to English, so it never makes the backend unready
+CRITICAL = ("mongodb", "lightrag")
+
+
+async def probe_lightrag():
+    res = await http_client.request("GET", f"{LIGHTRAG_BASE_URL}/health", timeout=HEALTH_PROBE_TIMEOUT, retries=0)
+    if res.status_code != 200:
+        raise RuntimeError(f"HTTP {res.status_code}")
+
+
+async def probe_mongodb():
+    await mongo_client.admin.command("ping")
+
+
+async def probe_translator():
+    # Bypass the cache, otherwise this only proves the cache works
+    translated = await translate_text("water", source="en", target="hi", use_cache=False)
+    if not translated:
+        raise RuntimeError("empty translation")
+
+
+class HealthMonitor:
+    """
+    Probes every dependency in the background and keeps the latest result,
+    so /health answers from memory instead of calling out on every probe.
+    """
+
+    def __init__(self, interval: float = HEALTH_PROBE_INTERVAL, timeout: float = HEALTH_PROBE_TIMEOUT,
+                 translator_interval: float = HEALTH_TRANSLATOR_INTERVAL, stale_after: float = HEALTH_STALE_AFTER):
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        # name -> (probe, seconds between runs); the translator probe is a real API call, so it runs less often
+        self.probes = {
+            "mongodb": (probe_mongodb, interval),
+            "lightrag": (probe_lightrag, interval),
+            "translator": (probe_translator, translator_interval),
+        }
+        self.results = {}  # name -> dict(status, latency_ms, error, checked_at)
+        self.started_at = time.time()
+        self.loop_lag_ms = 0.0
+        self._task = None
+
+    async def _run_probe(self, name: str, probe):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout)
+            status, error = "up", None
+        except asyncio.TimeoutError:
+            status, error = "down", f"timed out after {self.timeout}s"
+        except Exception as e:
+            status, error = "down", str(e)[:200]
+
+        previous = self.results.get(name, {}).get("status")
+        if previous and previous != status:
+            print(f"{'✅' if status == 'up' else '⚠️'} Health: {name} is {status}" + (f" ({error})" if error else ""))
+        self.results[name] = {
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": error,
+            "checked_at": time.time(),
+        }
+
+    async def check(self, names=None):
+        """Run the given probes (default: all) concurrently and record their results."""
+        names = names or list(self.probes)
+        await asyncio.gather(*(self._run_probe(name, self.probes[name][0]) for name in names))
+
+    def _due(self, now: float) -> list:
+        return [
+            name for name, (_, every) in self.probes.items()
+            if name not in self.results or now - self.results[name]["checked_at"] >= every
+        ]
+
+    async def _loop(self):
+        while True:
+            await self.check(self._due(time.time()))
+            # How late the wake-up is tells whether the event loop is being blocked
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.loop_lag_ms = round(max(0.0, time.perf_counter() - expected) * 1000, 1)
+
+    def start(self):
+        """Start probing in the background; the first round runs immediately."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            print(f"[SUCCESS] Health monitor started (every {self.interval}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def live(self) -> dict:
+        """Liveness: the process and its event loop are running. Never looks at dependencies."""
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "loop_lag_ms": self.loop_lag_ms,
+            "monitor_running": self._task is not None and not self._task.done(),
+        }
+
+    def ready(self) -> bool:
+        """Readiness: every critical dependency was up at its last (recent enough) probe."""
+        now = time.time()
+        for name in CRITICAL:
+            result = self.results.get(name)
+            if result is None or result["status"] != "up" or now - result["checked_at"] > self.stale_after:
+                return False
+        return True
+
+    def snapshot(self) -> dict:
+        ready = self.ready()
+        degraded = any(r["status"] != "up" for r in self.results.values())
+        return {
+            **self.live(),
+            "status": "healthy" if ready and not degraded else ("degraded" if ready else "unhealthy"),
+            "ready": ready,
+            "checks": {
+                name: {**result, "age_seconds": round(time.time() - result["checked_at"], 1)}
+                for name, result in self.results.items()
+            },
+        }
+
+
+health_monitor = HealthMonitor()
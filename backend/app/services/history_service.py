@@ -0,0 +1,175 @@
+# app/services/history_service.py
+
+from collections import OrderedDict, defaultdict, deque
+from bson import ObjectId
+from app.core.config import HISTORY_CACHE_MESSAGES, HISTORY_CACHE_SESSIONS
+from app.core.metrics import stage
+from app.db.mongo import messages
+from app.models.message import message_doc
+from app.services.write_behind import write_behind
+
+# Only what the chat logic reads; skips _id, session_id and timestamps
+HISTORY_PROJECTION = {"_id": 0, "role": 1, "content": 1}
+
+
+def _provided_by(history: list) -> dict:
+    # Lazy import: followup_service itself reads history through this module
+    from app.services.followup_service import extract_provided_info
+    return extract_provided_info(history)
+
+
+class SessionHistory:
+    """The last N messages of one session plus a running summary of what the farmer has told us."""
+
+    def __init__(self, recent: list, complete: bool, max_messages: int):
+        self.recent = deque(recent, maxlen=max_messages)
+        # True while `recent` still holds the whole conversation
+        self.complete = complete
+        self.provided = _provided_by(recent)
+
+    def add(self, message: dict):
+        if len(self.recent) == self.recent.maxlen:
+            self.complete = False
+        self.recent.append(message)
+        if message["role"] == "user":
+            for slot, found in _provided_by([message]).items():
+                if found:
+                    self.provided[slot] = True
+
+
+class HistoryCache:
+    """
+    Bounded per-session conversation history.
+    Keeps the last N messages of recently active sessions in memory, updated on
+    every write, so a turn costs O(N) no matter how long the session is. Misses
+    load only the newest N messages (index-backed sort + limit + projection).
+    """
+
+    def __init__(self, max_messages: int = HISTORY_CACHE_MESSAGES, max_sessions: int = HISTORY_CACHE_SESSIONS):
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> SessionHistory
+        # session_id -> one list per load in progress, collecting messages appended meanwhile
+        self._loading = defaultdict(list)
+        self.counters = {
+            "hits": 0,
+            "loads": 0,
+            "deep_reads": 0,
+            "evictions": 0,
+        }
+
+    async def _fetch(self, session_id: str, limit: int, projection: dict = HISTORY_PROJECTION) -> list:
+        cursor = messages.find({"session_id": session_id}, projection).sort([("created_at", -1), ("_id", -1)]).limit(limit)
+        newest_first = await cursor.to_list(length=limit)
+        newest_first.reverse()
+        return newest_first
+
+    def _remember(self, session_id: str, entry: SessionHistory):
+        self._sessions[session_id] = entry
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def _entry(self, session_id: str) -> SessionHistory:
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            self._sessions.move_to_end(session_id)
+            self.counters["hits"] += 1
+            return entry
+
+        self.counters["loads"] += 1
+        appended = []
+        self._loading[session_id].append(appended)
+        try:
+            # Messages Mongo may not have yet: unacknowledged writes and anything appended during the load
+            unacked = write_behind.pending_messages(session_id)
+            loaded = await self._fetch(session_id, self.max_messages, {**HISTORY_PROJECTION, "_id": 1})
+        finally:
+            self._loading[session_id].remove(appended)
+            if not self._loading[session_id]:
+                del self._loading[session_id]
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            # Loaded by a concurrent caller in the meantime
+            return entry
+        newer = unacked + appended
+        skip = {doc["_id"] for doc in newer}
+        recent = [m for m in loaded if m["_id"] not in skip] + newer
+        recent = [{"role": m["role"], "content": m["content"]} for m in recent]
+        complete = len(loaded) < self.max_messages and len(recent) <= self.max_messages
+        entry = SessionHistory(recent[-self.max_messages:], complete, self.max_messages)
+        self._remember(session_id, entry)
+        return entry
+
+    async def get(self, session_id: str, limit: int = None) -> list:
+        """
+        Return the last `limit` messages (oldest first) as {"role", "content"} dicts.
+        Limits beyond the cached window go to Mongo directly.
+        """
+        limit = limit or self.max_messages
+        if limit > self.max_messages:
+            entry = self._sessions.get(session_id)
+            if entry is None or not entry.complete:
+                self.counters["deep_reads"] += 1
+                await write_behind.settle(session_id)
+                return await self._fetch(session_id, limit)
+
+        entry = await self._entry(session_id)
+        return list(entry.recent)[-limit:]
+
+    async def provided_info(self, session_id: str) -> dict:
+        """Running summary: which farmer details (crop, stage, soil, ...) have been given so far."""
+        entry = await self._entry(session_id)
+        return dict(entry.provided)
+
+    async def append(self, session_id: str, role: str, content: str):
+        """Add a message to the cached window (if the session is cached) and persist it through the write-behind queue."""
+        doc = {**message_doc(session_id, role, content), "_id": ObjectId()}
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            entry.add({"role": role, "content": content})
+        else:
+            for appended in self._loading.get(session_id, ()):
+                appended.append(doc)
+        try:
+            await write_behind.insert_message(doc)
+        except Exception:
+            # Not saved after all: the window must not show it
+            self.invalidate(session_id)
+            raise
+
+    async def prefetch(self, session_id: str):
+        """Load the session's window ahead of use; safe to run alongside append()."""
+        await self._entry(session_id)
+
+    def invalidate(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def clear(self):
+        self._sessions.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "max_messages": self.max_messages,
+        }
+
+
+history_cache = HistoryCache()
+
+
+async def get_history(session_id: str, limit: int = None) -> list:
+    with stage("history"):
+        return await history_cache.get(session_id, limit)
+
+
+async def prefetch_history(session_id: str):
+    with stage("history"):
+        await history_cache.prefetch(session_id)
+
+
+async def append_message(session_id: str, role: str, content: str):
+    await history_cache.append(session_id, role, content)
@@ -0,0 +1,123 @@
+# app/services/http_client.py
+
+import asyncio
+import httpx
+from contextlib import asynccontextmanager
+from app.core.config import (
+    LIGHTRAG_POOL_SIZE,
+    LIGHTRAG_TIMEOUT,
+    LIGHTRAG_CONNECT_TIMEOUT,
+    LIGHTRAG_MAX_RETRIES,
+    LIGHTRAG_RETRY_BACKOFF
+)
+
+# Upstream statuses worth retrying (LightRAG restarting / overloaded)
+RETRY_STATUSES = {502, 503, 504}
+
+# Errors raised before the request reached LightRAG, safe to retry
+RETRY_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    httpx.RemoteProtocolError,
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(seconds, connect=min(seconds, LIGHTRAG_CONNECT_TIMEOUT))
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=_timeout(LIGHTRAG_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=LIGHTRAG_POOL_SIZE,
+            max_keepalive_connections=LIGHTRAG_POOL_SIZE,
+        ),
+    )
+
+
+async def init_client():
+    """Create the shared keep-alive client; called from the app lifespan."""
+    client = get_client()
+    print(f"[SUCCESS] LightRAG HTTP pool ready (size={LIGHTRAG_POOL_SIZE})")
+    return client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app (scripts, tests)."""
+    global _client
+    if _client is None:
+        _client = _new_client()
+    return _client
+
+
+async def request(method, url, *, timeout=None, retries=LIGHTRAG_MAX_RETRIES, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared pool, retrying connection failures and
+    502/503/504 answers with exponential backoff. Read timeouts are not retried:
+    a slow LLM answer would only get slower.
+    """
+    client = get_client()
+    request_timeout = _timeout(timeout if timeout is not None else LIGHTRAG_TIMEOUT)
+
+    for attempt in range(retries + 1):
+        try:
+            res = await client.request(method, url, timeout=request_timeout, **kwargs)
+            if res.status_code not in RETRY_STATUSES or attempt == retries:
+                return res
+            print(f"⚠️ LightRAG returned {res.status_code}, retrying ({attempt + 1}/{retries})")
+        except RETRY_ERRORS as e:
+            if attempt == retries:
+                raise
+            print(f"⚠️ LightRAG request failed: {e}, retrying ({attempt + 1}/{retries})")
+        await asyncio.sleep(LIGHTRAG_RETRY_BACKOFF * (2 ** attempt))
+
+
+async def send_stream(method, url, *, timeout=None, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared pool and return as soon as the response
+    headers arrive, without reading the body. Never retried: the request body
+    may itself be a stream that cannot be replayed. The caller must aclose() it.
+    """
+    client = get_client()
+    request_timeout = _timeout(timeout if timeout is not None else LIGHTRAG_TIMEOUT)
+    return await client.send(client.build_request(method, url, timeout=request_timeout, **kwargs), stream=True)
+
+
+@asynccontextmanager
+async def stream(method, url, *, timeout=None, retries=LIGHTRAG_MAX_RETRIES, **kwargs):
+    """
+    Like request(), but yields the response as soon as its headers arrive so the
+    body can be consumed incrementally. Only failures before the first byte of the
+    body are retried; the response is always closed on exit.
+    """
+    client = get_client()
+    request_timeout = _timeout(timeout if timeout is not None else LIGHTRAG_TIMEOUT)
+
+    for attempt in range(retries + 1):
+        try:
+            res = await client.send(client.build_request(method, url, timeout=request_timeout, **kwargs), stream=True)
+            if res.status_code not in RETRY_STATUSES or attempt == retries:
+                break
+            await res.aclose()
+            print(f"⚠️ LightRAG returned {res.status_code}, retrying ({attempt + 1}/{retries})")
+        except RETRY_ERRORS as e:
+            if attempt == retries:
+                raise
+            print(f"⚠️ LightRAG request failed: {e}, retrying ({attempt + 1}/{retries})")
+        await asyncio.sleep(LIGHTRAG_RETRY_BACKOFF * (2 ** attempt))
+
+    try:
+        yield res
+    finally:
+        await res.aclose()
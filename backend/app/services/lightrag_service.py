@@ -1,44 +1,140 @@
-import requests
-from app.core.config import LIGHTRAG_URL
-from deep_translator import GoogleTranslator
+import hashlib
+import json
+import time
+from app.core.config import LIGHTRAG_URL, LIGHTRAG_STREAM_URL
+from app.core.metrics import stage
+from app.services import http_client
+from app.services.admission import admission, AdmissionRejected
+from app.services.answer_cache import answer_cache, normalize_query
+from app.utils.singleflight import SingleFlight
+from app.utils.cleaner import clean_response, StreamCleaner
+from app.utils.text_segmenter import SENTENCE_BREAK
+from app.utils.translator import LocalizedText, translate_text, translate_long, lang_code
 from app.utils.domain_translator import translate_to_english, translate_to_telugu
 
-def query_lightrag(query, history, mode="mix", language="english", factual=False):
+# Identical concurrent questions (e.g. after an SMS campaign) share one upstream call
+lightrag_flights = SingleFlight()
+
+
+def split_sentences(text: str):
+    """
+    Split StreamCleaner output into [(sentence, separator), ...]. The cleaner only
+    releases whole sentences and lines and holds back whitespace that may still
+    grow, so the last sentence is complete too; it gets an empty separator and the
+    whitespace after it arrives at the start of the next release.
+    """
+    sentences = []
+    pos = 0
+    for m in SENTENCE_BREAK.finditer(text):
+        sentences.append((text[pos:m.start()], m.group()))
+        pos = m.end()
+    if pos < len(text):
+        sentences.append((text[pos:], ""))
+    return sentences
+
+
+async def _english_query(query, language):
+    """Steps 1-2 shared by both query paths: domain terms to English, then the whole query."""
+    # Step 1: Translate domain-specific terms to English (e.g., "ఇన్విక్టస్" → "Invictus")
+    with stage("domain_translate"):
+        query_with_english_terms = translate_to_english(query)
+    if query != query_with_english_terms:
+        print(f"📖 Domain translation (query): {query[:50]} → {query_with_english_terms[:50]}")
+
+    # Step 2: ALWAYS translate query to English for LightRAG (even if already English to ensure clean input)
+    english_query = query_with_english_terms
+    if language != "english":
+        print(f"🔄 Translating {language} query to English...")
+        try:
+            with stage("translate_in"):
+                english_query = await translate_text(query_with_english_terms, source='auto', target='en')
+            print(f"✅ Query translated: {query_with_english_terms[:50]} → {english_query[:50]}")
+        except Exception as e:
+            print(f"⚠️ Translation failed: {e}, using original")
+            english_query = query_with_english_terms
+    return english_query
+
+
+async def pretranslate_query(query, language):
+    """
+    Run a query's translation ahead of query_lightrag/stream_lightrag. The result
+    lands in the translation cache, so the real call later finds it there; lets a
+    turn overlap the translator round trip with its database setup.
+    """
+    if language != "english":
+        await _english_query(query, language)
+
+
+def flight_key(english_query, mode, history, language):
+    """Identity of a LightRAG call: normalized query, mode, history and answer language."""
+    history_hash = ""
+    if history:
+        history_hash = hashlib.sha256(json.dumps(history, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return normalize_query(english_query), mode, history_hash, language
+
+
+async def _cached_answer(english_query, history, mode, language, cacheable):
+    """Answer-cache lookup for cacheable, history-free queries; returns the probe (or None)."""
+    if not cacheable or history:
+        return None
+    with stage("answer_cache"):
+        return await answer_cache.lookup(english_query, mode, language)
+
+
+def _remember_answer(probe, result: LocalizedText, language):
+    # Only fully localized answers are reused; fallbacks and no-context replies are not
+    if probe is None or result.language != language or "[no-context]" in result.text.lower():
+        return
+    answer_cache.store(probe, result, time.perf_counter() - probe.started)
+
+
+async def query_lightrag(query, history, mode="mix", language="english", factual=False, cacheable=False) -> LocalizedText:
     """
     Query LightRAG with ALWAYS translating to/from English to maintain language consistency.
     LightRAG knowledge base has mixed content, so we MUST translate both ways.
-    
+
     Args:
         query: The user's question (any language)
         history: Conversation history
         mode: LightRAG mode (mix, local, global, bypass)
         language: Language to respond in (english, telugu, hindi, etc.)
         factual: Not used anymore, kept for backward compatibility
+        cacheable: Serve/store the answer through the semantic answer cache
+            (only for self-contained questions, never for prompts built from history)
+
+    Returns:
+        LocalizedText tagged with the language the answer actually ended up in
+        (English with domain terms if the final translation failed)
     """
-    
+
     print(f"🎯 query_lightrag called with:")
     print(f"   📝 query: {query[:100]}...")
     print(f"   📚 history length: {len(history)} messages")
     print(f"   🔧 mode: {mode}")
     print(f"   🌍 language: {language}")
-    
-    # Step 1: Translate domain-specific terms to English (e.g., "ఇన్విక్టస్" → "Invictus")
-    query_with_english_terms = translate_to_english(query)
-    if query != query_with_english_terms:
-        print(f"📖 Domain translation (query): {query[:50]} → {query_with_english_terms[:50]}")
-    
-    # Step 2: ALWAYS translate query to English for LightRAG (even if already English to ensure clean input)
-    english_query = query_with_english_terms
-    if language != "english":
-        print(f"🔄 Translating {language} query to English...")
-        try:
-            translator = GoogleTranslator(source='auto', target='en')
-            english_query = translator.translate(query_with_english_terms)
-            print(f"✅ Query translated: {query_with_english_terms[:50]} → {english_query[:50]}")
-        except Exception as e:
-            print(f"⚠️ Translation failed: {e}, using original")
-            english_query = query_with_english_terms
-    
+
+    english_query = await _english_query(query, language)
+
+    probe = await _cached_answer(english_query, history, mode, language, cacheable)
+    if probe and probe.hit:
+        return probe.answer
+
+    async def lead():
+        result = await _query_english(english_query, history, mode, language)
+        _remember_answer(probe, result, language)
+        return result
+
+    # Covers the wait for a shared call too; the leader's translation and cleaning are nested stages
+    with stage("lightrag"):
+        result, shared = await lightrag_flights.do(flight_key(english_query, mode, history, language), lead)
+    if shared:
+        print("🔗 Joined an identical in-flight LightRAG query")
+    # Every caller gets its own copy; callers adjust the text afterwards
+    return LocalizedText(result.text, result.language)
+
+
+async def _query_english(english_query, history, mode, language) -> LocalizedText:
+    """Steps 3-5: ask LightRAG in English, then localize the answer."""
     # Step 3: Query LightRAG with PURE ENGLISH query (no language instructions)
     payload = {
         "query": english_query,
@@ -46,40 +142,162 @@ def query_lightrag(query, history, mode="mix", language="english", factual=False
         "conversation_history": history,
         "response_type": "Multiple Paragraphs"
     }
-    
-    res = requests.post(LIGHTRAG_URL, json=payload, timeout=60)
+
+    # Waits for a free LightRAG slot when every one is busy
+    async with admission.slot():
+        res = await http_client.request("POST", LIGHTRAG_URL, json=payload)
     english_response = res.json().get("response", "")
     print(f"📥 LightRAG English response: {english_response[:100]}...")
-    
+
     # Step 4: Translate domain terms in response (e.g., "Invictus" → "ఇన్విక్టస్" for Telugu)
-    response_with_terms = translate_to_telugu(english_response, language)
+    with stage("domain_translate"):
+        response_with_terms = translate_to_telugu(english_response, language)
     if english_response != response_with_terms:
         print(f"📖 Domain translation applied to response")
-    
+
     # Step 5: If language is not English, translate the entire response
     if language != "english":
         # Skip translation for "no information" responses to avoid mangling the message
         if "[no-context]" in response_with_terms.lower() or "no information" in response_with_terms.lower():
             print(f"⚠️ No-context response, using Google Translate for proper message")
-        
+
         print(f"🔄 Translating response from English to {language}...")
         try:
-            lang_code_map = {
-                "telugu": "te", "tamil": "ta", "kannada": "kn", "malayalam": "ml",
-                "hindi": "hi", "marathi": "mr", "bengali": "bn", "gujarati": "gu",
-                "punjabi": "pa", "odia": "or"
-            }
-            
-            target_lang = lang_code_map.get(language, "en")
-            translator = GoogleTranslator(source='en', target=target_lang)
-            final_response = translator.translate(response_with_terms)
+            with stage("translate_out"):
+                final_response = await translate_long(response_with_terms, source='en', target=lang_code(language))
             print(f"✅ Response translated to {language}: {final_response[:100]}...")
-            return final_response
+            return LocalizedText(final_response, language)
         except Exception as e:
             print(f"⚠️ Translation failed: {e}, returning English with domain terms")
-            return response_with_terms
-    
+            return LocalizedText(response_with_terms, "english")
+
     # For English, return response with domain terms
     print(f"✅ English response ready")
-    return response_with_terms
+    return LocalizedText(response_with_terms, "english")
+
+
+async def stream_lightrag(query, history, mode="mix", language="english", factual=False, cacheable=False, on_text=None) -> LocalizedText:
+    """
+    Streaming variant of query_lightrag using LightRAG's /query/stream (NDJSON).
+    Each sentence is cleaned, given domain terms and translated as soon as it is
+    complete, then passed to on_text, so the first words reach the farmer while
+    the LLM is still generating. Falls back to /query if the stream cannot be
+    opened before anything was emitted. Cached answers are emitted in one piece.
+
+    Returns:
+        LocalizedText with the full cleaned answer; tagged English if any
+        sentence could not be translated
+    """
+    print(f"🎯 stream_lightrag called with:")
+    print(f"   📝 query: {query[:100]}...")
+    print(f"   🔧 mode: {mode}")
+    print(f"   🌍 language: {language}")
+
+    english_query = await _english_query(query, language)
+
+    probe = await _cached_answer(english_query, history, mode, language, cacheable)
+    if probe and probe.hit:
+        if on_text:
+            on_text(clean_response(probe.answer.text))
+        return probe.answer
+
+    async def lead():
+        return await _stream_english(english_query, history, mode, language, probe, on_text)
+
+    # Covers the wait for a shared call too; the leader's translation and cleaning are nested stages
+    with stage("lightrag"):
+        result, shared = await lightrag_flights.do(flight_key(english_query, mode, history, language), lead)
+    if shared:
+        # Joined another caller's call: its sentences went to that caller, ours arrive in one piece
+        print("🔗 Joined an identical in-flight LightRAG query")
+        if on_text and result.text:
+            on_text(clean_response(result.text))
+    return LocalizedText(result.text, result.language)
+
+
+async def _stream_english(english_query, history, mode, language, probe, on_text) -> LocalizedText:
+    """Steps 3-5 of the streaming path: stream LightRAG in English, localize sentence by sentence."""
+    payload = {
+        "query": english_query,
+        "mode": mode,
+        "conversation_history": history,
+        "response_type": "Multiple Paragraphs",
+        "stream": True
+    }
+
+    pieces = []
+    pending_separator = ""
+    all_translated = True
+
+    async def emit(sentence, separator):
+        nonlocal pending_separator, all_translated
+        # Paragraph structure survives per-sentence translation through the separators
+        breaks = "\n\n" if separator.count("\n") > 1 else ("\n" if "\n" in separator else " ")
+
+        cleaned = sentence.strip()
+        if not cleaned:
+            # Only whitespace (a break the cleaner held back): keep the widest break around it
+            if pieces and len(breaks) > len(pending_separator):
+                pending_separator = breaks
+            return
+
+        with stage("domain_translate"):
+            text = translate_to_telugu(cleaned, language)
+        if language != "english":
+            try:
+                with stage("translate_out"):
+                    text = await translate_text(text, source='en', target=lang_code(language))
+            except Exception as e:
+                print(f"⚠️ Sentence translation failed: {e}, keeping English")
+                all_translated = False
+
+        chunk = pending_separator + text if pieces else text
+        pieces.append(chunk)
+        if on_text:
+            on_text(chunk)
+        pending_separator = breaks
+
+    try:
+        async with admission.slot():
+            async with http_client.stream("POST", LIGHTRAG_STREAM_URL, json=payload) as res:
+                if res.status_code != 200:
+                    body = (await res.aread()).decode(errors="replace")
+                    raise RuntimeError(f"LightRAG stream returned {res.status_code}: {body[:200]}")
+
+                # Cleaned as it arrives, so sentences come out already free of references/citations/markers
+                cleaner = StreamCleaner()
+                async for line in res.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise RuntimeError(f"LightRAG stream error: {data['error']}")
+                    chunk = data.get("response")
+                    if not chunk:
+                        continue  # references / keep-alive lines
+                    with stage("clean"):
+                        released = cleaner.feed(chunk)
+                    for sentence, separator in split_sentences(released):
+                        await emit(sentence, separator)
+
+                for sentence, separator in split_sentences(cleaner.finish()):
+                    await emit(sentence, separator)
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        if pieces:
+            raise
+        print(f"⚠️ LightRAG stream unavailable ({e}), falling back to /query")
+        result = await _query_english(english_query, history, mode, language)
+        with stage("clean"):
+            result.text = clean_response(result.text)
+        _remember_answer(probe, result, language)
+        if on_text and result.text:
+            on_text(result.text)
+        return result
 
+    answer = "".join(pieces)
+    print(f"✅ Streamed response ready ({len(pieces)} sentences): {answer[:100]}...")
+    result = LocalizedText(answer, language if all_translated else "english")
+    _remember_answer(probe, result, language)
+    return result
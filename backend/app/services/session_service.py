@@ -1,13 +1,63 @@
 from bson import ObjectId
+from datetime import datetime
+from pymongo import ReturnDocument
 from app.db.mongo import sessions
 from app.models.session import session_doc
+from app.services.write_behind import write_behind
 
-def create_session(user_id, title="New Chat"):
-    res = sessions.insert_one(session_doc(user_id, title))
+async def create_session(user_id, title="New Chat"):
+    res = await sessions.insert_one(session_doc(user_id, title))
     return str(res.inserted_id)
 
-def list_sessions(user_id):
+async def list_sessions(user_id):
     return [
         {"id": str(s["_id"]), "title": s["title"]}
-        for s in sessions.find({"user_id": user_id}).sort("updated_at", -1)
+        async for s in sessions.find({"user_id": user_id}).sort("updated_at", -1)
     ]
+
+
+async def begin_turn(session_id, language, title):
+    """
+    Record a new user message on the session in one round trip: bump message_count,
+    touch updated_at and remember the language. Returns the updated session (or {}).
+    The title is only written on the session's very first message.
+    """
+    # The previous turn's end_turn may still be queued
+    await write_behind.settle(session_id)
+    session = await sessions.find_one_and_update(
+        {"_id": ObjectId(session_id)},
+        {
+            "$inc": {"message_count": 1},
+            "$set": {"updated_at": datetime.utcnow(), "last_language": language}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if not session:
+        return {}
+
+    if session["message_count"] == 1 and session.get("title") == "New Chat":
+        await sessions.update_one(
+            {"_id": session["_id"], "title": "New Chat"},
+            {"$set": {"title": title}}
+        )
+        session["title"] = title
+    return session
+
+
+async def end_turn(session_id, updates=None, followup_asked=False):
+    """
+    Record the assistant's reply together with every session change made during
+    the turn (follow-up state etc.) in a single update, written behind the response.
+    """
+    updates = dict(updates or {})
+    inc = {"message_count": 1}
+    if followup_asked:
+        if "followup_count" in updates:
+            updates["followup_count"] += 1
+        else:
+            inc["followup_count"] = 1
+
+    change = {"$inc": inc}
+    if updates:
+        change["$set"] = updates
+    await write_behind.update_session(session_id, change)
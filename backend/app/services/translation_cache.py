@@ -0,0 +1,112 @@
+# app/services/translation_cache.py
+
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from app.core.config import TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL
+from app.db.mongo import translation_cache as translations
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, trimmed, single-spaced."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(source: str, target: str, text: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{source}:{target}:{digest}"
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache.
+    Tier 1: per-process LRU (sub-millisecond hits).
+    Tier 2: shared Mongo collection with a TTL index, so all workers and restarts benefit.
+    Mongo failures are logged and treated as misses - the cache never breaks translation.
+    """
+
+    def __init__(self, max_entries: int = TRANSLATION_CACHE_SIZE, ttl: int = TRANSLATION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (translation, expires_at)
+        self.counters = {
+            "memory_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "mongo_errors": 0,
+        }
+
+    def _remember(self, key, translation):
+        self._entries[key] = (translation, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def get(self, source: str, target: str, text: str):
+        key = cache_key(source, target, text)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            translation, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return translation
+            del self._entries[key]
+
+        try:
+            doc = await translations.find_one({"_id": key}, {"translation": 1, "created_at": 1})
+        except Exception as e:
+            print(f"⚠️ Translation cache lookup failed: {e}")
+            self.counters["mongo_errors"] += 1
+            doc = None
+
+        # The TTL monitor only runs once a minute, so check expiry ourselves too
+        if doc and doc["created_at"] > datetime.utcnow() - timedelta(seconds=self.ttl):
+            self._remember(key, doc["translation"])
+            self.counters["mongo_hits"] += 1
+            return doc["translation"]
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, source: str, target: str, text: str, translation: str):
+        key = cache_key(source, target, text)
+        self._remember(key, translation)
+        try:
+            await translations.update_one(
+                {"_id": key},
+                {"$set": {
+                    "source": source,
+                    "target": target,
+                    "translation": translation,
+                    "created_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️ Translation cache write failed: {e}")
+            self.counters["mongo_errors"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.counters["memory_hits"] + self.counters["mongo_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+translation_cache = TranslationCache()
@@ -0,0 +1,231 @@
+# app/services/write_behind.py
+
+import asyncio
+import time
+from collections import Counter
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.config import WRITE_BEHIND_INTERVAL_MS, WRITE_BEHIND_BATCH, WRITE_BEHIND_RETRY_DELAY
+from app.db.mongo import messages, sessions
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehind:
+    """
+    Write-behind queue for chat messages and end-of-turn session updates.
+    Writes are queued in memory and flushed as one insert_many/bulk_write every
+    few milliseconds (or as soon as a batch is full), so a turn never waits for
+    Mongo to acknowledge them. stop() flushes whatever is left.
+
+    Read-your-writes: pending_messages() lists messages that are not acknowledged
+    yet (history loads merge them in) and settle() flushes before a read that
+    must see a session's queued writes.
+
+    Batches that fail (e.g. Mongo unreachable) are put back at the front of the
+    queue and retried; writes the server rejects are logged and dropped. Retries
+    are idempotent: message inserts carry a client-side _id (duplicate keys are
+    ignored) and every session update a write id. The update pushes its id onto the
+    session's applied_writes and its filter skips sessions that already list it, so
+    a retried update (or several for one session in a batch) is applied once. The
+    list keeps the last max_batch ids: more than any one batch can hold.
+    Until start() is called every write goes straight to Mongo.
+    """
+
+    def __init__(self, interval_ms: float = WRITE_BEHIND_INTERVAL_MS, max_batch: int = WRITE_BEHIND_BATCH,
+                 retry_delay: float = WRITE_BEHIND_RETRY_DELAY):
+        self.interval = interval_ms / 1000
+        self.max_batch = max_batch
+        self.retry_delay = retry_delay
+        self._messages = []          # queued message docs
+        self._updates = []           # queued (session_id, UpdateOne)
+        self._unacked = {}           # _id -> message doc, queued or being written (insertion order)
+        self._pending = Counter()    # session_id -> queued writes not acknowledged yet
+        self._queued = asyncio.Event()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self.counters = {
+            "batches": 0,
+            "messages_written": 0,
+            "session_updates_written": 0,
+            "largest_batch": 0,
+            "flush_errors": 0,
+            "dropped": 0,
+        }
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def _size(self) -> int:
+        return len(self._messages) + len(self._updates)
+
+    def _wake(self):
+        self._queued.set()
+        if self._size() >= self.max_batch:
+            self._full.set()
+
+    async def insert_message(self, doc: dict):
+        """Queue a message document (it gets an _id here if it has none)."""
+        doc.setdefault("_id", ObjectId())
+        self._unacked[doc["_id"]] = doc
+        if not self.running:
+            try:
+                await messages.insert_one(doc)
+            finally:
+                self._unacked.pop(doc["_id"], None)
+            return
+        self._messages.append(doc)
+        self._pending[doc["session_id"]] += 1
+        self._wake()
+
+    async def update_session(self, session_id: str, change: dict):
+        """Queue an update of one session document (applied at most once, see the class docstring)."""
+        write_id = ObjectId()
+        query = {"_id": ObjectId(session_id), "applied_writes": {"$ne": write_id}}
+        change = {**change, "$push": {**change.get("$push", {}),
+                                      "applied_writes": {"$each": [write_id], "$slice": -self.max_batch}}}
+        if not self.running:
+            await sessions.update_one(query, change)
+            return
+        self._updates.append((session_id, UpdateOne(query, change)))
+        self._pending[session_id] += 1
+        self._wake()
+
+    def pending_messages(self, session_id: str) -> list:
+        """Messages of the session that Mongo has not acknowledged yet, oldest first."""
+        return [doc for doc in self._unacked.values() if doc["session_id"] == session_id]
+
+    async def settle(self, session_id: str):
+        """
+        Make the session's queued writes visible in Mongo before reading it directly.
+        Best effort: if the flush fails the writes stay queued and the read goes ahead.
+        """
+        if self._pending.get(session_id):
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Write-behind could not flush session {session_id} before a read: {e}")
+
+    def _acknowledged(self, session_ids):
+        for session_id in session_ids:
+            self._pending[session_id] -= 1
+            if self._pending[session_id] <= 0:
+                del self._pending[session_id]
+
+    async def _write_messages(self, docs: list):
+        try:
+            await messages.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: every other doc went in. A duplicate key means an earlier attempt
+            # already inserted it; any other write error will not go away on a retry.
+            rejected = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY]
+            for err in rejected:
+                print(f"[ERROR] Write-behind dropped a message: {err.get('errmsg')}")
+            self.counters["dropped"] += len(rejected)
+        for doc in docs:
+            self._unacked.pop(doc["_id"], None)
+        self._acknowledged(doc["session_id"] for doc in docs)
+        self.counters["messages_written"] += len(docs)
+
+    async def _write_updates(self, updates: list):
+        while updates:
+            try:
+                await sessions.bulk_write([op for _, op in updates], ordered=True)
+                done = len(updates)
+            except BulkWriteError as e:
+                # Ordered: everything before the first failing update was applied; the failing
+                # one is rejected by the server and dropped, the rest is sent again
+                err = e.details["writeErrors"][0]
+                print(f"[ERROR] Write-behind dropped a session update: {err.get('errmsg')}")
+                self.counters["dropped"] += 1
+                done = err["index"] + 1
+            self._acknowledged(session_id for session_id, _ in updates[:done])
+            self.counters["session_updates_written"] += done
+            del updates[:done]
+
+    async def flush(self):
+        """Write everything queued so far, batch by batch. Raises if a batch fails (it stays queued)."""
+        async with self._lock:
+            while self._messages or self._updates:
+                started = time.perf_counter()
+                docs, self._messages = self._messages[:self.max_batch], self._messages[self.max_batch:]
+                updates, self._updates = self._updates[:self.max_batch], self._updates[self.max_batch:]
+                size = len(docs) + len(updates)
+                if self._size() < self.max_batch:
+                    self._full.clear()
+                if not self._size():
+                    self._queued.clear()
+                try:
+                    if docs:
+                        await self._write_messages(docs)
+                        docs = []
+                    if updates:
+                        await self._write_updates(updates)
+                except BaseException as e:
+                    # Unwritten docs/updates go back to the front (also when cancelled mid-write)
+                    if isinstance(e, Exception):
+                        self.counters["flush_errors"] += 1
+                    self._messages[:0] = docs
+                    self._updates[:0] = updates
+                    self._wake()
+                    raise
+                self.counters["batches"] += 1
+                self.counters["largest_batch"] = max(self.counters["largest_batch"], size)
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _loop(self):
+        while True:
+            await self._queued.wait()
+            # Give the batch a few milliseconds to fill, unless it already is full
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Write-behind flush failed ({e}), {self._size()} writes queued; retrying in {self.retry_delay}s")
+                await asyncio.sleep(self.retry_delay)
+
+    def start(self):
+        if self._task is None:
+            # Fresh primitives: they bind to the event loop that first waits on them
+            self._queued, self._full, self._lock = asyncio.Event(), asyncio.Event(), asyncio.Lock()
+            if self._size():
+                self._wake()
+            self._task = asyncio.create_task(self._loop())
+            print(f"[SUCCESS] Write-behind started (every {self.interval * 1000:g} ms or {self.max_batch} writes)")
+
+    async def stop(self):
+        """Stop the background flusher and write out everything still queued."""
+        if self._task is None:
+            return
+        # Not in the middle of a batch: the flusher is cancelled while waiting for work
+        async with self._lock:
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await self.flush()
+            print("✅ Write-behind flushed on shutdown")
+        except Exception as e:
+            print(f"[ERROR] Write-behind could not flush on shutdown, {self._size()} writes lost: {e}")
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "running": self.running,
+            "queued_messages": len(self._messages),
+            "queued_session_updates": len(self._updates),
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+write_behind = WriteBehind()
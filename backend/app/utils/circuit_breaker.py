@@ -0,0 +1,77 @@
+"""
+Circuit breaker for a flaky dependency.
+After `failure_threshold` consecutive failures the circuit opens and calls are
+refused immediately; after `reset_timeout` seconds one trial call is let through
+(half-open) and its outcome closes or re-opens the circuit.
+"""
+
+import time
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.counters = {
+            "opened": 0,
+            "rejected": 0,
+        }
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. In half-open state only one trial call is allowed."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.counters["rejected"] += 1
+        return False
+
+    def check(self):
+        """allow(), raising CircuitOpenError when the call must not go out."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+
+    def abandon(self):
+        """The call never finished (e.g. cancelled): let the next caller be the trial."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"✅ {self.name} circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"⚠️ {self.name} circuit open after {self.failures} failures (retry in {self.reset_timeout}s)")
+                self.counters["opened"] += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+        }
@@ -1,40 +1,112 @@
 ﻿import re
+from app.utils.text_segmenter import SENTENCE_BREAK
+
+REFERENCE_KEYWORDS = [
+    "references", "reference",
+    "సూచనలు", "संदर्भ", "सन्दर्भ",
+    "குறிப்புகள்", "ಉಲ್ಲೇಖಗಳು", "റഫറൻസുകൾ"
+]
+
+# A line matching this (lowercased) is dropped: reference headers and pdf file names (any language)
+_DROP_LINE = re.compile("|".join(re.escape(k) for k in REFERENCE_KEYWORDS + [".pdf", "पीडीएफ"]))
+_LONGEST_MARKER = max(len(k) for k in REFERENCE_KEYWORDS + [".pdf", "पीडीएफ"])
+_CITATION = re.compile(r"\[\d+\]")
+_SINGLE_STAR = re.compile(r"(?<!\*)\*(?!\*)")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _drop_line(line: str) -> bool:
+    return _DROP_LINE.search(line.lower()) is not None
+
+
+def _clean_text(text: str) -> str:
+    # Remove citation numbers like [1]
+    text = _CITATION.sub("", text)
+    # Remove markdown bold/italic markers
+    text = text.replace("**", "").replace("__", "")
+    return _SINGLE_STAR.sub("", text)
 
 
 def clean_response(text):
     # Remove reference sections, pdf filenames, citations, and markdown noise
-    lines = text.splitlines()
-    cleaned_lines = []
+    text = "\n".join(_clean_text(line) for line in text.splitlines() if not _drop_line(line))
 
-    reference_keywords = [
-        "references", "reference",
-        "సూచనలు", "संदर्भ", "सन्दर्भ",
-        "குறிப்புகள்", "ಉಲ್ಲೇಖಗಳು", "റഫറൻസുകൾ"
-    ]
+    # Collapse excessive blank lines
+    text = _BLANK_LINES.sub("\n\n", text)
 
-    for line in lines:
-        lower = line.lower()
+    return text.strip()
 
-        # Drop any line that looks like a reference header
-        if any(k in lower for k in reference_keywords):
-            continue
 
-        # Drop any line containing pdf file names (any language)
-        if ".pdf" in lower or "पीडीएफ" in line:
-            continue
+class StreamCleaner:
+    """
+    clean_response() for an answer that arrives in chunks.
+    feed() returns the cleaned text that is final so far and finish() the rest;
+    together they give the same result as clean_response() on the whole answer.
 
-        # Remove citation numbers like [1]
-        line = re.sub(r"\[\d+\]", "", line)
+    A line is held only until it has a complete sentence (or ends), so output is
+    ready as soon as a sentence splitter downstream could use it; whole sentences
+    never cut a citation or a ** marker. If a reference keyword or pdf name shows
+    up after part of a line went out, the rest of that line is dropped.
+    """
 
-        # Remove markdown bold/italic markers
-        line = line.replace("**", "").replace("__", "")
-        line = re.sub(r"(?<!\*)\*(?!\*)", "", line)
+    def __init__(self):
+        self._line = ""          # current line, not yet released
+        self._line_seen = ""     # all of the current line so far (keyword matching)
+        self._dropping = False   # current line turned out to be a reference line
+        self._started = False    # any non-whitespace text emitted yet
+        self._trailing = ""      # whitespace held back until more text follows
 
-        cleaned_lines.append(line)
+    def _out(self, text: str) -> str:
+        """Apply the blank-line collapse and the outer strip to emitted text."""
+        if not text.strip():
+            self._trailing += text
+            return ""
+        stripped = text.rstrip() if self._started else text.strip()
+        lead = self._trailing if self._started else ""
+        self._trailing = text[len(text.rstrip()):]
+        self._started = True
+        # \n{3,} only ever spans held whitespace and the start of `text`
+        return _BLANK_LINES.sub("\n\n", lead + stripped)
 
-    text = "\n".join(cleaned_lines)
+    def _release(self, text: str) -> str:
+        return self._out(_clean_text(text))
 
-    # Collapse excessive blank lines
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    def _end_line(self) -> str:
+        out = ""
+        if not self._dropping:
+            out = self._release(self._line) + self._out("\n")
+        self._line = self._line_seen = ""
+        self._dropping = False
+        return out
 
-    return text.strip()
+    def feed(self, chunk: str) -> str:
+        out = []
+        lines = chunk.split("\n")
+        for i, part in enumerate(lines):
+            if i:
+                out.append(self._end_line())
+            if self._dropping:
+                continue
+            # Only the new text and a marker's length before it can hold a new match
+            tail = self._line_seen[-_LONGEST_MARKER:] + part
+            self._line += part
+            self._line_seen += part
+            if _drop_line(tail):
+                self._dropping = True
+                self._line = ""
+                continue
+            # Release whole sentences; the unfinished one waits for more text
+            cut = 0
+            for m in SENTENCE_BREAK.finditer(self._line):
+                cut = m.end()
+            if cut:
+                out.append(self._release(self._line[:cut]))
+                self._line = self._line[cut:]
+        return "".join(out)
+
+    def finish(self) -> str:
+        """Flush the last line; trailing whitespace is dropped like clean_response's strip()."""
+        out = "" if self._dropping else self._release(self._line)
+        self._line = self._line_seen = self._trailing = ""
+        self._dropping = False
+        return out
@@ -3,6 +3,8 @@ Domain-specific dictionary translator for agricultural terms
 Translates Telugu ↔ English for better LLM understanding
 """
 
+from app.utils.term_matcher import TermMatcher
+
 # Dictionary mapping Telugu agricultural terms to English and vice versa
 DOMAIN_DICTIONARY = {
 
@@ -192,48 +194,64 @@ DOMAIN_DICTIONARY = {
 }
 
 
+def is_telugu(text: str) -> bool:
+    return any('\u0C00' <= c <= '\u0C7F' for c in text)
+
+
+def _build_matchers(dictionary: dict):
+    """
+    Compile both translation directions from the dictionary.
+
+    Telugu → English folds the old two-step flow into one mapping: colloquial Telugu
+    terms are first normalized to their standard Telugu form, then mapped to the
+    first English translation of that form (or left normalized if it has none).
+    """
+    to_english = {}
+    to_telugu = {}
+
+    for term, translations in dictionary.items():
+        if not translations:
+            continue
+        if is_telugu(term):
+            first = translations[0]
+            if is_telugu(first):
+                # Telugu→Telugu normalization, then translate the standard term if possible
+                normalized_translations = dictionary.get(first, [])
+                english = next((t for t in normalized_translations if not is_telugu(t)), first)
+            else:
+                english = next((t for t in translations if not is_telugu(t)), None)
+            if english is not None:
+                to_english[term] = english
+        elif is_telugu(translations[0]):
+            to_telugu[term] = translations[0]
+
+    return TermMatcher(to_english), TermMatcher(to_telugu)
+
+
+# (Telugu→English, English→Telugu), swapped as one tuple on reload
+_MATCHERS = _build_matchers(DOMAIN_DICTIONARY)
+
+
+def reload_dictionary(dictionary: dict = None):
+    """
+    Rebuild the compiled matchers, optionally replacing the dictionary.
+    Safe to call while requests are in flight: readers see either the old
+    or the new matchers, never a half-built one.
+    """
+    global DOMAIN_DICTIONARY, _MATCHERS
+    source = dict(dictionary) if dictionary is not None else dict(DOMAIN_DICTIONARY)
+    matchers = _build_matchers(source)
+    DOMAIN_DICTIONARY, _MATCHERS = source, matchers
+    print(f"📖 Domain dictionary loaded: {len(matchers[0])} → English, {len(matchers[1])} → Telugu terms")
+
+
 def translate_to_english(text: str) -> str:
     """
     Translate Telugu agricultural terms to English before sending to LLM
-    Step 1: Normalize Telugu terms (colloquial → standard)
-    Step 2: Translate Telugu terms to English
+    Colloquial Telugu terms are normalized and translated in the same pass
     This helps LLM understand domain-specific terminology better
     """
-    translated_text = text
-    
-    # Sort by length (longest first) to avoid partial matches
-    terms = sorted(DOMAIN_DICTIONARY.keys(), key=len, reverse=True)
-    
-    # Step 1: Telugu→Telugu normalization (colloquial terms to standard terms)
-    for term in terms:
-        if term in translated_text:
-            # Check if this is a Telugu term mapping to another Telugu term
-            if any('\u0C00' <= c <= '\u0C7F' for c in term):
-                translations = DOMAIN_DICTIONARY[term]
-                if translations:
-                    first_translation = translations[0]
-                    # If target is also Telugu (normalization), apply it
-                    if any('\u0C00' <= c <= '\u0C7F' for c in first_translation):
-                        translated_text = translated_text.replace(term, first_translation)
-                        print(f"📖 Normalized Telugu: '{term}' → '{first_translation}'")
-    
-    # Step 2: Telugu→English translation for LLM
-    terms = sorted(DOMAIN_DICTIONARY.keys(), key=len, reverse=True)
-    for term in terms:
-        if term in translated_text:
-            # Check if this is a Telugu term (has Telugu characters)
-            if any('\u0C00' <= c <= '\u0C7F' for c in term):
-                # Get English translation
-                english_terms = DOMAIN_DICTIONARY[term]
-                if english_terms:
-                    # Find first English translation (no Telugu characters)
-                    for english_term in english_terms:
-                        if not any('\u0C00' <= c <= '\u0C7F' for c in english_term):
-                            translated_text = translated_text.replace(term, english_term)
-                            print(f"📖 Translated to English: '{term}' → '{english_term}'")
-                            break
-    
-    return translated_text
+    return _MATCHERS[0].replace(text)
 
 
 def translate_to_telugu(text: str, original_language: str = "telugu") -> str:
@@ -243,31 +261,15 @@ def translate_to_telugu(text: str, original_language: str = "telugu") -> str:
     """
     if original_language != "telugu":
         return text  # Don't translate if not Telugu conversation
-    
-    translated_text = text
-    
-    # Sort by length (longest first) to avoid partial matches
-    terms = sorted(DOMAIN_DICTIONARY.keys(), key=len, reverse=True)
-    
-    for term in terms:
-        if term in translated_text:
-            # Check if this is an English term (no Telugu characters)
-            if not any('\u0C00' <= c <= '\u0C7F' for c in term):
-                # Get Telugu translation
-                telugu_terms = DOMAIN_DICTIONARY[term]
-                if telugu_terms and any('\u0C00' <= c <= '\u0C7F' for c in telugu_terms[0]):
-                    telugu_term = telugu_terms[0]  # Use first translation
-                    translated_text = translated_text.replace(term, telugu_term)
-                    print(f"📖 Translated back: '{term}' → '{telugu_term}'")
-    
-    return translated_text
+
+    return _MATCHERS[1].replace(text)
 
 
 def get_telugu_equivalent(english_term: str) -> str:
     """Get Telugu equivalent for an English term if exists"""
     if english_term in DOMAIN_DICTIONARY:
         telugu_terms = DOMAIN_DICTIONARY[english_term]
-        if telugu_terms and any('\u0C00' <= c <= '\u0C7F' for c in telugu_terms[0]):
+        if telugu_terms and is_telugu(telugu_terms[0]):
             return telugu_terms[0]
     return english_term
 
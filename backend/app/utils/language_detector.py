@@ -1,41 +1,84 @@
 # app/utils/language_detector.py
 
-import re
+from collections import Counter
+from dataclasses import dataclass, field
 
-def detect_language(text: str) -> str:
+# Each supported script occupies one 128-code-point Unicode block, so `ord(c) >> 7`
+# identifies the script with a single dict lookup. Order matters for ties.
+SCRIPT_BLOCKS = {
+    0x0C00 >> 7: 'telugu',      # తెలుగు
+    0x0B80 >> 7: 'tamil',       # தமிழ்
+    0x0C80 >> 7: 'kannada',     # ಕನ್ನಡ
+    0x0D00 >> 7: 'malayalam',   # മലയാളം
+    0x0980 >> 7: 'bengali',     # বাংলা
+    0x0A80 >> 7: 'gujarati',    # ગુજરાતી
+    0x0A00 >> 7: 'punjabi',     # ਪੰਜਾਬੀ
+    0x0B00 >> 7: 'odia',        # ଓଡ଼ିଆ
+    0x0900 >> 7: 'hindi',       # हिंदी / मराठी (Devanagari script)
+}
+SCRIPT_ORDER = list(SCRIPT_BLOCKS.values())
+
+DEFAULT_THRESHOLD = 0.3     # share of letters a script needs to win
+MIXED_THRESHOLD = 0.2       # share the "other" script needs for a code-mixed result
+
+
+@dataclass
+class LanguageProfile:
+    language: str                                   # dominant language
+    ratios: dict = field(default_factory=dict)      # script → share of letters ("latin" included)
+    mixed: bool = False                             # e.g. code-mixed Telugu/English
+
+
+def analyze_language(text: str, threshold: float = DEFAULT_THRESHOLD, mixed_threshold: float = MIXED_THRESHOLD) -> LanguageProfile:
+    """
+    One-pass code-point histogram over the text.
+    Counter() tallies characters in C; the Python loop then only visits distinct characters.
+    Letters are counted like the old `[^\s\W\d]` regex; script shares include combining
+    vowel signs, so (as before) an Indic share can exceed 1.0.
+    """
+    total_chars = 0
+    latin_chars = 0
+    script_chars = dict.fromkeys(SCRIPT_ORDER, 0)
+
+    for c, n in Counter(text).items():
+        if (c.isalnum() or c == '_') and not c.isdecimal():
+            total_chars += n
+            if c.isascii():
+                latin_chars += n
+        script = SCRIPT_BLOCKS.get(ord(c) >> 7)
+        if script:
+            script_chars[script] += n
+
+    if total_chars == 0:
+        return LanguageProfile('english')
+
+    ratios = {script: count / total_chars for script, count in script_chars.items() if count}
+    latin_ratio = latin_chars / total_chars
+    if latin_chars:
+        ratios['latin'] = latin_ratio
+
+    dominant = 'english'
+    best = threshold
+    for script in SCRIPT_ORDER:
+        ratio = ratios.get(script, 0.0)
+        if ratio > best:
+            dominant, best = script, ratio
+
+    if dominant == 'english':
+        mixed = any(ratios.get(script, 0.0) >= mixed_threshold for script in SCRIPT_ORDER)
+    else:
+        mixed = latin_ratio >= mixed_threshold
+
+    return LanguageProfile(dominant, ratios, mixed)
+
+
+def detect_language(text: str, threshold: float = DEFAULT_THRESHOLD) -> str:
     """
     Detect Indian language from text using Unicode ranges.
     Supports: Telugu, Tamil, Kannada, Malayalam, Hindi, Marathi, Bengali, Gujarati, Punjabi, Odia, English
     Returns: language code string
     """
-    text = text.strip()
-    
-    # Count total characters (excluding spaces and punctuation)
-    total_chars = len(re.findall(r'[^\s\W\d]', text))
-    
-    if total_chars == 0:
-        return 'english'
-    
-    # Define language Unicode ranges
-    languages = {
-        'telugu': r'[\u0C00-\u0C7F]',      # తెలుగు
-        'tamil': r'[\u0B80-\u0BFF]',       # தமிழ்
-        'kannada': r'[\u0C80-\u0CFF]',     # ಕನ್ನಡ
-        'malayalam': r'[\u0D00-\u0D7F]',   # മലയാളം
-        'bengali': r'[\u0980-\u09FF]',     # বাংলা
-        'gujarati': r'[\u0A80-\u0AFF]',    # ગુજરાતી
-        'punjabi': r'[\u0A00-\u0A7F]',     # ਪੰਜਾਬੀ
-        'odia': r'[\u0B00-\u0B7F]',        # ଓଡ଼ିଆ
-        'hindi': r'[\u0900-\u097F]',       # हिंदी / मराठी (Devanagari script)
-    }
-    
-    # Check each language (30% threshold)
-    for lang, pattern in languages.items():
-        lang_chars = len(re.findall(pattern, text))
-        if lang_chars / total_chars > 0.3:
-            return lang
-    
-    return 'english'
+    return analyze_language(text, threshold).language
 
 
 def get_language_instruction(language: str) -> str:
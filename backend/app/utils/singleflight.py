@@ -0,0 +1,60 @@
+"""
+Single-flight call coalescing.
+Concurrent callers asking for the same key share one in-flight call and all
+receive its result (or its exception), instead of each repeating the work.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """
+    Per-key deduplication of concurrent async calls.
+
+    The first caller for a key (the leader) starts the call as a task; callers
+    arriving while it runs wait on that task. The task is shielded, so a caller
+    that gets cancelled (e.g. a client disconnect) does not cancel it for the others.
+    The key is released as soon as the call finishes - results are not cached.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> asyncio.Task
+        self.counters = {
+            "leaders": 0,
+            "deduplicated": 0,
+            "errors": 0,
+        }
+
+    def __contains__(self, key):
+        return key in self._calls
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.counters["errors"] += 1
+
+    async def do(self, key, factory):
+        """
+        Run factory() once per key at a time.
+        Returns (result, shared): shared is True when this caller joined another
+        caller's in-flight call instead of running factory itself.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.counters["deduplicated"] += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.create_task(factory())
+        self._calls[key] = task
+        task.add_done_callback(lambda t: self._finished(key, t))
+        self.counters["leaders"] += 1
+        return await asyncio.shield(task), False
+
+    def stats(self) -> dict:
+        calls = self.counters["leaders"] + self.counters["deduplicated"]
+        return {
+            **self.counters,
+            "in_flight": len(self._calls),
+            "dedup_rate": round(self.counters["deduplicated"] / calls, 4) if calls else 0.0,
+        }
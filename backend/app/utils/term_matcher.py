@@ -0,0 +1,93 @@
+"""
+Aho-Corasick multi-pattern matcher.
+Built once for a fixed set of terms; every lookup is a single pass over the text,
+independent of how many terms there are.
+"""
+
+
+class TermMatcher:
+    """
+    Compiled automaton over a mapping of term → replacement.
+
+    replace() performs leftmost-longest, non-overlapping substitution in one pass,
+    which is what the old "sort by length, str.replace each term" loop approximated.
+    """
+
+    def __init__(self, replacements: dict):
+        self.replacements = dict(replacements)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for term in self.replacements:
+            if term:
+                self._add(term)
+        self._link()
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def _add(self, term: str):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = self._out[state] + (term,)
+
+    def _link(self):
+        # Breadth-first over the trie: a state's failure link points at the longest
+        # proper suffix that is also a trie path; outputs are inherited along it.
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """Yield (start, term) for every occurrence, overlapping ones included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term in out[state]:
+                yield i - len(term) + 1, term
+
+    def replace(self, text: str) -> str:
+        """Replace every leftmost-longest, non-overlapping term occurrence."""
+        if not text or not self.replacements:
+            return text
+
+        longest = {}
+        for start, term in self.iter_matches(text):
+            if len(term) > len(longest.get(start, "")):
+                longest[start] = term
+        if not longest:
+            return text
+
+        pieces = []
+        pos = 0
+        for start in sorted(longest):
+            if start < pos:
+                continue
+            term = longest[start]
+            pieces.append(text[pos:start])
+            pieces.append(self.replacements[term])
+            pos = start + len(term)
+        pieces.append(text[pos:])
+        return "".join(pieces)
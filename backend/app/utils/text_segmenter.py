@@ -0,0 +1,128 @@
+# app/utils/text_segmenter.py
+"""
+Split long answers into independently translatable segments.
+Markdown structure (headings, bullets, numbering, quotes, line breaks) stays
+outside the segments and is copied through untouched, so translating the
+segments and joining everything back in order rebuilds the same layout.
+"""
+
+import re
+from dataclasses import dataclass
+from app.services.chat_rules import KNOWLEDGE_PRODUCTS, DOSAGE_PRODUCTS, DOSAGE_TELUGU_PRODUCTS, FACTUAL_ENTITIES
+from app.utils.domain_translator import DOMAIN_DICTIONARY
+from app.utils.term_matcher import TermMatcher
+
+# A sentence ends at ./!/?/। (or ॥) followed by whitespace
+SENTENCE_BREAK = re.compile(r"(?<=[.!?।॥])[ \t]+|\n+")
+
+# Leading markdown a translator would mangle or drop: "## ", "- ", "* ", "1. ", "2) ", "> "
+_MARKDOWN_PREFIX = re.compile(r"^[ \t]*(?:(?:#{1,6}|[-*+•]|\d{1,3}[.)]|>)[ \t]+)*")
+_HAS_LETTER = re.compile(r"[^\W\d_]")
+
+# Names that must never be cut in two by a length split
+_PROTECTED = TermMatcher({
+    term.lower(): term
+    for term in KNOWLEDGE_PRODUCTS + DOSAGE_PRODUCTS + DOSAGE_TELUGU_PRODUCTS + FACTUAL_ENTITIES + list(DOMAIN_DICTIONARY)
+    if " " in term or "-" in term or "." in term
+})
+
+
+@dataclass
+class Piece:
+    text: str
+    translate: bool
+
+
+def _protected_spans(text: str) -> list:
+    lowered = text.lower()
+    return [(start, start + len(term)) for start, term in _PROTECTED.iter_matches(lowered)]
+
+
+def _inside(pos: int, spans: list) -> bool:
+    return any(start < pos < end for start, end in spans)
+
+
+def _hard_split(sentence: str, max_chars: int) -> list:
+    """Cut an over-long sentence at whitespace, never inside a protected name."""
+    parts = []
+    while len(sentence) > max_chars:
+        spans = _protected_spans(sentence)
+        cut = max(
+            (m.start() for m in re.finditer(r"\s", sentence[:max_chars + 1]) if not _inside(m.start(), spans)),
+            default=None
+        )
+        if not cut:
+            break  # one unbroken run; hand it over whole
+        parts.append(sentence[:cut])
+        sentence = sentence[cut:]
+    parts.append(sentence)
+    return parts
+
+
+def _segment(chunk: str) -> list:
+    # Surrounding whitespace stays outside the segment (translators strip it)
+    core = chunk.strip()
+    lead = chunk[:len(chunk) - len(chunk.lstrip())]
+    return [Piece(lead, False), Piece(core, True), Piece(chunk[len(lead) + len(core):], False)]
+
+
+def _split_block(block: str, max_chars: int) -> list:
+    """Pack the sentences of one block into segments of at most max_chars."""
+    if len(block) <= max_chars:
+        return [p for p in _segment(block) if p.text]
+
+    spans = _protected_spans(block)
+    sentences, pos = [], 0
+    for m in SENTENCE_BREAK.finditer(block):
+        if _inside(m.start(), spans):
+            continue
+        sentences.append((block[pos:m.start()], m.group()))
+        pos = m.end()
+    sentences.append((block[pos:], ""))
+
+    pieces, current = [], ""
+    for sentence, separator in sentences:
+        for part in _hard_split(sentence, max_chars):
+            if current.strip() and len(current) + len(part) > max_chars:
+                pieces.extend(_segment(current))
+                current = ""
+            current += part
+        current += separator
+    if current:
+        pieces.extend(_segment(current))
+    return [p for p in pieces if p.text]
+
+
+def segment_text(text: str, max_chars: int) -> list:
+    """
+    Split text into Pieces: translatable segments (a paragraph, or sentences of a
+    long paragraph packed up to max_chars) and the markdown/whitespace around them.
+    "".join(p.text for p in pieces) == text.
+    """
+    pieces = []
+    paragraph = []  # plain lines of the current paragraph
+
+    def flush():
+        if paragraph:
+            body = "".join(paragraph)
+            content = body.rstrip()
+            pieces.extend(_split_block(content, max_chars) if _HAS_LETTER.search(content) else [Piece(content, False)])
+            pieces.append(Piece(body[len(content):], False))
+            paragraph.clear()
+
+    for line in text.splitlines(keepends=True):
+        prefix = _MARKDOWN_PREFIX.match(line).group()
+        content = line[len(prefix):].rstrip()
+        if not content:
+            flush()
+            pieces.append(Piece(line, False))
+        elif prefix.strip() or not _HAS_LETTER.search(content):
+            # Headings, list items and number-only lines stand alone so their markers survive
+            flush()
+            pieces.append(Piece(prefix, False))
+            pieces.extend(_split_block(content, max_chars) if _HAS_LETTER.search(content) else [Piece(content, False)])
+            pieces.append(Piece(line[len(prefix) + len(content):], False))
+        else:
+            paragraph.append(line)
+    flush()
+    return [p for p in pieces if p.text]
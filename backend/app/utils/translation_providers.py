@@ -0,0 +1,98 @@
+# app/utils/translation_providers.py
+"""
+Machine-translation providers behind translate_text().
+A provider is a synchronous translate(text, source, target) that translate_text
+runs in a worker thread; adding a backend means subclassing TranslationProvider
+and registering it in PROVIDERS (selected with TRANSLATOR_PROVIDER).
+"""
+
+import threading
+import time
+from collections import defaultdict
+from deep_translator import GoogleTranslator
+from app.core.config import TRANSLATOR_PROVIDER, TRANSLATOR_POOL_SIZE, TRANSLATOR_STUB_LATENCY
+
+
+class TranslationProvider:
+    name = "base"
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class GoogleProvider(TranslationProvider):
+    """
+    deep_translator's GoogleTranslator with a pool of reusable instances per
+    language pair. An instance keeps per-call state, so each one serves a single
+    thread at a time; idle instances are reused instead of rebuilt for every call.
+    """
+
+    name = "google"
+
+    def __init__(self, pool_size: int = TRANSLATOR_POOL_SIZE):
+        self.pool_size = pool_size
+        self._idle = defaultdict(list)  # (source, target) -> [GoogleTranslator]
+        self._lock = threading.Lock()
+        self.counters = {"created": 0, "reused": 0}
+
+    def _acquire(self, source: str, target: str):
+        with self._lock:
+            idle = self._idle[(source, target)]
+            if idle:
+                self.counters["reused"] += 1
+                return idle.pop()
+            self.counters["created"] += 1
+        return GoogleTranslator(source=source, target=target)
+
+    def _release(self, source: str, target: str, translator):
+        with self._lock:
+            idle = self._idle[(source, target)]
+            if len(idle) < self.pool_size:
+                idle.append(translator)
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        translator = self._acquire(source, target)
+        try:
+            return translator.translate(text)
+        finally:
+            self._release(source, target, translator)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = sum(len(v) for v in self._idle.values())
+        return {**self.counters, "idle_instances": idle}
+
+
+class StubProvider(TranslationProvider):
+    """Offline stand-in for tests and benchmarks: returns the text unchanged after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, latency: float = TRANSLATOR_STUB_LATENCY):
+        self.latency = latency
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        time.sleep(self.latency)
+        return text
+
+
+PROVIDERS = {
+    "google": GoogleProvider,
+    "stub": StubProvider,
+}
+
+_provider = None
+
+
+def get_provider() -> TranslationProvider:
+    """The configured provider (created on first use)."""
+    global _provider
+    if _provider is None:
+        if TRANSLATOR_PROVIDER not in PROVIDERS:
+            raise ValueError(f"Unknown TRANSLATOR_PROVIDER '{TRANSLATOR_PROVIDER}' (expected one of {sorted(PROVIDERS)})")
+        _provider = PROVIDERS[TRANSLATOR_PROVIDER]()
+        print(f"[SUCCESS] Translator provider: {_provider.name}")
+    return _provider
@@ -0,0 +1,153 @@
+# app/utils/translator.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from app.core.config import (
+    TRANSLATOR_CONCURRENCY,
+    TRANSLATOR_TIMEOUT,
+    TRANSLATOR_QUEUE_TIMEOUT,
+    TRANSLATOR_BREAKER_THRESHOLD,
+    TRANSLATOR_BREAKER_RESET,
+    TRANSLATION_SEGMENT_CHARS,
+    TRANSLATION_PARALLEL_SEGMENTS
+)
+from app.services.translation_cache import translation_cache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.text_segmenter import segment_text
+from app.utils.translation_providers import get_provider
+
+# Language name (as returned by detect_language) → translator language code
+LANG_CODE_MAP = {
+    "telugu": "te", "tamil": "ta", "kannada": "kn", "malayalam": "ml",
+    "hindi": "hi", "marathi": "mr", "bengali": "bn", "gujarati": "gu",
+    "punjabi": "pa", "odia": "or",
+    "english": "en"
+}
+
+
+@dataclass
+class LocalizedText:
+    """A piece of text together with the language it is actually written in."""
+    text: str
+    language: str
+
+
+# Every provider call in the process shares these: at most TRANSLATOR_CONCURRENCY calls
+# in flight, and once the provider keeps failing, callers fail fast for a while
+# (and fall back to English with domain terms) instead of each waiting out the timeout
+_provider_slots = asyncio.Semaphore(TRANSLATOR_CONCURRENCY)
+# Own worker threads, so translations neither wait behind nor starve other to_thread work
+_provider_threads = ThreadPoolExecutor(max_workers=TRANSLATOR_CONCURRENCY, thread_name_prefix="translator")
+translator_breaker = CircuitBreaker("Translator", TRANSLATOR_BREAKER_THRESHOLD, TRANSLATOR_BREAKER_RESET)
+TRANSLATOR_COUNTERS = {
+    "calls": 0,
+    "failures": 0,
+    "timeouts": 0,
+    "queue_timeouts": 0,
+}
+
+
+def lang_code(language: str) -> str:
+    """Map a language name to its translator code, defaulting to English."""
+    return LANG_CODE_MAP.get(language, "en")
+
+
+async def translate_text(text: str, source: str = "auto", target: str = "en", use_cache: bool = True) -> str:
+    """
+    Translate text without blocking the event loop.
+    Results are served from the translation cache when possible; on a miss the
+    configured provider runs in a worker thread and the result is cached.
+    A miss waits at most TRANSLATOR_QUEUE_TIMEOUT for a provider slot and then
+    TRANSLATOR_TIMEOUT for the provider, and raises CircuitOpenError right away
+    while the provider is considered down.
+    """
+    if not text or not text.strip():
+        return text
+
+    if use_cache:
+        cached = await translation_cache.get(source, target, text)
+        if cached is not None:
+            return cached
+
+    translator_breaker.check()
+    translated = await _call_provider(text, source, target)
+
+    if use_cache and translated:
+        await translation_cache.set(source, target, text, translated)
+    return translated
+
+
+async def _call_provider(text: str, source: str, target: str) -> str:
+    provider = get_provider()
+    TRANSLATOR_COUNTERS["calls"] += 1
+
+    # Waiting for a slot is our own backlog, not the provider failing: bounded on its
+    # own and never recorded by the breaker (a burst must not open the circuit)
+    try:
+        await asyncio.wait_for(_provider_slots.acquire(), timeout=TRANSLATOR_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        TRANSLATOR_COUNTERS["queue_timeouts"] += 1
+        translator_breaker.abandon()
+        raise TimeoutError(f"No translator slot free within {TRANSLATOR_QUEUE_TIMEOUT}s")
+    except asyncio.CancelledError:
+        translator_breaker.abandon()
+        raise
+
+    try:
+        # The provider's deadline starts once it has a slot. The worker thread cannot
+        # be interrupted; on timeout it finishes in the background
+        translated = await asyncio.wait_for(
+            asyncio.get_running_loop().run_in_executor(_provider_threads, provider.translate, text, source, target),
+            timeout=TRANSLATOR_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        TRANSLATOR_COUNTERS["timeouts"] += 1
+        translator_breaker.record_failure()
+        raise TimeoutError(f"Translation timed out after {TRANSLATOR_TIMEOUT}s")
+    except asyncio.CancelledError:
+        translator_breaker.abandon()
+        raise
+    except Exception:
+        TRANSLATOR_COUNTERS["failures"] += 1
+        translator_breaker.record_failure()
+        raise
+    finally:
+        _provider_slots.release()
+
+    translator_breaker.record_success()
+    return translated
+
+
+def translator_stats() -> dict:
+    return {
+        **TRANSLATOR_COUNTERS,
+        "provider": get_provider().name,
+        **get_provider().stats(),
+        "breaker": translator_breaker.stats(),
+    }
+
+
+async def translate_long(text: str, source: str = "auto", target: str = "en", use_cache: bool = True) -> str:
+    """
+    Translate a long, multi-paragraph answer segment by segment.
+    The text is split at paragraph (then sentence) boundaries with markdown markers
+    kept out of the segments; segments are translated concurrently, at most
+    TRANSLATION_PARALLEL_SEGMENTS at a time, and reassembled in order. Latency then
+    follows the slowest paragraph instead of the whole blob, and no single request
+    comes near the translator's length limit. Raises if any segment fails.
+    """
+    if not text or len(text) <= TRANSLATION_SEGMENT_CHARS:
+        return await translate_text(text, source=source, target=target, use_cache=use_cache)
+
+    pieces = segment_text(text, TRANSLATION_SEGMENT_CHARS)
+    slots = asyncio.Semaphore(TRANSLATION_PARALLEL_SEGMENTS)
+
+    async def translate_piece(piece):
+        if not piece.translate:
+            return piece.text
+        async with slots:
+            return await translate_text(piece.text, source=source, target=target, use_cache=use_cache)
+
+    translated = await asyncio.gather(*(translate_piece(p) for p in pieces))
+    return "".join(translated)
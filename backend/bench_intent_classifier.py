@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the intent classifier
+Measures classification throughput of the compiled one-pass
+classify_intent(), with and without its lru_cache
+
+Run from the backend folder:  python bench_intent_classifier.py [iterations]
+"""
+
+import sys
+import time
+
+from app.services.chat_rules import classify_intent
+
+MESSAGES = [
+    "hi",
+    "Good morning, how are you?",
+    "what is P-Factor",
+    "k factor",
+    "what is its dosage",
+    "Who is the CEO of Biofactor?",
+    "my paddy leaves are turning yellow with brown spots",
+    "how to increase yield in cotton",
+    "tell me all dosages we discussed so far",
+    "ఇన్విక్టస్ మోతాదు ఎంత వాడాలి",
+    "పసుపు ఆకులు వస్తున్నాయి, ఏమి చేయాలి?",
+    "बायोफैक्टर के बारे में बताइए",
+    "मेरी फसल में कीट लग गए हैं",
+    "Benefits of Bio NPK for groundnut crop in sandy soil during rabi season",
+]
+
+
+def run(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            fn(message)
+    elapsed = time.perf_counter() - start
+    calls = iterations * len(MESSAGES)
+    print(f"{label:<34} {calls / elapsed:>12,.0f} msg/s   {elapsed / calls * 1e6:8.1f} µs/msg")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("=" * 70)
+    print("INTENT CLASSIFIER BENCHMARK")
+    print("=" * 70)
+
+    for message in MESSAGES:
+        print(f"  {classify_intent(message).branch:<10} {message}")
+    print()
+
+    # Uncached: measures the actual scan, not the lru_cache lookup
+    uncached = classify_intent.__wrapped__
+    run("classify_intent (one pass)", uncached, iterations)
+    run("classify_intent (cached)", classify_intent, iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import os
 import json
 import uuid
 import asyncio
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from dotenv import load_dotenv
 from fastapi import FastAPI, Header, HTTPException
@@ -19,8 +20,28 @@ WRAPPER_API_KEY = os.getenv("WRAPPER_API_KEY", "")     # optional wrapper auth
 LIGHTRAG_API_KEY = os.getenv("LIGHTRAG_API_KEY", "")   # optional LightRAG auth
 WRAPPER_PORT = int(os.getenv("WRAPPER_PORT", "8080"))
 HTTP_TIMEOUT = int(os.getenv("WRAPPER_TIMEOUT", "60"))
-
-app = FastAPI(title="Agora-compatible Custom LLM Wrapper")
+HTTP_POOL_SIZE = int(os.getenv("WRAPPER_POOL_SIZE", "50"))  # max connections to LightRAG
+# passthrough: forward every LightRAG delta the moment it arrives (lowest time-to-first-token)
+# chunked: re-split the text into 6-word chunks (previous behaviour)
+STREAM_MODE = os.getenv("WRAPPER_STREAM_MODE", "passthrough")
+
+# Shared connection pool to LightRAG, opened and closed with the app
+http_client: httpx.AsyncClient | None = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+    )
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+        http_client = None
+
+app = FastAPI(title="Agora-compatible Custom LLM Wrapper", lifespan=lifespan)
 
 # Input models
 class ChatMessage(BaseModel):
@@ -47,8 +68,48 @@ def chunk_text_by_words(text: str, words_per_chunk: int = 6):
         yield " ".join(words[i:i+words_per_chunk])
 
 async def call_lightrag_query(payload, headers):
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        return await client.post(LIGHTRAG_URL, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+    return await http_client.post(LIGHTRAG_URL, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+
+def extract_stream_text(line: str) -> str:
+    """Text carried by one line of the LightRAG stream (NDJSON, an Agora-style chunk or raw text)"""
+    try:
+        parsed = json.loads(line)
+    except Exception:
+        parsed = None
+
+    # Not JSON — treat as raw text
+    if not isinstance(parsed, dict):
+        return line
+
+    # Case A: parsed is already an Agora-style chunk object
+    if parsed.get("object") == "chat.completion.chunk":
+        try:
+            dc = parsed.get("choices", [])[0].get("delta", {}).get("content")
+            if isinstance(dc, str):
+                return dc
+            # delta.content is an object (not string) -> extract textual field
+            if isinstance(dc, dict):
+                text = dc.get("response") or dc.get("answer") or dc.get("result") or dc.get("content")
+                if text:
+                    return str(text)
+            # fallback: stringify delta
+            return json.dumps(dc, ensure_ascii=False)
+        except Exception:
+            # safe fallback: stringify entire parsed JSON
+            return json.dumps(parsed, ensure_ascii=False)
+
+    # Case B: plain object containing top-level 'response'/'answer' (LightRAG NDJSON delta)
+    text = parsed.get("response") or parsed.get("answer") or parsed.get("result")
+    if text and isinstance(text, str):
+        return text
+
+    # Case C: some other object -> try to find nested textual fields
+    for key in ("text", "content", "message", "data"):
+        if parsed.get(key) and isinstance(parsed.get(key), str):
+            return parsed.get(key)
+
+    # final fallback: stringify
+    return json.dumps(parsed, ensure_ascii=False)
 
 def sse_event(obj: dict) -> str:
     # Format chunk exactly as Agora expects
@@ -103,101 +164,46 @@ async def chat_completions(req: ChatReq, x_api_key: str | None = Header(None)):
     # ----------------------
     stream_id = str(uuid.uuid4())
 
+    def content_chunk(text: str) -> str:
+        return sse_event({
+            "id": stream_id,
+            "object": "chat.completion.chunk",
+            "choices": [{"delta": {"content": text}}]
+        })
+
     async def stream_generator() -> AsyncGenerator[str, None]:
+        passthrough = STREAM_MODE != "chunked"
+        sent = False
         # 1) Try to proxy LightRAG streaming endpoint if available
         try:
-            async with httpx.AsyncClient(timeout=None) as client:
-                async with client.stream("POST", LIGHTRAG_STREAM_URL, json=payload, headers=headers) as resp:
-                    if resp.status_code == 200:
-                        # Helper: normalize text -> yield SSE events in small word chunks
-                        def yield_text_chunks(text):
+            # No read timeout: the LLM may pause between tokens
+            async with http_client.stream("POST", LIGHTRAG_STREAM_URL, json=payload, headers=headers,
+                                          timeout=httpx.Timeout(HTTP_TIMEOUT, read=None)) as resp:
+                if resp.status_code == 200:
+                    async for raw_line in resp.aiter_lines():
+                        if raw_line is None or not raw_line.strip():
+                            continue
+                        text = extract_stream_text(raw_line.strip())
+                        if not text:
+                            continue
+                        sent = True
+                        if passthrough:
+                            # Forward the delta as-is (spacing included) the moment it arrives
+                            yield content_chunk(text)
+                        else:
                             # split into small pieces to emulate token streaming
                             for piece in chunk_text_by_words(text, words_per_chunk=6):
-                                out = {
-                                    "id": stream_id,
-                                    "object": "chat.completion.chunk",
-                                    "choices": [{"delta": {"content": piece}}]
-                                }
-                                yield sse_event(out)
-
-                        async for raw_line in resp.aiter_lines():
-                            if raw_line is None:
-                                continue
-                            line = raw_line.strip()
-                            if not line:
-                                continue
-
-                            # Try parse JSON safely
-                            parsed = None
-                            try:
-                                parsed = json.loads(line)
-                            except Exception:
-                                parsed = None
-
-                            # 1) If parsed JSON exists
-                            if isinstance(parsed, dict):
-                                # Case A: parsed is already an Agora-style chunk object
-                                if parsed.get("object") == "chat.completion.chunk":
-                                    # try to extract delta.content
-                                    try:
-                                        choices = parsed.get("choices", [])
-                                        if choices and isinstance(choices[0].get("delta", {}).get("content"), str):
-                                            # already correct format: ensure id and forward
-                                            parsed["id"] = stream_id
-                                            yield sse_event(parsed)
-                                            continue
-                                        # delta.content is an object (not string) -> extract textual field
-                                        dc = choices[0].get("delta", {}).get("content")
-                                        if isinstance(dc, dict):
-                                            # Look for likely textual keys
-                                            text = dc.get("response") or dc.get("answer") or dc.get("result") or dc.get("content")
-                                            if text:
-                                                for ev in yield_text_chunks(str(text)):
-                                                    yield ev
-                                                continue
-                                        # fallback: stringify delta and send as one chunk
-                                        for ev in yield_text_chunks(json.dumps(dc, ensure_ascii=False)):
-                                            yield ev
-                                        continue
-                                    except Exception:
-                                        # safe fallback: stringify entire parsed JSON
-                                        for ev in yield_text_chunks(json.dumps(parsed, ensure_ascii=False)):
-                                            yield ev
-                                        continue
-
-                                # Case B: parsed is a plain object containing top-level 'response'/'answer' -> chunk it
-                                text = parsed.get("response") or parsed.get("answer") or parsed.get("result")
-                                if text and isinstance(text, str):
-                                    for ev in yield_text_chunks(text):
-                                        yield ev
-                                    continue
-
-                                # Case C: parsed is some other object -> try to find nested textual fields
-                                # flatten and stringify as last resort
-                                flat_text = None
-                                for key in ("text", "content", "message", "data"):
-                                    if parsed.get(key) and isinstance(parsed.get(key), str):
-                                        flat_text = parsed.get(key)
-                                        break
-                                if flat_text:
-                                    for ev in yield_text_chunks(flat_text):
-                                        yield ev
-                                    continue
-
-                                # final fallback: stringify and send
-                                for ev in yield_text_chunks(json.dumps(parsed, ensure_ascii=False)):
-                                    yield ev
-                                continue
-
-                            # 2) Not JSON — treat as raw text
-                            for ev in yield_text_chunks(line):
-                                yield ev
-
-                        # final DONE marker
-                        yield "data: [DONE]\n\n"
-                        return
-                    # else: fallthrough to fallback chunking
+                                yield content_chunk(piece)
+
+                    # final DONE marker
+                    yield "data: [DONE]\n\n"
+                    return
+                # else: fallthrough to fallback chunking
         except Exception:
+            if sent:
+                # Part of the answer is out already; repeating it from /query would garble the speech
+                yield "data: [DONE]\n\n"
+                return
             # if streaming call failed, fallback below
             pass
 
@@ -219,21 +225,22 @@ async def chat_completions(req: ChatReq, x_api_key: str | None = Header(None)):
         jr = r.json()
         full_text = jr.get("response") or jr.get("answer") or jr.get("result") or json.dumps(jr)
 
-        # chunk into small pieces (word groups) to emulate token streaming
-        for piece in chunk_text_by_words(full_text, words_per_chunk=6):
-            out = {
-                "id": stream_id,
-                "object": "chat.completion.chunk",
-                "choices": [{"delta": {"content": piece}}]
-            }
-            yield sse_event(out)
-            # small sleep to let Agora start processing chunks
-            await asyncio.sleep(0.02)
+        if passthrough:
+            # The whole answer is already here: send it in one chunk
+            yield content_chunk(full_text)
+        else:
+            # chunk into small pieces (word groups) to emulate token streaming
+            for piece in chunk_text_by_words(full_text, words_per_chunk=6):
+                yield content_chunk(piece)
+                # small sleep to let Agora start processing chunks
+                await asyncio.sleep(0.02)
 
         yield "data: [DONE]\n\n"
         return
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    # Keep proxies from buffering the event stream
+    return StreamingResponse(stream_generator(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # Run with: uvicorn wrapper:app --host 0.0.0.0 --port 8080
 if __name__ == "__main__":
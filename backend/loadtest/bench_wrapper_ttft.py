@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-token benchmark for the voice agent's custom LLM wrapper
+(lightrag/Lightrag_main/custom_llm_wrapper/wrapper.py).
+
+Starts the fake LightRAG server and the wrapper in this process, then sends
+streaming /chat/completions requests the way Agora does and reports, per
+WRAPPER_STREAM_MODE, the time until the first content chunk and until [DONE].
+
+Run from backend/:
+
+    python -m loadtest.bench_wrapper_ttft
+    python -m loadtest.bench_wrapper_ttft --requests 200 --concurrency 20 --token-delay 0.05
+    python -m loadtest.bench_wrapper_ttft --url http://my-wrapper:8080   # an already running wrapper
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from loadtest.run_loadtest import percentile, start_server
+
+WRAPPER_DIR = Path(__file__).resolve().parent.parent / "lightrag" / "Lightrag_main" / "custom_llm_wrapper"
+QUESTIONS = [
+    "what is invictus",
+    "dosage of p-factor for paddy",
+    "how much invictus per acre",
+    "my paddy leaves are turning yellow",
+]
+
+
+async def one_request(client, url: str, question: str) -> dict:
+    """Time one streaming chat completion: first content chunk and [DONE]."""
+    body = {"model": "farmvaidya", "stream": True, "messages": [{"role": "user", "content": question}]}
+    started = time.perf_counter()
+    first = None
+    chunks = 0
+    text = []
+    async with client.stream("POST", f"{url}/chat/completions", json=body) as res:
+        res.raise_for_status()
+        async for line in res.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+            content = json.loads(data)["choices"][0]["delta"].get("content")
+            if content:
+                if first is None:
+                    first = time.perf_counter() - started
+                chunks += 1
+                text.append(content)
+    return {"ttft": first, "total": time.perf_counter() - started, "chunks": chunks, "text": "".join(text)}
+
+
+async def run_round(url: str, requests: int, concurrency: int) -> list:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        async def bounded(n):
+            async with semaphore:
+                return await one_request(client, url, QUESTIONS[n % len(QUESTIONS)])
+
+        return await asyncio.gather(*(bounded(n) for n in range(requests)))
+
+
+def report_row(mode: str, results: list) -> str:
+    ttft = [r["ttft"] * 1000 for r in results if r["ttft"] is not None]
+    total = [r["total"] * 1000 for r in results]
+    chunks = sum(r["chunks"] for r in results) / max(len(results), 1)
+    if not ttft:
+        return f"{mode:<12} {len(results):>6}   no content received"
+    return (f"{mode:<12} {len(results):>6} {percentile(ttft, 50):>10.1f} {percentile(ttft, 95):>10.1f} "
+            f"{percentile(total, 50):>10.1f} {percentile(total, 95):>10.1f} {chunks:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custom LLM wrapper time-to-first-token benchmark")
+    parser.add_argument("--requests", type=int, default=50, help="streaming requests per mode")
+    parser.add_argument("--concurrency", type=int, default=5, help="requests in flight at once")
+    parser.add_argument("--modes", default="passthrough,chunked", help="comma-separated WRAPPER_STREAM_MODE values")
+    parser.add_argument("--lightrag-latency", type=float, default=0.5, help="fake LightRAG time to first token (s)")
+    parser.add_argument("--lightrag-jitter", type=float, default=0.1, help="fake LightRAG latency spread (fraction)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="fake LightRAG delay between deltas (s)")
+    parser.add_argument("--port", type=int, default=8766, help="wrapper port")
+    parser.add_argument("--lightrag-port", type=int, default=9722, help="fake LightRAG port")
+    parser.add_argument("--url", help="benchmark a running wrapper instead (its own stream mode, one round)")
+    args = parser.parse_args()
+
+    rounds = []
+    if args.url:
+        rounds.append(("remote", args.url.rstrip("/")))
+    else:
+        # Must be set before the wrapper module reads its config
+        os.environ.update({
+            "LIGHTRAG_URL": f"http://127.0.0.1:{args.lightrag_port}/query",
+            "LIGHTRAG_STREAM_URL": f"http://127.0.0.1:{args.lightrag_port}/query/stream",
+            "WRAPPER_API_KEY": "",
+            "LIGHTRAG_API_KEY": "",
+        })
+        sys.path.insert(0, str(WRAPPER_DIR))
+        import wrapper
+        from loadtest import fake_lightrag
+
+        fake_lightrag.SETTINGS.update(latency=args.lightrag_latency, jitter=args.lightrag_jitter,
+                                      token_delay=args.token_delay)
+        print(f"🧪 Fake LightRAG on :{args.lightrag_port} (first token {args.lightrag_latency}s, "
+              f"{args.token_delay * 1000:g} ms between deltas), wrapper on :{args.port}")
+        start_server(fake_lightrag.app, args.lightrag_port)
+        start_server(wrapper.app, args.port)
+        rounds.extend((mode, f"http://127.0.0.1:{args.port}") for mode in args.modes.split(","))
+
+    print(f"⏱️ {args.requests} streaming requests per mode, {args.concurrency} at a time\n")
+    print(f"{'mode':<12} {'count':>6} {'ttft p50':>10} {'ttft p95':>10} {'total p50':>10} {'total p95':>10} {'chunks':>8}")
+    answers = {}
+    for mode, url in rounds:
+        if not args.url:
+            wrapper.STREAM_MODE = mode  # read per request
+        results = asyncio.run(run_round(url, args.requests, args.concurrency))
+        answers[mode] = results[0]["text"]
+        print(report_row(mode, results))
+    print("\n(ms; ttft = first content chunk, total = [DONE])")
+
+    if len(set(answers.values())) > 1:
+        print("\n📝 The modes returned different text; first answer per mode:")
+        for mode, text in answers.items():
+            print(f"   {mode}: {text[:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Fake LightRAG server for load tests.
+Serves /query, /query/stream and /health with LightRAG's request/response shapes
+and a configurable, jittered latency, so backend throughput can be measured
+without an LLM or a knowledge graph.
+
+    python -m loadtest.fake_lightrag --port 9621 --latency 1.5 --jitter 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Defaults; overridden by the command line or by run_loadtest.py
+SETTINGS = {
+    "latency": 1.5,        # mean seconds until the full answer (/query) or the first token (/query/stream)
+    "jitter": 0.3,         # +/- fraction of the latency
+    "token_delay": 0.02,   # seconds between streamed chunks
+}
+CALLS = {"query": 0, "stream": 0}
+
+ANSWER = (
+    "**{topic}** [1]\n\n"
+    "Apply Invictus at 2 kg per acre mixed with farmyard manure before the last ploughing. "
+    "For paddy, repeat P-Factor at 500 ml per acre after 15 days. "
+    "Keep the field moist but not flooded during application.\n\n"
+    "References\n- [1] biofactor_product_guide.pdf"
+)
+
+app = FastAPI(title="Fake LightRAG")
+
+
+def _delay() -> float:
+    spread = SETTINGS["latency"] * SETTINGS["jitter"]
+    return max(0.0, random.uniform(SETTINGS["latency"] - spread, SETTINGS["latency"] + spread))
+
+
+def _answer(body: dict) -> str:
+    return ANSWER.format(topic=str(body.get("query", ""))[:60])
+
+
+@app.post("/query")
+async def query(request: Request):
+    body = await request.json()
+    CALLS["query"] += 1
+    await asyncio.sleep(_delay())
+    return {"response": _answer(body)}
+
+
+@app.post("/query/stream")
+async def query_stream(request: Request):
+    body = await request.json()
+    CALLS["stream"] += 1
+    text = _answer(body)
+
+    async def chunks():
+        await asyncio.sleep(_delay())
+        for i in range(0, len(text), 12):
+            yield json.dumps({"response": text[i:i + 12]}) + "\n"
+            await asyncio.sleep(SETTINGS["token_delay"])
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "calls": CALLS}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake LightRAG server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9621)
+    parser.add_argument("--latency", type=float, default=SETTINGS["latency"])
+    parser.add_argument("--jitter", type=float, default=SETTINGS["jitter"])
+    parser.add_argument("--token-delay", type=float, default=SETTINGS["token_delay"])
+    args = parser.parse_args()
+    SETTINGS.update(latency=args.latency, jitter=args.jitter, token_delay=args.token_delay)
+
+    print(f"🧪 Fake LightRAG on {args.host}:{args.port} (latency {args.latency}s ±{args.jitter:.0%})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Load test for the FarmVaidya backend.
+
+Starts the fake LightRAG server and the real backend app in this process
+(stub translator, local MongoDB, throw-away database), then drives /auth,
+/sessions and /chat with concurrent virtual farmers replaying a weighted,
+multilingual conversation mix. Reports RPS, p50/p95/p99 per endpoint and per
+intent branch, and MongoDB operations per chat turn.
+
+Run from backend/ with a local mongod listening:
+
+    python -m loadtest.run_loadtest --users 20 --duration 60
+    python -m loadtest.run_loadtest --save loadtest/baseline.json
+    python -m loadtest.run_loadtest --compare loadtest/baseline.json   # exits 1 on regression
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+# Each conversation is replayed message by message in one session.
+# weight, name, messages (branches follow app/services/chat_rules.py)
+CONVERSATIONS = [
+    (3, "greeting_then_product", ["hi", "what is invictus", "thank you"]),
+    (3, "dosage_english", ["dosage of p-factor for paddy", "how much invictus per acre"]),
+    (2, "dosage_telugu", ["నమస్కారం", "ఇన్విక్టస్ మోతాదు ఎంత", "పీ-ఫాక్టర్ ఎప్పుడు వేయాలి"]),
+    (2, "dosage_hindi", ["नमस्ते", "इनविक्टस की मात्रा कितनी है", "धन्यवाद"]),
+    (2, "factual", ["who is the founder of biofactor", "where is biofactor company located"]),
+    (3, "diagnosis_with_followups", [
+        "my paddy leaves are turning yellow",
+        "paddy, tillering stage",
+        "black soil, canal irrigation",
+        "urea 2 bags last week",
+    ]),
+    (2, "diagnosis_telugu", ["నా వరి ఆకులు పసుపు రంగులోకి మారుతున్నాయి", "వరి, పిలక దశ", "నల్ల నేల"]),
+    (2, "general_then_summary", [
+        "how to improve paddy yield",
+        "dosage of invictus for cotton",
+        "tell me all dosages so far",
+    ]),
+]
+
+# Handshake / monitoring commands that are not part of request handling
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "endSessions",
+    "saslStart", "saslContinue", "createIndexes", "listIndexes", "collMod", "dropDatabase",
+}
+# Ops that belong to login and session management rather than to a chat turn
+NON_TURN_COLLECTIONS = {"users"}
+NON_TURN_OPS = {("sessions", "insert"), ("sessions", "find"), ("sessions", "delete")}
+
+
+def configure_environment(args):
+    """Point the app at the stand-ins; must run before any app module is imported."""
+    os.environ.update({
+        "MONGO_URI": args.mongo_uri,
+        "DB_NAME": args.db_name,
+        "JWT_SECRET": os.environ.get("JWT_SECRET") or "loadtest-secret",
+        "GOOGLE_CLIENT_ID": os.environ.get("GOOGLE_CLIENT_ID") or "loadtest",
+        "LIGHTRAG_API_URL": f"http://127.0.0.1:{args.lightrag_port}/query",
+        "LIGHTRAG_BASE_URL": f"http://127.0.0.1:{args.lightrag_port}",
+        "LIGHTRAG_STREAM_URL": f"http://127.0.0.1:{args.lightrag_port}/query/stream",
+        "LIGHTRAG_POOL_SIZE": str(max(20, args.users)),
+        "TRANSLATOR_PROVIDER": "stub",
+        "TRANSLATOR_STUB_LATENCY": str(args.translator_latency),
+        # Local embeddings only: no network calls besides the stand-ins
+        "GEMINI_API_KEY": "",
+        "ANSWER_CACHE_EMBEDDER": "local",
+    })
+
+
+def make_op_counter():
+    from pymongo import monitoring
+
+    class MongoOpCounter(monitoring.CommandListener):
+        """Counts commands sent to MongoDB by (collection, command)."""
+
+        def __init__(self):
+            self.ops = Counter()
+            self._lock = threading.Lock()
+
+        def started(self, event):
+            if event.command_name in IGNORED_COMMANDS:
+                return
+            # getMore names the collection separately; its own field is the cursor id
+            collection = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+            key = (collection if isinstance(collection, str) else "-", event.command_name)
+            with self._lock:
+                self.ops[key] += 1
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+        def snapshot(self) -> Counter:
+            with self._lock:
+                return Counter(self.ops)
+
+    return MongoOpCounter()
+
+
+class Recorder:
+    """Latency samples per (endpoint, branch) plus error counts."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.chat_turns = 0
+
+    def add(self, endpoint: str, seconds: float, ok: bool, branch: str = "-"):
+        if ok:
+            self.samples[(endpoint, branch)].append(seconds)
+            if endpoint.startswith("chat"):
+                self.chat_turns += 1
+        else:
+            self.errors[endpoint] += 1
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+async def timed(recorder, client, endpoint, method, url, branch="-", **kwargs):
+    started = time.perf_counter()
+    try:
+        res = await client.request(method, url, **kwargs)
+        ok = res.status_code < 400
+    except Exception:
+        res, ok = None, False
+    recorder.add(endpoint, time.perf_counter() - started, ok, branch)
+    return res if ok else None
+
+
+async def virtual_farmer(client, number, run_id, deadline, recorder, args):
+    """Sign up, log in, then replay conversations in fresh sessions until the deadline."""
+    from app.services.chat_rules import classify_intent
+
+    rng = random.Random(args.seed + number)
+    weights = [w for w, _, _ in CONVERSATIONS]
+    email, password = f"farmer-{run_id}-{number}@loadtest.local", "loadtest-password"
+
+    if not await timed(recorder, client, "auth/signup", "POST", "/auth/signup",
+                       json={"email": email, "password": password, "name": f"Farmer {number}"}):
+        return
+    res = await timed(recorder, client, "auth/login", "POST", "/auth/login", json={"email": email, "password": password})
+    if not res:
+        return
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    chat_path, chat_endpoint = ("/chat/stream", "chat/stream") if args.stream else ("/chat", "chat")
+
+    while time.monotonic() < deadline:
+        res = await timed(recorder, client, "sessions/create", "POST", "/sessions/", headers=headers)
+        if not res:
+            continue
+        session_id = res.json()["session_id"]
+
+        _, _, messages = rng.choices(CONVERSATIONS, weights=weights)[0]
+        for message in messages:
+            if time.monotonic() >= deadline:
+                break
+            await timed(recorder, client, chat_endpoint, "POST", chat_path, branch=classify_intent(message).branch,
+                        headers=headers, json={"session_id": session_id, "message": message})
+            if args.think:
+                await asyncio.sleep(rng.uniform(0, args.think))
+
+        await timed(recorder, client, "sessions/list", "GET", "/sessions/", headers=headers)
+
+
+def start_server(app, port: int):
+    """Run an ASGI app with uvicorn in a background thread; returns the server."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} failed to start")
+        time.sleep(0.05)
+    return server
+
+
+def summarize(recorder, wall: float, ops_before: Counter, ops_after: Counter, args) -> dict:
+    endpoints = {}
+    by_endpoint = defaultdict(list)
+    for (endpoint, branch), values in recorder.samples.items():
+        by_endpoint[endpoint].extend(values)
+        if branch != "-":
+            by_endpoint[f"{endpoint} [{branch}]"].extend(values)
+    for name, values in sorted(by_endpoint.items()):
+        endpoints[name] = {
+            "count": len(values),
+            "rps": round(len(values) / wall, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+
+    ops = ops_after - ops_before
+    turn_ops = sum(
+        count for (collection, command), count in ops.items()
+        if collection not in NON_TURN_COLLECTIONS and (collection, command) not in NON_TURN_OPS
+    )
+    total = sum(len(v) for v in recorder.samples.values())
+    return {
+        "config": {
+            "users": args.users, "duration": args.duration, "stream": args.stream,
+            "lightrag_latency": args.lightrag_latency, "translator_latency": args.translator_latency,
+        },
+        "wall_seconds": round(wall, 2),
+        "requests": total,
+        "rps": round(total / wall, 2),
+        "chat_turns": recorder.chat_turns,
+        "chat_rps": round(recorder.chat_turns / wall, 2),
+        "errors": dict(recorder.errors),
+        "endpoints": endpoints,
+        "mongo_ops": {f"{c}.{cmd}": n for (c, cmd), n in sorted(ops.items())},
+        "mongo_ops_per_turn": round(turn_ops / recorder.chat_turns, 2) if recorder.chat_turns else None,
+    }
+
+
+def print_report(report: dict):
+    print("\n" + "=" * 78)
+    print(f"📊 {report['requests']} requests in {report['wall_seconds']}s  →  {report['rps']} req/s, "
+          f"{report['chat_turns']} chat turns ({report['chat_rps']} turns/s)")
+    if report["errors"]:
+        print(f"❌ Errors: {report['errors']}")
+    print("=" * 78)
+    print(f"{'endpoint [branch]':<34}{'count':>7}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, row in report["endpoints"].items():
+        print(f"{name:<34}{row['count']:>7}{row['rps']:>8}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+    print("-" * 78)
+    print(f"🍃 MongoDB ops per chat turn: {report['mongo_ops_per_turn']}")
+    for name, count in report["mongo_ops"].items():
+        print(f"   {name:<40}{count:>8}")
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_samples: int, min_delta_ms: float) -> list:
+    """Regressions against a saved report: p95 per endpoint/branch and Mongo ops per turn."""
+    problems = []
+    for name, row in baseline.get("endpoints", {}).items():
+        current = report["endpoints"].get(name)
+        # A p95 over a handful of requests is noise
+        if not current or min(current["count"], row["count"]) < min_samples:
+            continue
+        if current["p95_ms"] > row["p95_ms"] * (1 + tolerance) and current["p95_ms"] - row["p95_ms"] > min_delta_ms:
+            problems.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {row['p95_ms']}ms")
+    old_ops, new_ops = baseline.get("mongo_ops_per_turn"), report["mongo_ops_per_turn"]
+    if old_ops and new_ops and new_ops > old_ops * (1 + tolerance):
+        problems.append(f"MongoDB ops per turn: {new_ops} vs baseline {old_ops}")
+    return problems
+
+
+async def drive(args, op_counter):
+    import httpx
+
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120, limits=limits) as client:
+        ops_before = op_counter.snapshot()
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            virtual_farmer(client, n, run_id, deadline, recorder, args) for n in range(args.users)
+        ))
+        wall = time.monotonic() - started
+        ops_after = op_counter.snapshot()
+    return summarize(recorder, wall, ops_before, ops_after, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FarmVaidya backend load test")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual farmers")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic")
+    parser.add_argument("--think", type=float, default=0.5, help="max random pause between messages (s)")
+    parser.add_argument("--stream", action="store_true", help="use POST /chat/stream instead of /chat")
+    parser.add_argument("--lightrag-latency", type=float, default=1.5, help="fake LightRAG mean latency (s)")
+    parser.add_argument("--lightrag-jitter", type=float, default=0.3, help="fake LightRAG latency spread (fraction)")
+    parser.add_argument("--translator-latency", type=float, default=0.05, help="stub translator delay per call (s)")
+    parser.add_argument("--mongo-uri", default=os.environ.get("LOADTEST_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="farmvaidya_loadtest")
+    parser.add_argument("--keep-db", action="store_true", help="do not drop the load-test database afterwards")
+    parser.add_argument("--port", type=int, default=8765, help="backend port")
+    parser.add_argument("--lightrag-port", type=int, default=9721, help="fake LightRAG port")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="keep the backend's per-request logging")
+    parser.add_argument("--save", help="write the report as JSON")
+    parser.add_argument("--compare", help="baseline report (JSON) to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression vs baseline (fraction)")
+    parser.add_argument("--min-samples", type=int, default=20, help="skip rows with fewer requests when comparing")
+    parser.add_argument("--min-delta-ms", type=float, default=25, help="ignore p95 increases smaller than this")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    op_counter = make_op_counter()
+    from pymongo import monitoring
+    # Registered before the app creates its client, so every command is seen
+    monitoring.register(op_counter)
+
+    from loadtest import fake_lightrag
+    fake_lightrag.SETTINGS.update(latency=args.lightrag_latency, jitter=args.lightrag_jitter)
+    from app.main import app
+
+    print(f"🧪 Fake LightRAG on :{args.lightrag_port} ({args.lightrag_latency}s), backend on :{args.port}, "
+          f"db '{args.db_name}', {args.users} users for {args.duration}s")
+    lightrag_server = start_server(fake_lightrag.app, args.lightrag_port)
+    backend_server = start_server(app, args.port)
+
+    try:
+        quiet = open(os.devnull, "w") if not args.verbose else None
+        with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+            report = asyncio.run(drive(args, op_counter))
+    finally:
+        backend_server.should_exit = True
+        lightrag_server.should_exit = True
+        time.sleep(0.5)
+        if not args.keep_db:
+            asyncio.run(_drop_database(args.db_name))
+
+    report["lightrag_calls"] = dict(fake_lightrag.CALLS)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Report saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance, args.min_samples, args.min_delta_ms)
+        if problems:
+            print(f"❌ Regressions beyond {args.tolerance:.0%}:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+async def _drop_database(name):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    # The app's client is bound to the (stopped) server's event loop; use a fresh one
+    fresh = AsyncIOMotorClient(os.environ["MONGO_URI"], serverSelectionTimeoutMS=5000)
+    try:
+        await fresh.drop_database(name)
+    finally:
+        fresh.close()
+
+
+if __name__ == "__main__":
+    main()
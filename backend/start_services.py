@@ -8,6 +8,9 @@ import subprocess
 import platform
 import time
 import signal
+import socket
+import argparse
+import urllib.request
 from pathlib import Path
 
 # Fix Windows console encoding issues
@@ -55,6 +58,14 @@ LIGHTRAG_DIR = SCRIPT_DIR / "lightrag" / "Lightrag_main"
 IS_WINDOWS = platform.system() == "Windows"
 IS_LINUX = platform.system() == "Linux"
 
+# Supervisor mode (--supervise) tuning
+READY_TIMEOUT = float(os.getenv("SUPERVISOR_READY_TIMEOUT", "180"))      # seconds a service may take to become ready
+PROBE_MAX_DELAY = float(os.getenv("SUPERVISOR_PROBE_MAX_DELAY", "1"))     # cap of the readiness poll backoff
+RESTART_MAX_DELAY = float(os.getenv("SUPERVISOR_RESTART_MAX_DELAY", "30"))  # cap of the restart backoff
+MAX_RESTARTS = int(os.getenv("SUPERVISOR_MAX_RESTARTS", "5"))             # consecutive crashes before giving up
+STABLE_AFTER = 60  # seconds a service must stay up for its crash count to reset
+STOP_TIMEOUT = 10  # seconds a stopped child gets to exit before it is killed
+
 # Process list to track
 processes = []
 
@@ -79,28 +90,10 @@ signal.signal(signal.SIGINT, cleanup)
 signal.signal(signal.SIGTERM, cleanup)
 
 def check_port(port):
-    """Check if a port is in use (excluding TIME_WAIT)"""
-    try:
-        if IS_WINDOWS:
-            result = subprocess.run(
-                ['netstat', '-ano'], 
-                capture_output=True, 
-                text=True
-            )
-            # Ignore TIME_WAIT state (port will be available soon)
-            for line in result.stdout.split('\n'):
-                if f":{port}" in line and "LISTENING" in line:
-                    return True
-            return False
-        else:
-            result = subprocess.run(
-                ['ss', '-tuln'], 
-                capture_output=True, 
-                text=True
-            )
-            return f":{port}" in result.stdout
-    except:
-        return False
+    """Check if something is listening on a port (a TIME_WAIT socket does not count)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.5)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
 
 def kill_process_on_port(port):
     """Kill process using a specific port"""
@@ -178,10 +171,8 @@ PORT=9621
             print_warning("Please create a .env file in the backend/ directory")
             print_warning("See .env.example for reference")
 
-def start_lightrag():
-    """Start LightRAG server"""
-    print_info("Starting LightRAG Server (port 9621)...")
-    
+def prepare_lightrag():
+    """Prepare the LightRAG server launch; returns (command, env), or None if it cannot run"""
     # Ensure required directories exist
     rag_storage = LIGHTRAG_DIR / "rag_storage"
     inputs_dir = LIGHTRAG_DIR / "inputs"
@@ -205,10 +196,9 @@ def start_lightrag():
         # On Render, try installing it now
         if os.getenv("RENDER"):
             print_info("Attempting to install LightRAG dependencies...")
-            os.chdir(LIGHTRAG_DIR)
             try:
-                subprocess.run(["pip", "install", "uv"], check=True)
-                subprocess.run(["uv", "sync", "--extra", "api", "--no-cache"], check=True)
+                subprocess.run(["pip", "install", "uv"], check=True, cwd=str(LIGHTRAG_DIR))
+                subprocess.run(["uv", "sync", "--extra", "api", "--no-cache"], check=True, cwd=str(LIGHTRAG_DIR))
                 print_success("LightRAG dependencies installed")
                 # Re-check if command exists now
                 if not lightrag_cmd.exists():
@@ -217,13 +207,9 @@ def start_lightrag():
             except Exception as e:
                 print_error(f"Failed to install dependencies: {e}")
                 sys.exit(1)
-            os.chdir(BACKEND_DIR)
         else:
             sys.exit(1)
     
-    # Start LightRAG server
-    os.chdir(LIGHTRAG_DIR)
-    
     # Set UTF-8 encoding for subprocess to handle Unicode characters
     env = os.environ.copy()
     env['PYTHONIOENCODING'] = 'utf-8'
@@ -235,13 +221,6 @@ def start_lightrag():
                 env.pop(key, None)
         print_info("Removed Gunicorn env vars to avoid conflicts")
     
-    # Create log files for debugging
-    log_file = LIGHTRAG_DIR / "lightrag_startup.log"
-    error_file = LIGHTRAG_DIR / "lightrag_error.log"
-    
-    # Determine which command to use
-    print_info("Starting LightRAG server")
-    
     # Check if .venv exists (local development)
     if IS_WINDOWS:
         venv_lightrag_cmd = LIGHTRAG_DIR / ".venv" / "Scripts" / "lightrag-server.exe"
@@ -271,7 +250,16 @@ def start_lightrag():
         print_error(f"lightrag-server not found. Please run: cd lightrag/Lightrag_main && uv sync --extra api")
         return None
     
-    with open(log_file, 'w') as log_out, open(error_file, 'w') as log_err:
+    return lightrag_cmd, env
+
+def spawn_lightrag(lightrag_cmd, env, restart=False):
+    """Launch the LightRAG server process with its output in the log files (appended on a restart)"""
+    # Create log files for debugging
+    log_file = LIGHTRAG_DIR / "lightrag_startup.log"
+    error_file = LIGHTRAG_DIR / "lightrag_error.log"
+    
+    log_mode = 'a' if restart else 'w'
+    with open(log_file, log_mode) as log_out, open(error_file, log_mode) as log_err:
         process = subprocess.Popen(
             lightrag_cmd,
             stdout=log_out,
@@ -283,12 +271,25 @@ def start_lightrag():
     processes.append(process)
     print_success(f"LightRAG server started (PID: {process.pid})")
     print_info(f"LightRAG logs: {log_file}")
+    return process
+
+def start_lightrag():
+    """Start LightRAG server"""
+    print_info("Starting LightRAG Server (port 9621)...")
+    
+    launch = prepare_lightrag()
+    if launch is None:
+        return None
+    
+    print_info("Starting LightRAG server")
+    process = spawn_lightrag(*launch)
     
     # Check if process is still alive after a moment
     time.sleep(2)
     if process.poll() is not None:
+        error_file = LIGHTRAG_DIR / "lightrag_error.log"
         print_error("LightRAG failed to start! Check logs:")
-        print_error(f"  Log: {log_file}")
+        print_error(f"  Log: {LIGHTRAG_DIR / 'lightrag_startup.log'}")
         print_error(f"  Error: {error_file}")
         # Print error contents
         try:
@@ -300,15 +301,12 @@ def start_lightrag():
             pass
         sys.exit(1)
     
-    # Go back to backend directory
-    os.chdir(BACKEND_DIR)
     return process
 
-def start_backend():
-    """Start Backend API server"""
+def prepare_backend():
+    """Prepare the Backend API launch; returns (command, env)"""
     # Get port from environment or use default
     port = os.getenv("PORT", "8000")
-    print_info(f"Starting Backend API Server (port {port})...")
     
     # On Render, use system Python (dependencies already installed)
     # On local, use venv
@@ -328,29 +326,184 @@ def start_backend():
         
         python_cmd = str(venv_python)
     
-    # Start backend server
-    os.chdir(BACKEND_DIR)
-    
     # Set UTF-8 encoding for subprocess to handle Unicode characters
     env = os.environ.copy()
     env['PYTHONIOENCODING'] = 'utf-8'
     
+    backend_cmd = [python_cmd, "-m", "uvicorn", "app.main:app",
+                   "--host", "0.0.0.0", "--port", port,
+                   "--timeout-graceful-shutdown", "1"]  # Fast shutdown to free port quickly
+    return backend_cmd, env
+
+def spawn_backend(backend_cmd, env, restart=False):
+    """Launch the Backend API process"""
     # Start with direct output to avoid buffering issues
     process = subprocess.Popen(
-        [python_cmd, "-m", "uvicorn", "app.main:app", 
-         "--host", "0.0.0.0", "--port", port,
-         "--timeout-graceful-shutdown", "1"],  # Fast shutdown to free port quickly
+        backend_cmd,
         stdout=None,  # Direct output to terminal (no buffering)
         stderr=None,  # Direct error output to terminal
-        env=env
+        env=env,
+        cwd=str(BACKEND_DIR)
     )
     
     processes.append(process)
-    print_success(f"Backend server started (PID: {process.pid}) on port {port}")
+    print_success(f"Backend server started (PID: {process.pid}) on port {os.getenv('PORT', '8000')}")
     return process
 
+def start_backend():
+    """Start Backend API server"""
+    print_info(f"Starting Backend API Server (port {os.getenv('PORT', '8000')})...")
+    return spawn_backend(*prepare_backend())
+
+def probe(url, timeout=1):
+    """True if the URL answers 200"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+def stop_process(process, timeout=STOP_TIMEOUT):
+    """Terminate a child and wait for it to exit, killing it if it ignores the request"""
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print_warning(f"Process {process.pid} did not stop within {timeout:g}s, killing it")
+        process.kill()
+        process.wait()
+
+class Service:
+    """
+    A child process run by the supervisor. It is polled on its readiness URL with
+    exponential backoff until it answers 200, and relaunched with exponential
+    backoff when it exits or is not ready within READY_TIMEOUT (it is stopped
+    first, so the new child can bind the port).
+    """
+
+    def __init__(self, name, launch, spawn, ready_url):
+        self.name = name
+        self.launch = launch          # (command, env) for spawn
+        self.spawn = spawn
+        self.ready_url = ready_url
+        self.process = None
+        self.started_at = 0.0
+        self.ready_after = None       # seconds from launch to ready, once ready
+        self.crashes = 0              # consecutive crashes
+        self.restarts = 0
+        self.restart_at = None
+        self.next_probe = 0.0
+        self.probe_delay = 0.1
+
+    def start(self, restart=False):
+        if self.process is not None:
+            # Never launch over a live predecessor: it would still hold the port
+            stop_process(self.process)
+            if self.process in processes:
+                processes.remove(self.process)
+        if restart:
+            self.restarts += 1
+        self.process = self.spawn(*self.launch, restart=restart)
+        self.started_at = time.monotonic()
+        self.ready_after = None
+        self.restart_at = None
+        self.next_probe = self.started_at
+        self.probe_delay = 0.1
+
+    def failed(self, now, reason):
+        """Count a crash (or a start that never became ready) and schedule the restart with backoff"""
+        # Only a run that got ready and stayed up for a while clears the crash streak
+        if self.ready_after is not None and now - self.started_at >= STABLE_AFTER:
+            self.crashes = 0
+        self.crashes += 1
+        if self.crashes > MAX_RESTARTS:
+            print_error(f"{self.name} failed {self.crashes} times in a row ({reason}), giving up")
+            cleanup_and_fail()
+        delay = min(RESTART_MAX_DELAY, 2 ** (self.crashes - 1))
+        print_error(f"{self.name} {reason}; restarting in {delay:g}s")
+        self.restart_at = now + delay
+
+    def tick(self, now):
+        """Advance the service one step: schedule/perform a restart or poll readiness"""
+        if self.restart_at is not None:
+            if now >= self.restart_at:
+                print_info(f"Restarting {self.name} (restart #{self.restarts + 1})...")
+                self.start(restart=True)
+            return
+
+        if self.process.poll() is not None:
+            self.failed(now, f"exited with code {self.process.returncode}")
+            return
+
+        if self.ready_after is None and now >= self.next_probe:
+            if probe(self.ready_url):
+                self.ready_after = now - self.started_at
+                print_success(f"{self.name} ready in {self.ready_after:.1f}s ({self.ready_url})")
+            elif now - self.started_at > READY_TIMEOUT:
+                print_error(f"{self.name} not ready after {READY_TIMEOUT:g}s; stopping it")
+                stop_process(self.process)
+                self.failed(time.monotonic(), f"was not ready after {READY_TIMEOUT:g}s")
+            else:
+                self.next_probe = now + self.probe_delay
+                self.probe_delay = min(self.probe_delay * 2, PROBE_MAX_DELAY)
+
+def cleanup_and_fail():
+    """Stop every child and exit non-zero (so the platform restarts the whole deploy)"""
+    try:
+        cleanup()
+    except SystemExit:
+        pass
+    sys.exit(1)
+
+def supervise():
+    """Launch LightRAG and the backend together and keep them running"""
+    port = os.getenv("PORT", "8000")
+    lightrag_launch = prepare_lightrag()
+    if lightrag_launch is None:
+        sys.exit(1)
+    services = [
+        Service("LightRAG", lightrag_launch, spawn_lightrag, "http://127.0.0.1:9621/health"),
+        # Liveness, not /health/ready: readiness there trails LightRAG by a health probe interval
+        Service("Backend", prepare_backend(), spawn_backend, f"http://127.0.0.1:{port}/health/live"),
+    ]
+
+    launched_at = time.monotonic()
+    for service in services:
+        service.start()
+
+    all_ready = False
+    while True:
+        now = time.monotonic()
+        for service in services:
+            service.tick(now)
+        if not all_ready and all(service.ready_after is not None for service in services):
+            all_ready = True
+            print_header("Services Started Successfully!", Colors.GREEN)
+            for service in services:
+                print(f"{Colors.CYAN}{service.name + ' ready:':<16}{Colors.END} {service.ready_after:.1f}s")
+            print(f"{Colors.CYAN}{'All ready:':<16}{Colors.END} {now - launched_at:.1f}s")
+            print_urls(port)
+        time.sleep(0.05)
+
+def print_urls(port):
+    print(f"{Colors.CYAN}Backend API:{Colors.END}     http://localhost:{port}")
+    print(f"{Colors.CYAN}Backend Docs:{Colors.END}    http://localhost:{port}/docs")
+    print(f"{Colors.CYAN}LightRAG API:{Colors.END}    http://localhost:9621")
+    print(f"{Colors.CYAN}LightRAG WebUI:{Colors.END}  http://localhost:9621/webui")
+    print(f"{Colors.CYAN}LightRAG Docs:{Colors.END}   http://localhost:9621/docs")
+    print()
+    print_info("Press Ctrl+C to stop all services")
+    print()
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Start LightRAG and the Backend API")
+    parser.add_argument("--supervise", action="store_true",
+                        help="start both services at once, wait on their health endpoints and restart crashed ones")
+    args = parser.parse_args()
+    
     print_header("Starting Farm Vaidya Services")
     
     # Validate required environment variables on Render
@@ -401,6 +554,10 @@ def main():
     
     print()
     
+    if args.supervise:
+        supervise()
+        return
+    
     # Start LightRAG first
     lightrag_process = start_lightrag()
     
@@ -462,14 +619,7 @@ def main():
     
     # Print success info
     print_header("Services Started Successfully!", Colors.GREEN)
-    print(f"{Colors.CYAN}Backend API:{Colors.END}     http://localhost:{port}")
-    print(f"{Colors.CYAN}Backend Docs:{Colors.END}    http://localhost:{port}/docs")
-    print(f"{Colors.CYAN}LightRAG API:{Colors.END}    http://localhost:9621")
-    print(f"{Colors.CYAN}LightRAG WebUI:{Colors.END}  http://localhost:9621/webui")
-    print(f"{Colors.CYAN}LightRAG Docs:{Colors.END}   http://localhost:9621/docs")
-    print()
-    print_info("Press Ctrl+C to stop all services")
-    print()
+    print_urls(port)
     
     # Keep script running and monitor processes
     try:
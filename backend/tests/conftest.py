@@ -0,0 +1,17 @@
+"""
+Unit tests for the backend. Run from backend/:
+
+    python -m pytest -q tests
+
+app.core.config refuses to load without these; nothing here connects to them.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.services import chat_service
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def test_disconnected_stream_keeps_ticket_until_turn_finishes(monkeypatch):
+    controller = AdmissionController(slots=1, max_queue=0, queue_timeout=1, per_user=2)
+
+    async def run():
+        finish = asyncio.Event()
+
+        async def slow_turn(session_id, message, stream):
+            await stream.put("first ")
+            await finish.wait()
+            return "first answer"
+
+        monkeypatch.setattr(chat_service, "handle_chat", slow_turn)
+        ticket = controller.admit("farmer", "general")
+
+        # The router's generator: the client reads one delta and disconnects
+        with ticket:
+            events = chat_service.stream_chat("session", "question")
+            assert await events.__anext__() == {"delta": "first "}
+            await events.aclose()
+        ticket.release()  # the response's background task
+
+        # The turn is still running, so it still counts against the limits
+        assert controller.stats()["turns_in_flight"] == 1
+        with pytest.raises(AdmissionRejected):
+            controller.admit("someone else", "general")
+
+        finish.set()
+        await asyncio.sleep(0.01)
+        assert controller.stats()["turns_in_flight"] == 0
+        assert controller.stats()["users_in_flight"] == 0
+        controller.admit("someone else", "general")
+
+    asyncio.run(run())
+
+
+def test_ticket_without_task_is_released_on_exit():
+    controller = AdmissionController(slots=1, max_queue=0, queue_timeout=1, per_user=2)
+    with controller.admit("farmer", "general"):
+        assert controller.stats()["turns_in_flight"] == 1
+    assert controller.stats()["turns_in_flight"] == 0
@@ -0,0 +1,44 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import answer_cache as answer_cache_module
+from app.services.answer_cache import AnswerCache, guard_signature
+from app.utils.translator import LocalizedText
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A cache whose embedder rates every pair of questions as identical, so only the guard tells them apart."""
+    monkeypatch.setattr(answer_cache_module, "local_embedding", lambda text: np.ones(8, dtype=np.float32))
+    return AnswerCache(threshold=0.92, ttl=60, max_entries=100, embedder="local", enabled=True)
+
+
+def ask(cache, question):
+    return asyncio.run(cache.lookup(question, "mix", "english"))
+
+
+def remember(cache, question, answer):
+    probe = ask(cache, question)
+    assert not probe.hit
+    cache.store(probe, LocalizedText(answer, "english"), 1.0)
+
+
+def test_questions_differing_only_by_crop_miss_each_other(cache):
+    remember(cache, "P-Factor dose for paddy", "500 ml per acre for paddy")
+    assert not ask(cache, "P-Factor dose for cotton").hit
+    assert not ask(cache, "P-Factor dose").hit
+
+
+def test_crop_synonyms_share_answers(cache):
+    remember(cache, "P-Factor dose for paddy", "500 ml per acre for paddy")
+    probe = ask(cache, "what is the p factor dosage for rice")
+    assert probe.hit
+    assert probe.answer.text == "500 ml per acre for paddy"
+
+
+def test_guard_names_crops_as_whole_words():
+    assert guard_signature("invictus dose for rice")[2] == frozenset({"paddy"})
+    assert guard_signature("price of invictus")[2] == frozenset()
+    assert guard_signature("వరి కి ఇన్విక్టస్")[2] == frozenset({"paddy"})
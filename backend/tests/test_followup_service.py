@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app.services import followup_service
+from app.services.followup_service import decide_follow_up, rule_follow_up, needs_follow_up, DECISION_COUNTERS
+from app.utils.translator import LocalizedText
+
+NOTHING = {
+    "crop_provided": False,
+    "stage_provided": False,
+    "soil_provided": False,
+    "irrigation_provided": False,
+    "fertilizer_provided": False,
+}
+
+
+def provided(*slots):
+    return {**NOTHING, **{f"{slot}_provided": True for slot in slots}}
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    saved = dict(DECISION_COUNTERS)
+    for key in DECISION_COUNTERS:
+        DECISION_COUNTERS[key] = 0
+    yield
+    DECISION_COUNTERS.update(saved)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """A session whose provided details and history the test sets."""
+    state = {"provided": dict(NOTHING), "history": []}
+
+    async def provided_info(session_id):
+        return dict(state["provided"])
+
+    async def get_history(session_id, limit=None):
+        return list(state["history"])
+
+    monkeypatch.setattr(followup_service.history_cache, "provided_info", provided_info)
+    monkeypatch.setattr(followup_service, "get_history", get_history)
+    return state
+
+
+# ---------------- decide_follow_up: rule table ----------------
+
+@pytest.mark.parametrize("question", ["hi", "dosage of p-factor for paddy", "who is the founder of biofactor", ""])
+def test_self_contained_questions_are_answered(question):
+    decision, _ = decide_follow_up(question, NOTHING)
+    assert decision is False
+
+
+def test_diagnosis_without_crop_asks():
+    assert decide_follow_up("my leaves are turning yellow", NOTHING) == (True, "diagnosis without crop")
+
+
+def test_diagnosis_with_crop_only_is_answered():
+    assert decide_follow_up("my leaves are turning yellow", provided("crop")) == (False, "diagnosis with crop")
+
+
+def test_general_advice_needs_crop_and_stage():
+    question = "how to improve yield"
+    assert decide_follow_up(question, NOTHING)[0] is True
+    assert decide_follow_up(question, provided("crop"))[0] is True
+    assert decide_follow_up(question, provided("crop", "stage")) == (False, "advice with crop and stage")
+
+
+def test_full_context_short_circuits_ambiguous_question():
+    question = "what should i do for my farm this season"
+    assert decide_follow_up(question, provided("crop", "stage"))[0] is None
+    assert decide_follow_up(question, provided("crop", "stage", "soil")) == (False, "full farm context")
+    assert decide_follow_up(question, provided("crop", "stage", "irrigation")) == (False, "full farm context")
+
+
+# ---------------- rule_follow_up: what handle_chat calls ----------------
+
+def test_rule_follow_up_uses_session_details_and_counts(session):
+    assert asyncio.run(rule_follow_up("s1", "my leaves are turning yellow")) is True
+    session["provided"] = provided("crop")
+    assert asyncio.run(rule_follow_up("s1", "my leaves are turning yellow")) is False
+    assert asyncio.run(rule_follow_up("s1", "what should i do for my farm this season")) is None
+    assert DECISION_COUNTERS["ask_by_rule"] == 1
+    assert DECISION_COUNTERS["answer_by_rule"] == 1
+    assert DECISION_COUNTERS["undecided_by_rule"] == 1
+    assert followup_service.decision_stats()["rule_rate"] == round(2 / 3, 4)
+
+
+# ---------------- needs_follow_up: LLM fallback ----------------
+
+def test_needs_follow_up_skips_llm_when_rules_decide(session, monkeypatch):
+    async def query_lightrag(*args, **kwargs):
+        raise AssertionError("LLM must not be called")
+
+    monkeypatch.setattr(followup_service, "query_lightrag", query_lightrag)
+    assert asyncio.run(needs_follow_up("s1", user_message="dosage of invictus")) is False
+    assert DECISION_COUNTERS["llm_fallback"] == 0
+
+
+def test_needs_follow_up_asks_llm_when_ambiguous(session, monkeypatch):
+    async def query_lightrag(*args, **kwargs):
+        return LocalizedText("ASK_FOLLOW_UP", "english")
+
+    monkeypatch.setattr(followup_service, "query_lightrag", query_lightrag)
+    assert asyncio.run(needs_follow_up("s1", user_message="what should i do for my farm this season")) is True
+    assert DECISION_COUNTERS["llm_fallback"] == 1
+
+
+def test_needs_follow_up_answers_directly_when_llm_fails(session, monkeypatch):
+    async def query_lightrag(*args, **kwargs):
+        raise RuntimeError("LightRAG down")
+
+    monkeypatch.setattr(followup_service, "query_lightrag", query_lightrag)
+    session["history"] = [{"role": "user", "content": "what should i do for my farm this season"}]
+    assert asyncio.run(needs_follow_up("s1")) is False
+    assert DECISION_COUNTERS["llm_fallback"] == 1
+    assert DECISION_COUNTERS["llm_errors"] == 1
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from app import main
+from app.services import http_client
+
+
+def test_shutdown_runs_when_startup_fails(monkeypatch):
+    calls = []
+
+    async def check_connection():
+        pass
+
+    async def ensure_indexes():
+        await http_client.init_client()  # a part that did start
+        raise RuntimeError("index build failed")
+
+    async def stop_health():
+        calls.append("health_monitor")
+
+    async def stop_write_behind():
+        calls.append("write_behind")
+
+    monkeypatch.setattr(main, "check_connection", check_connection)
+    monkeypatch.setattr(main, "ensure_indexes", ensure_indexes)
+    monkeypatch.setattr(main.health_monitor, "stop", stop_health)
+    monkeypatch.setattr(main.write_behind, "stop", stop_write_behind)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with main.lifespan(main.app):
+                pass
+
+    asyncio.run(run())
+    assert calls == ["health_monitor", "write_behind"]
+    assert http_client._client is None
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils import translator
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.translation_providers import TranslationProvider
+
+
+class SlowProvider(TranslationProvider):
+    name = "slow"
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def translate(self, text, source, target):
+        time.sleep(self.latency)
+        return f"{text} ({target})"
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("Translator", failure_threshold=1, reset_timeout=30)
+    monkeypatch.setattr(translator, "translator_breaker", breaker)
+    return breaker
+
+
+def use(monkeypatch, provider, timeout, queue_timeout):
+    monkeypatch.setattr(translator, "get_provider", lambda: provider)
+    monkeypatch.setattr(translator, "TRANSLATOR_TIMEOUT", timeout)
+    monkeypatch.setattr(translator, "TRANSLATOR_QUEUE_TIMEOUT", queue_timeout)
+
+
+def test_saturated_slots_do_not_open_the_breaker(monkeypatch, breaker):
+    use(monkeypatch, SlowProvider(0.3), timeout=2, queue_timeout=0.05)
+
+    async def run():
+        monkeypatch.setattr(translator, "_provider_slots", asyncio.Semaphore(1))
+        return await asyncio.gather(
+            *(translator.translate_text(f"text {n}", target="te", use_cache=False) for n in range(5)),
+            return_exceptions=True
+        )
+
+    queue_timeouts = translator.TRANSLATOR_COUNTERS["queue_timeouts"]
+    results = asyncio.run(run())
+    assert sum(isinstance(r, str) for r in results) == 1
+    assert sum(isinstance(r, TimeoutError) for r in results) == 4
+    assert translator.TRANSLATOR_COUNTERS["queue_timeouts"] == queue_timeouts + 4
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_provider_deadline_starts_after_the_slot(monkeypatch, breaker):
+    # Each call needs 0.2 s; queued behind another it finishes after ~0.4 s, past a
+    # 0.3 s deadline that would have included the queueing
+    use(monkeypatch, SlowProvider(0.2), timeout=0.3, queue_timeout=1)
+
+    async def run():
+        monkeypatch.setattr(translator, "_provider_slots", asyncio.Semaphore(1))
+        return await asyncio.gather(*(translator.translate_text(f"text {n}", target="te", use_cache=False) for n in range(2)))
+
+    assert asyncio.run(run()) == ["text 0 (te)", "text 1 (te)"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_provider_timeout_still_opens_the_breaker(monkeypatch, breaker):
+    use(monkeypatch, SlowProvider(0.2), timeout=0.05, queue_timeout=1)
+
+    async def run():
+        monkeypatch.setattr(translator, "_provider_slots", asyncio.Semaphore(1))
+        with pytest.raises(TimeoutError):
+            await translator.translate_text("text", target="te", use_cache=False)
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.OPEN
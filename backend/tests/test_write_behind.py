@@ -0,0 +1,96 @@
+import asyncio
+
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from app.services import write_behind as write_behind_module
+from app.services.write_behind import WriteBehind
+
+
+class LossySessions:
+    """Applies session updates like Mongo ($ne filter, $inc/$set/$push), optionally losing the reply."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.lose_reply = False
+
+    def _apply(self, query, change):
+        if query["_id"] != self.doc["_id"] or query["applied_writes"]["$ne"] in self.doc.get("applied_writes", []):
+            return
+        for key, value in change.get("$inc", {}).items():
+            self.doc[key] = self.doc.get(key, 0) + value
+        self.doc.update(change.get("$set", {}))
+        for key, push in change.get("$push", {}).items():
+            self.doc[key] = (self.doc.get(key, []) + push["$each"])[push["$slice"]:]
+
+    async def bulk_write(self, requests, ordered=True):
+        for op in requests:
+            self._apply(op._filter, op._doc)
+        if self.lose_reply:
+            self.lose_reply = False
+            raise AutoReconnect("connection closed before the reply")
+
+    async def update_one(self, query, change):
+        self._apply(query, change)
+
+
+def test_retried_session_update_is_applied_once(monkeypatch):
+    session_id = ObjectId()
+    fake = LossySessions({"_id": session_id, "message_count": 1, "followup_count": 0})
+    monkeypatch.setattr(write_behind_module, "sessions", fake)
+
+    async def run():
+        queue = WriteBehind(interval_ms=1000)
+        queue._task = object()  # queue writes without starting the flusher
+        await queue.update_session(str(session_id), {"$inc": {"message_count": 1, "followup_count": 1}})
+        fake.lose_reply = True
+        try:
+            await queue.flush()
+        except AutoReconnect:
+            pass
+        assert queue.stats()["queued_session_updates"] == 1  # requeued for a retry
+        await queue.flush()
+        assert queue.stats()["queued_session_updates"] == 0
+
+    asyncio.run(run())
+    assert fake.doc["message_count"] == 2
+    assert fake.doc["followup_count"] == 1
+
+
+def test_retried_batch_with_several_updates_per_session_is_applied_once(monkeypatch):
+    session_id = ObjectId()
+    fake = LossySessions({"_id": session_id, "message_count": 0})
+    monkeypatch.setattr(write_behind_module, "sessions", fake)
+
+    async def run():
+        queue = WriteBehind(interval_ms=1000, max_batch=2)
+        queue._task = object()  # queue writes without starting the flusher
+        for _ in range(2):
+            await queue.update_session(str(session_id), {"$inc": {"message_count": 1}})
+        fake.lose_reply = True
+        try:
+            await queue.flush()
+        except AutoReconnect:
+            pass
+        await queue.flush()
+        # Later updates still go through, and the id list stays capped at max_batch
+        await queue.update_session(str(session_id), {"$inc": {"message_count": 1}})
+        await queue.flush()
+
+    asyncio.run(run())
+    assert fake.doc["message_count"] == 3
+    assert len(fake.doc["applied_writes"]) == 2
+
+
+def test_direct_session_updates_are_independent(monkeypatch):
+    session_id = ObjectId()
+    fake = LossySessions({"_id": session_id, "message_count": 0})
+    monkeypatch.setattr(write_behind_module, "sessions", fake)
+
+    async def run():
+        queue = WriteBehind()
+        for _ in range(3):
+            await queue.update_session(str(session_id), {"$inc": {"message_count": 1}})
+
+    asyncio.run(run())
+    assert fake.doc["message_count"] == 3